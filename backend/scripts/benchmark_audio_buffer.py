@@ -0,0 +1,95 @@
+"""Benchmark AudioChunkBuffer against the old bytearray-slicing buffer.
+
+The old buffer copied every chunk twice (bytes(buffer[:n]) and
+buffer = buffer[n:]), so a large add() was quadratic in its size. The
+ring buffer copies audio once, on the way in, and hands chunks out as
+memoryviews. Streams are fed both in small pieces, as Edge TTS delivers
+them, and in one piece, as a finished story file is.
+
+Run from the backend directory: python scripts/benchmark_audio_buffer.py
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sagatoyai.services.mp3 import next_unit_length  # noqa: E402
+from sagatoyai.services.streaming_tts import AudioChunkBuffer  # noqa: E402
+
+CHUNK_SIZE = 4096
+PIECE_SIZE = 720  # Roughly what one Edge TTS websocket message carries
+# 48 kbit/s MP3: 10 s reply, 5 min story, 30 min story
+STREAM_SIZES = [60_000, 1_800_000, 10_800_000]
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz, mono (Edge TTS output format)
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC0]) + b"\x55" * 140
+
+
+class SlicingChunkBuffer:
+    """The previous AudioChunkBuffer implementation."""
+
+    def __init__(self, chunk_size: int = 4096):
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def add(self, data: bytes) -> list[bytes]:
+        self._buffer.extend(data)
+        chunks = []
+        while len(self._buffer) >= self.chunk_size:
+            chunk = bytes(self._buffer[:self.chunk_size])
+            self._buffer = self._buffer[self.chunk_size:]
+            chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> Optional[bytes]:
+        if self._buffer:
+            data = bytes(self._buffer)
+            self._buffer = bytearray()
+            return data
+        return None
+
+
+def throughput(make_buffer, stream: bytes, piece_size: int) -> float:
+    """Feed the stream through a new buffer and return MB/s (best of 3)."""
+    pieces = [stream[i:i + piece_size] for i in range(0, len(stream), piece_size)]
+    best = float("inf")
+    for _ in range(3):
+        buffer = make_buffer()
+        start = time.perf_counter()
+        total = 0
+        for piece in pieces:
+            for chunk in buffer.add(piece):
+                total += len(chunk)
+        remainder = buffer.flush()
+        total += len(remainder) if remainder is not None else 0
+        best = min(best, time.perf_counter() - start)
+        assert total == len(stream)
+    return len(stream) / best / 1e6
+
+
+def main():
+    """Run benchmark and print a table."""
+    buffers = {
+        "slicing": lambda: SlicingChunkBuffer(CHUNK_SIZE),
+        "ring": lambda: AudioChunkBuffer(CHUNK_SIZE),
+        "ring+mp3": lambda: AudioChunkBuffer(CHUNK_SIZE, frame_length=next_unit_length),
+    }
+    print(f"📏 {CHUNK_SIZE}-byte chunks, throughput in MB/s (best of 3)\n")
+    print(f"{'stream':>9} | {'pieces':>8} | " + " | ".join(f"{name:>9}" for name in buffers))
+    print("-" * (23 + 12 * len(buffers)))
+
+    for size in STREAM_SIZES:
+        stream = FRAME * (size // len(FRAME))
+        for piece_size, label in ((PIECE_SIZE, f"{PIECE_SIZE} B"), (len(stream), "whole")):
+            results = [throughput(make, stream, piece_size) for make in buffers.values()]
+            print(
+                f"{len(stream) / 1e6:>7.2f}MB | {label:>8} | "
+                + " | ".join(f"{mbps:>9.0f}" for mbps in results)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark the content filter as term lists grow.
+
+Compares the trie-compiled single-pass matcher against a plain regex
+alternation and a loop of per-term regexes (the old approach) for lists of
+10 to 5000 terms.
+
+Run from the backend directory: python scripts/benchmark_content_filter.py
+"""
+
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sagatoyai.services.content_filter import TermMatcher  # noqa: E402
+
+SAMPLE_TEXT = (
+    "Hej! Jag heter Saga och jag bor i en gosig leksak. Idag ska vi läsa en saga "
+    "om en modig liten kanin som hoppar genom skogen och hittar nya vänner. "
+    "Once upon a time a little dinosaur visited Stockholm and saw the Royal Palace."
+)
+LIST_SIZES = [10, 100, 1000, 5000]
+ROUNDS = 2000
+
+
+def make_terms(count: int, seed: int = 0) -> list[str]:
+    """Generate random word-like terms that won't occur in the sample text."""
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < count:
+        length = rng.randint(4, 10)
+        terms.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return sorted(terms)
+
+
+def time_per_call(check, text: str) -> float:
+    """Average microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        check(text)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def main():
+    """Run benchmark and print a table."""
+    print(f"📏 Text length: {len(SAMPLE_TEXT)} chars, {ROUNDS} rounds per cell\n")
+    print(f"{'terms':>6} | {'trie regex':>11} | {'alternation':>11} | {'per-term loop':>13}")
+    print("-" * 52)
+
+    for size in LIST_SIZES:
+        terms = make_terms(size)
+
+        matcher = TermMatcher({term: ("test", "en") for term in terms})
+        alternation = re.compile(
+            r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b", re.IGNORECASE
+        )
+        per_term = [re.compile(rf"\b{re.escape(term)}\b", re.IGNORECASE) for term in terms]
+
+        trie_us = time_per_call(matcher.search, SAMPLE_TEXT)
+        alternation_us = time_per_call(alternation.search, SAMPLE_TEXT)
+        loop_us = time_per_call(
+            lambda text: any(pattern.search(text) for pattern in per_term), SAMPLE_TEXT
+        )
+        print(f"{size:>6} | {trie_us:>9.1f}µs | {alternation_us:>9.1f}µs | {loop_us:>11.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
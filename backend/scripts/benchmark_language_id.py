@@ -0,0 +1,61 @@
+"""Benchmark language identification.
+
+Compares the trigram model with the old keyword-counting detector on the
+labeled intent evaluation set (data/intent_eval.jsonl), reporting accuracy
+and time per call.
+
+Run from the backend directory: python scripts/benchmark_language_id.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sagatoyai.services.language import detect_language  # noqa: E402
+
+EVAL_PATH = Path(__file__).parent.parent / "data" / "intent_eval.jsonl"
+ROUNDS = 200
+
+# Previous keyword-based detector, kept here for comparison
+OLD_SWEDISH_KEYWORDS = [
+    "hej", "hallå", "tjena", "morsning", "godmorgon", "godnatt",
+    "tack", "varsågod", "förlåt", "ja", "nej",
+]
+OLD_ENGLISH_KEYWORDS = [
+    "hello", "hi", "hey", "good morning", "good night",
+    "thanks", "please", "sorry", "yes", "no",
+]
+
+
+def old_detect_language(text: str) -> str:
+    """Keyword substring counting, as before the trigram model."""
+    text_lower = text.lower()
+    swedish = sum(1 for keyword in OLD_SWEDISH_KEYWORDS if keyword in text_lower)
+    english = sum(1 for keyword in OLD_ENGLISH_KEYWORDS if keyword in text_lower)
+    return "sv" if swedish > english else "en"
+
+
+def main():
+    """Run benchmark."""
+    with open(EVAL_PATH, encoding="utf-8") as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+
+    for name, detect in [("keywords", old_detect_language), ("trigrams", detect_language)]:
+        correct = sum(1 for row in examples if detect(row["text"]) == row["language"])
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for row in examples:
+                detect(row["text"])
+        per_call_us = (time.perf_counter() - start) / (ROUNDS * len(examples)) * 1e6
+        print(
+            f"{name:>9}: {correct}/{len(examples)} correct "
+            f"({correct / len(examples):.1%}), {per_call_us:.1f} µs per call"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
-"""Script to generate story library using Gemini and save to audio files."""
+"""Script to generate story library using Gemini and save to audio files.
 
-from sagatoyai.services.tts import tts_service
-from sagatoyai.services.story_library import STORY_SERIES, get_story_prompt
-from sagatoyai.services.gemini import gemini_service
+Each story is saved as text, segmented MP3 audio and a seek index (see
+services/story_audio.py).
+
+Stories are generated concurrently, with separate limits for the LLM and
+the TTS provider. STORIES_DIR/manifest.json records a hash of each story's
+prompt, text and audio, so a rerun skips stories that are already done and
+unchanged, and a story whose audio failed last time only redoes the audio.
+"""
+
+import argparse
 import asyncio
+import hashlib
+import json
 import os
 import sys
 from pathlib import Path
@@ -12,99 +21,201 @@ from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / ".env")
 
-# Add parent directory to path
+# Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from sagatoyai.services.gemini import gemini_service  # noqa: E402
+from sagatoyai.services.story_audio import (  # noqa: E402
+    get_story_index_path,
+    get_story_tts_engine,
+    synthesize_story,
+)
+from sagatoyai.services.story_library import (  # noqa: E402
+    STORIES_DIR,
+    get_story_prompt,
+    get_story_series,
+    story_catalog,
+)
 
-async def generate_story_audio(series_id: str, story_id: str, language: str = "sv"):
-    """Generate story text and convert to audio.
+MANIFEST_PATH = STORIES_DIR / "manifest.json"
 
-    Args:
-        series_id: Story series ID (trex, kanin, delfin)
-        story_id: Specific story ID
-        language: Language code ('en' or 'sv')
-    """
-    print(f"\n🎨 Generating story: {series_id}/{story_id} in {language}...")
+DEFAULT_LLM_CONCURRENCY = 2
+DEFAULT_TTS_CONCURRENCY = 4
 
-    # Get story prompt
-    prompt = get_story_prompt(series_id, story_id, language)
-    if not prompt:
-        print(f"❌ Story not found: {series_id}/{story_id}")
-        return
 
-    # Generate story text with Gemini
-    print("📝 Generating story text with Gemini...")
-    story_text = await gemini_service.generate_story(prompt, language)
+def content_hash(data: bytes) -> str:
+    """Hash file content for the manifest."""
+    return hashlib.sha256(data).hexdigest()
 
-    print(f"✅ Generated {len(story_text)} characters")
-    print(f"\n--- Story Preview ---")
-    print(story_text[:200] + "...")
-    print(f"--- End Preview ---\n")
 
-    # Convert to audio with TTS
-    print("🎤 Converting to audio with TTS...")
-    audio_bytes = await tts_service.synthesize_to_bytes(story_text, language)
+def tts_settings(language: str) -> str:
+    """Describe the TTS settings that shape a story's audio."""
+    return get_story_tts_engine().describe_voice(language)
 
-    # Save to file
-    output_dir = Path("stories") / language / series_id
-    output_dir.mkdir(parents=True, exist_ok=True)
 
-    output_file = output_dir / f"{story_id}.mp3"
-    with open(output_file, "wb") as f:
-        f.write(audio_bytes)
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so an interrupted run never leaves it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
 
-    print(f"✅ Saved audio to: {output_file}")
-    print(f"📊 Audio size: {len(audio_bytes) / 1024:.1f} KB")
 
-    # Also save text version
-    text_file = output_dir / f"{story_id}.txt"
-    with open(text_file, "w", encoding="utf-8") as f:
-        f.write(story_text)
+class Manifest:
+    """Record of prompt hash -> text hash -> audio hash per story."""
 
-    print(f"✅ Saved text to: {text_file}")
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path.exists():
+            self.entries = json.loads(path.read_text(encoding="utf-8"))
 
+    def get(self, key: str) -> dict:
+        return self.entries.get(key, {})
 
-async def generate_stories_by_series(language: str = "sv", series_to_generate: str = "all"):
-    """Generate all stories in the library.
+    def update(self, key: str, **fields) -> None:
+        """Update a story's entry and save right away."""
+        self.entries[key] = {**self.get(key), **fields}
+        write_atomic(self.path, json.dumps(self.entries, indent=2, sort_keys=True).encode())
+
+
+async def generate_story_audio(
+    series_id: str,
+    story_id: str,
+    language: str,
+    manifest: Manifest,
+    llm_limit: asyncio.Semaphore,
+    tts_limit: asyncio.Semaphore,
+    force: bool = False,
+) -> str:
+    """Generate story text and convert to audio, reusing unchanged work.
 
     Args:
+        series_id: Story series ID (trex, kanin, delfin)
+        story_id: Specific story ID
         language: Language code ('en' or 'sv')
-        series_to_generate: The specific series to generate ('trex', 'kanin', 'delfin') or 'all'.
+        manifest: Generation manifest
+        llm_limit: Limits concurrent story text requests
+        tts_limit: Limits stories being synthesized at once
+        force: Regenerate even if nothing changed
+
+    Returns:
+        What was done: "skipped", "audio" or "generated"
     """
-    print(f"\n🚀 Starting story generation for language: {language}")
-
-    stories_to_process = {}
-    if series_to_generate == "all":
-        stories_to_process = STORY_SERIES
-    elif series_to_generate in STORY_SERIES:
-        stories_to_process = {
-            series_to_generate: STORY_SERIES[series_to_generate]}
-
-    total_stories = sum(len(series["stories"])
-                        for series in stories_to_process.values())
-    print(f"📖 Total stories to generate: {total_stories}")
-
-    for series_id, series_data in stories_to_process.items():
-        print(f"\n{'='*60}")
-        print(f"📚 Series: {series_data['name']}")
-        print(f"{'='*60}")
-
-        for story in series_data["stories"]:
-            try:
-                await generate_story_audio(series_id, story["id"], language)
-            except Exception as e:
-                print(f"❌ Error generating {story['id']}: {e}")
-                continue
+    key = f"{language}/{series_id}/{story_id}"
 
-    print(f"\n{'='*60}")
-    print("✅ Story generation complete!")
-    print(f"{'='*60}")
+    prompt = get_story_prompt(series_id, story_id, language)
+    if not prompt:
+        raise ValueError(f"Story not found: {series_id}/{story_id}")
+    prompt_hash = content_hash(prompt.encode())
+
+    output_dir = STORIES_DIR / language / series_id
+    text_file = output_dir / f"{story_id}.txt"
+    audio_file = output_dir / f"{story_id}.mp3"
+    index_file = get_story_index_path(series_id, story_id, language)
+
+    # Reuse the text if the prompt is unchanged and the file is intact
+    entry = manifest.get(key)
+    story_text = None
+    status = "audio"
+    if not force and entry.get("prompt_hash") == prompt_hash and text_file.is_file():
+        text_bytes = text_file.read_bytes()
+        if content_hash(text_bytes) == entry.get("text_hash"):
+            story_text = text_bytes.decode("utf-8")
+
+    if story_text is None:
+        status = "generated"
+        async with llm_limit:
+            print(f"📝 {key}: generating text...")
+            story_text = await gemini_service.generate_story(prompt, language)
+        text_bytes = story_text.encode("utf-8")
+        write_atomic(text_file, text_bytes)
+        manifest.update(
+            key,
+            prompt_hash=prompt_hash,
+            text_hash=content_hash(text_bytes),
+            audio_hash=None,
+        )
+        print(f"✅ {key}: {len(story_text)} characters")
+
+    # Reuse the audio if it was made from this text with these settings
+    entry = manifest.get(key)
+    settings = tts_settings(language)
+    if (
+        entry.get("audio_hash")
+        and entry.get("tts") == settings
+        and audio_file.is_file()
+        and index_file.is_file()
+        and content_hash(audio_file.read_bytes()) == entry["audio_hash"]
+    ):
+        print(f"⏭️  {key}: up to date")
+        return "skipped"
+
+    async with tts_limit:
+        print(f"🎤 {key}: converting to audio...")
+        audio_bytes, index = await synthesize_story(series_id, story_id, story_text, language)
+    write_atomic(audio_file, audio_bytes)
+    write_atomic(index_file, index.model_dump_json(indent=2).encode())
+    manifest.update(key, audio_hash=content_hash(audio_bytes), tts=settings)
+    print(
+        f"✅ {key}: saved {audio_file} ({len(audio_bytes) / 1024:.1f} KB, "
+        f"{len(index.segments)} segments, {index.duration:.0f}s)"
+    )
+    return status
+
+
+async def generate_stories(
+    stories: list[tuple[str, str]],
+    languages: list[str],
+    llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+    tts_concurrency: int = DEFAULT_TTS_CONCURRENCY,
+    force: bool = False,
+) -> dict[str, int]:
+    """Generate stories in every language concurrently.
+
+    Args:
+        stories: (series_id, story_id) pairs
+        languages: Language codes to generate
+        llm_concurrency: Maximum concurrent story text requests
+        tts_concurrency: Maximum stories synthesized at once
+        force: Regenerate even if nothing changed
+
+    Returns:
+        Count of stories per outcome
+    """
+    manifest = Manifest()
+    llm_limit = asyncio.Semaphore(llm_concurrency)
+    tts_limit = asyncio.Semaphore(tts_concurrency)
+
+    jobs = [
+        (language, series_id, story_id)
+        for language in languages
+        for series_id, story_id in stories
+    ]
+    print(f"📖 Stories to check: {len(jobs)}")
+
+    results = await asyncio.gather(
+        *(
+            generate_story_audio(
+                series_id, story_id, language, manifest, llm_limit, tts_limit, force
+            )
+            for language, series_id, story_id in jobs
+        ),
+        return_exceptions=True,
+    )
+
+    counts = {"generated": 0, "audio": 0, "skipped": 0, "failed": 0}
+    for (language, series_id, story_id), result in zip(jobs, results):
+        if isinstance(result, Exception):
+            counts["failed"] += 1
+            print(f"❌ Error generating {language}/{series_id}/{story_id}: {result}")
+        else:
+            counts[result] += 1
+    return counts
 
 
 async def main():
     """Main entry point."""
-    import argparse
-
     parser = argparse.ArgumentParser(
         description="Generate Sagatoyai story library")
     parser.add_argument(
@@ -117,7 +228,7 @@ async def main():
     parser.add_argument(
         "--series",
         "-s",
-        choices=["trex", "kanin", "delfin", "all"],
+        choices=[*get_story_series(), "all"],
         default="all",
         help="Series to generate (default: all)",
     )
@@ -125,6 +236,23 @@ async def main():
         "--story",
         help="Specific story ID to generate (e.g., trex_stockholm)",
     )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=DEFAULT_LLM_CONCURRENCY,
+        help=f"Concurrent story text requests (default: {DEFAULT_LLM_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--tts-concurrency",
+        type=int,
+        default=DEFAULT_TTS_CONCURRENCY,
+        help=f"Stories synthesized at once (default: {DEFAULT_TTS_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate stories even if they are up to date",
+    )
 
     args = parser.parse_args()
 
@@ -135,18 +263,37 @@ async def main():
         print("Then run: export GOOGLE_API_KEY='your-key-here'")
         return
 
-    # Generate specific story
     if args.story:
-        series_id = args.story.split("_")[0]
-        await generate_story_audio(series_id, args.story, args.language)
-        return
-
-    # Generate by language
-    if args.language == "both":
-        await generate_stories_by_series("sv", args.series)
-        await generate_stories_by_series("en", args.series)
+        entry = story_catalog.find_story(args.story)
+        if entry is None:
+            print(f"❌ Story not found: {args.story}")
+            return
+        stories = [(entry[0], args.story)]
     else:
-        await generate_stories_by_series(args.language, args.series)
+        stories = [
+            (series_id, story["id"])
+            for series_id, series in get_story_series().items()
+            if args.series in ("all", series_id)
+            for story in series["stories"]
+        ]
+
+    languages = ["sv", "en"] if args.language == "both" else [args.language]
+
+    counts = await generate_stories(
+        stories,
+        languages,
+        llm_concurrency=args.llm_concurrency,
+        tts_concurrency=args.tts_concurrency,
+        force=args.force,
+    )
+
+    print(f"\n{'='*60}")
+    print(
+        f"✅ Story generation complete! {counts['generated']} generated, "
+        f"{counts['audio']} audio only, {counts['skipped']} up to date, "
+        f"{counts['failed']} failed"
+    )
+    print(f"{'='*60}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+"""Train the intent classifier and write its weights.
+
+Reads data/intent_training.jsonl, reports accuracy on data/intent_eval.jsonl
+and writes src/sagatoyai/data/intent_model.json.
+
+Run from the backend directory: python scripts/train_intent_classifier.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sagatoyai.models import Intent  # noqa: E402
+from sagatoyai.services.intent_classifier import (  # noqa: E402
+    MODEL_PATH,
+    IntentClassifier,
+    train_intent_model,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def load_examples(path: Path) -> list[tuple[str, Intent, str]]:
+    """Load (text, intent, language) examples from a JSONL file."""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["text"], Intent(row["intent"]), row["language"]))
+    return examples
+
+
+def main():
+    """Train, evaluate and save the model."""
+    training = load_examples(DATA_DIR / "intent_training.jsonl")
+    evaluation = load_examples(DATA_DIR / "intent_eval.jsonl")
+    print(f"📚 Training on {len(training)} examples...")
+
+    model = train_intent_model((text, intent) for text, intent, _ in training)
+
+    classifier = IntentClassifier()
+    classifier.load_weights(model)
+
+    for language in ("en", "sv"):
+        subset = [e for e in evaluation if e[2] == language]
+        correct = sum(1 for text, intent, _ in subset if classifier.detect(text) == intent)
+        print(f"✅ {language} eval accuracy: {correct}/{len(subset)} ({correct / len(subset):.1%})")
+
+    for text, intent, _ in evaluation:
+        predicted = classifier.classify(text)
+        if predicted.intent != intent:
+            print(f"   ❌ {text!r}: expected {intent.value}, got "
+                  f"{predicted.intent.value} ({predicted.confidence:.2f})")
+
+    texts = [text for text, _, _ in evaluation]
+    start = time.perf_counter()
+    rounds = 200
+    for _ in range(rounds):
+        for text in texts:
+            classifier.classify(text)
+    per_call_us = (time.perf_counter() - start) / (rounds * len(texts)) * 1e6
+    print(f"⏱️  {per_call_us:.1f} µs per classification")
+
+    MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    MODEL_PATH.write_text(json.dumps(model, ensure_ascii=False), encoding="utf-8")
+    weight_count = sum(len(w) for w in model["weights"])
+    print(f"💾 Saved {weight_count} weights to {MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Train the language identification model.
+
+Reads one corpus per language from data/langid/<lang>.txt and writes
+trigram log-probability tables to src/sagatoyai/data/language_model.json.
+To support another language (da, no, fi, ...), add its corpus and rerun.
+
+Run from the backend directory: python scripts/train_language_model.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sagatoyai.services.language import (  # noqa: E402
+    LANGUAGE_MODEL_PATH,
+    train_language_model,
+)
+
+CORPUS_DIR = Path(__file__).parent.parent / "data" / "langid"
+
+
+def main():
+    """Train and save the model."""
+    corpora = {
+        path.stem: path.read_text(encoding="utf-8")
+        for path in sorted(CORPUS_DIR.glob("*.txt"))
+    }
+    if not corpora:
+        print(f"❌ No corpora found in {CORPUS_DIR}")
+        return
+
+    for language, text in corpora.items():
+        print(f"📚 {language}: {len(text)} characters")
+
+    model = train_language_model(corpora)
+
+    LANGUAGE_MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    LANGUAGE_MODEL_PATH.write_text(json.dumps(model, ensure_ascii=False), encoding="utf-8")
+    for language, info in model.items():
+        print(f"✅ {language}: {len(info['logprobs'])} trigrams")
+    print(f"💾 Saved model to {LANGUAGE_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 """Error handling and response models."""
 
 import logging
+import math
 from typing import Optional
 
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from sagatoyai.services.llm_fallback import StoryGenerationError
+from sagatoyai.services.rate_limiter import RateLimitError
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +27,35 @@ class ErrorResponse(BaseModel):
 def setup_error_handlers(app: FastAPI) -> None:
     """Configure global error handlers for the application."""
 
+    @app.exception_handler(RateLimitError)
+    async def rate_limit_handler(request: Request, exc: RateLimitError) -> JSONResponse:
+        """Tell the device when to try again."""
+        retry_after = max(1, math.ceil(exc.retry_after))
+        logger.warning(f"Rate limited on {request.url.path}: {exc}")
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content=ErrorResponse(
+                error_code="RATE_LIMITED",
+                error_message="I'm a little busy right now. Please try again soon!",
+                retry_after=retry_after,
+            ).model_dump(),
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    @app.exception_handler(StoryGenerationError)
+    async def story_generation_handler(
+        request: Request, exc: StoryGenerationError
+    ) -> JSONResponse:
+        """Nothing was saved, so the device can simply ask again later."""
+        logger.error(f"Story generation failed on {request.url.path}: {exc}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=ErrorResponse(
+                error_code="STORY_UNAVAILABLE",
+                error_message="The storyteller is a bit tired right now. Come back soon!",
+            ).model_dump(),
+        )
+
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
         """Handle unexpected exceptions."""
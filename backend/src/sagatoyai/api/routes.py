@@ -1,6 +1,11 @@
 """API route definitions."""
 
-from fastapi import APIRouter, Depends
+import asyncio
+import logging
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
 
 from sagatoyai.api.dependencies import get_current_device
 from sagatoyai.models import (
@@ -9,12 +14,22 @@ from sagatoyai.models import (
     DeviceAuth,
     DeviceTokens,
     Intent,
+    StoryAudioIndex,
+    StoryResumeInfo,
     WeatherData,
 )
 from sagatoyai.services.auth import TokenData, create_access_token, create_refresh_token
+from sagatoyai.services.llm_fallback import llm_fallback_service
+from sagatoyai.services.story_audio import load_story_index, save_story_audio, synthesize_story
+from sagatoyai.services.story_library import get_story_audio_path, get_story_prompt
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1")
 
+# One live generation per story at a time; concurrent misses wait for it
+_story_generation_locks: dict[str, asyncio.Lock] = {}
+
 
 @router.get("/health")
 async def health_check() -> dict:
@@ -64,3 +79,108 @@ async def get_weather(
         condition="cloudy",
         description="It's a bit cloudy today, like a fluffy blanket in the sky!",
     )
+
+
+async def _generate_story_audio(series_id: str, story_id: str, language: str, path: Path) -> None:
+    """Generate a missing story live and save it where pre-generated audio goes."""
+    lock = _story_generation_locks.setdefault(str(path), asyncio.Lock())
+    async with lock:
+        if path.is_file():
+            return
+        logger.info(f"No pre-generated audio for {series_id}/{story_id} ({language}), generating")
+        prompt = get_story_prompt(series_id, story_id, language)
+        story_text = await llm_fallback_service.generate_story(prompt, language)
+        audio_bytes, index = await synthesize_story(series_id, story_id, story_text, language)
+        save_story_audio(audio_bytes, index, story_text)
+
+
+@router.get(
+    "/stories/{series_id}/{story_id}/audio",
+    response_class=FileResponse,
+    responses={206: {"description": "Partial content"}, 304: {"description": "Not modified"}},
+)
+async def get_story_audio(
+    series_id: str,
+    story_id: str,
+    request: Request,
+    language: str = Query("sv", pattern="^(sv|en)$"),
+    device: TokenData = Depends(get_current_device),
+) -> Response:
+    """Stream a story's MP3 from the pre-generated library.
+
+    Range requests are answered with 206 so playback can seek and resume,
+    and a matching If-None-Match gets 304. The file is sent by the server
+    (zero-copy where it supports pathsend); the story is only generated
+    live, and then saved to the library, if no audio exists yet.
+    """
+    path = get_story_audio_path(series_id, story_id, language)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Story not found")
+
+    if not path.is_file():
+        await _generate_story_audio(series_id, story_id, language, path)
+
+    response = FileResponse(path, media_type="audio/mpeg", stat_result=path.stat())
+    response.headers["Cache-Control"] = "private, max-age=86400"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and response.headers["etag"] in (
+        tag.strip() for tag in if_none_match.split(",")
+    ):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={
+                "ETag": response.headers["etag"],
+                "Cache-Control": response.headers["cache-control"],
+            },
+        )
+
+    return response
+
+
+def _get_story_index(series_id: str, story_id: str, language: str) -> StoryAudioIndex:
+    """Load a story's seek index or raise 404."""
+    if get_story_audio_path(series_id, story_id, language) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Story not found")
+    index = load_story_index(series_id, story_id, language)
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Story has no segment index yet"
+        )
+    return index
+
+
+@router.get("/stories/{series_id}/{story_id}/segments", response_model=StoryAudioIndex)
+async def get_story_segments(
+    series_id: str,
+    story_id: str,
+    language: str = Query("sv", pattern="^(sv|en)$"),
+    device: TokenData = Depends(get_current_device),
+) -> StoryAudioIndex:
+    """Get a story's seek index: text span, byte range and timing per segment."""
+    return _get_story_index(series_id, story_id, language)
+
+
+@router.get("/stories/{series_id}/{story_id}/resume", response_model=StoryResumeInfo)
+async def resume_story(
+    series_id: str,
+    story_id: str,
+    segment: int = Query(0, ge=0),
+    language: str = Query("sv", pattern="^(sv|en)$"),
+    device: TokenData = Depends(get_current_device),
+) -> StoryResumeInfo:
+    """Get where to continue a story's audio from a segment.
+
+    The device plays the story audio with the returned Range header, which
+    starts at the segment's first MP3 frame.
+    """
+    index = _get_story_index(series_id, story_id, language)
+    if segment >= len(index.segments):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No such segment")
+
+    start = index.segments[segment]
+    return StoryResumeInfo(
+        segment=start,
+        audio_url=f"{router.prefix}/stories/{series_id}/{story_id}/audio?language={language}",
+        range=f"bytes={start.byte_offset}-",
+    )
@@ -1,11 +1,16 @@
 """FastAPI application entry point."""
 
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from sagatoyai.api.errors import setup_error_handlers
 from sagatoyai.api.routes import router
+from sagatoyai.services.edge_sessions import edge_sessions
+from sagatoyai.services.piper_pool import PiperError, piper_tts
+from sagatoyai.services.tts import tts_service
+from sagatoyai.services.tts_engines import tts_engines
 
 # Configure logging
 logging.basicConfig(
@@ -13,10 +18,29 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up TTS on startup and release its workers and connections on shutdown."""
+    if tts_service.provider == "piper":
+        try:
+            await piper_tts.start()
+        except PiperError as e:
+            logger.warning(f"Could not preload Piper voices: {e}")
+    if tts_engines.get("edge").persistent:
+        await edge_sessions.start()
+    yield
+    await edge_sessions.close()
+    await piper_tts.close()
+
+
 app = FastAPI(
     title="Sagatoyai",
     description="AI-powered plush toy backend services",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.include_router(router)
@@ -8,6 +8,12 @@ from sagatoyai.models.conversation import (
     SessionContext,
 )
 from sagatoyai.models.device import Device, DeviceAuth, DeviceTokens
+from sagatoyai.models.story import (
+    StoryAudioIndex,
+    StoryPosition,
+    StoryResumeInfo,
+    StorySegment,
+)
 from sagatoyai.models.weather import WeatherData
 
 __all__ = [
@@ -19,5 +25,9 @@ __all__ = [
     "Device",
     "DeviceAuth",
     "DeviceTokens",
+    "StoryAudioIndex",
+    "StoryPosition",
+    "StoryResumeInfo",
+    "StorySegment",
     "WeatherData",
 ]
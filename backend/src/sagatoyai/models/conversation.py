@@ -6,6 +6,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from sagatoyai.models.story import StoryPosition
+
 
 class Intent(str, Enum):
     """Detected conversation intent."""
@@ -54,5 +56,6 @@ class SessionContext(BaseModel):
     device_id: str
     messages: list[Message] = Field(default_factory=list)
     current_story: Optional[str] = None
+    story_position: Optional[StoryPosition] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     expires_at: Optional[datetime] = None
@@ -0,0 +1,53 @@
+"""Story audio data models."""
+
+from bisect import bisect_right
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class StorySegment(BaseModel):
+    """One independently playable stretch of a story's audio."""
+
+    index: int
+    text_start: int = Field(..., description="Start of the segment in the story text")
+    text_end: int = Field(..., description="End of the segment in the story text")
+    byte_offset: int = Field(..., description="Start of the segment in the MP3 file")
+    byte_length: int
+    start_time: float = Field(..., description="Seconds from the start of the story")
+    duration: float
+
+
+class StoryAudioIndex(BaseModel):
+    """Seek index for a story's MP3, one entry per segment."""
+
+    series_id: str
+    story_id: str
+    language: str
+    duration: float
+    audio_size: int
+    segments: list[StorySegment]
+
+    def segment_at(self, seconds: float) -> Optional[StorySegment]:
+        """Get the segment playing at a time offset."""
+        if not self.segments or seconds < 0:
+            return None
+        starts = [segment.start_time for segment in self.segments]
+        return self.segments[max(bisect_right(starts, seconds) - 1, 0)]
+
+
+class StoryPosition(BaseModel):
+    """Where a child is in a library story."""
+
+    series_id: str
+    story_id: str
+    language: str = "sv"
+    segment: int = 0
+
+
+class StoryResumeInfo(BaseModel):
+    """How to continue a story from a segment."""
+
+    segment: StorySegment
+    audio_url: str
+    range: str = Field(..., description="Range header that starts playback at the segment")
@@ -16,22 +16,38 @@ from sagatoyai.services.llm_fallback import (
     LLMFallbackService,
     LLMProvider,
     LLMResult,
+    StoryGenerationError,
     llm_fallback_service,
 )
+from sagatoyai.services.latency_router import LatencyRouter
+from sagatoyai.services.llm_dispatcher import LLMDispatcher, RequestClass, llm_dispatcher
+from sagatoyai.services.rate_limiter import ProviderRateLimiter, RateLimitError
+from sagatoyai.services.response_cache import ResponseCache, response_cache
 from sagatoyai.services.streaming_tts import (
     StreamingTTSService,
     AudioChunkBuffer,
     streaming_tts_service,
 )
+from sagatoyai.services.word_timings import WordTimingIndex
+from sagatoyai.services.intent_classifier import IntentClassifier, intent_classifier
+from sagatoyai.services.intent_router import IntentRouter, intent_router
+from sagatoyai.services.prompt_builder import PromptBuilder, prompt_builder
 from sagatoyai.services.groq_service import groq_service, GroqService
 from sagatoyai.services.gemini import gemini_service, GeminiService
 from sagatoyai.services.tts import tts_service, TTSService
+from sagatoyai.services.tts_engines import TTSEngine, TTSEngineRegistry, tts_engines
+from sagatoyai.services.circuit_breaker import CircuitBreaker, CircuitState
 from sagatoyai.services.weather import weather_service, WeatherService
+from sagatoyai.services.story_audio import load_story_index, synthesize_story
 from sagatoyai.services.story_library import (
+    StoryCatalog,
+    story_catalog,
     get_story_series,
     get_series_list,
     get_stories_in_series,
     get_story_prompt,
+    get_story,
+    get_story_audio_path,
 )
 
 __all__ = [
@@ -46,11 +62,30 @@ __all__ = [
     "LLMFallbackService",
     "LLMProvider",
     "LLMResult",
+    "StoryGenerationError",
     "llm_fallback_service",
+    "LatencyRouter",
+    "LLMDispatcher",
+    "RequestClass",
+    "llm_dispatcher",
+    "ProviderRateLimiter",
+    "RateLimitError",
+    # Response cache
+    "ResponseCache",
+    "response_cache",
     # Streaming TTS (NEW)
     "StreamingTTSService",
     "AudioChunkBuffer",
     "streaming_tts_service",
+    "WordTimingIndex",
+    # Intent routing
+    "IntentClassifier",
+    "intent_classifier",
+    "IntentRouter",
+    "intent_router",
+    # Prompt assembly
+    "PromptBuilder",
+    "prompt_builder",
     # LLM services
     "groq_service",
     "GroqService",
@@ -59,12 +94,24 @@ __all__ = [
     # TTS
     "tts_service",
     "TTSService",
+    "TTSEngine",
+    "TTSEngineRegistry",
+    "tts_engines",
+    # Circuit breakers
+    "CircuitBreaker",
+    "CircuitState",
     # Weather
     "weather_service",
     "WeatherService",
     # Stories
+    "load_story_index",
+    "synthesize_story",
+    "StoryCatalog",
+    "story_catalog",
     "get_story_series",
     "get_series_list",
     "get_stories_in_series",
     "get_story_prompt",
+    "get_story",
+    "get_story_audio_path",
 ]
@@ -0,0 +1,163 @@
+"""Failure-rate circuit breaker for calls to external services.
+
+The breaker tracks call outcomes over a sliding time window. When enough
+recent calls fail it opens and callers skip the service for a while; after
+that a single probe call is let through (half-open), and its outcome
+decides whether the breaker closes again or stays open. Old outcomes age
+out of the window, so a past outage doesn't count against a service
+forever.
+"""
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker state."""
+
+    CLOSED = "closed"  # Calls go through
+    OPEN = "open"  # Calls are skipped
+    HALF_OPEN = "half_open"  # One probe call is allowed
+
+
+class CircuitBreaker:
+    """Sliding-window failure-rate circuit breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 4,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize breaker.
+
+        Args:
+            name: Name of the protected service, for logs and status
+            failure_rate_threshold: Failure rate in the window that opens the breaker
+            min_calls: Calls needed in the window before the rate counts
+            window_seconds: How long call outcomes are remembered
+            open_seconds: How long to skip the service before probing it
+            clock: Time source (monotonic seconds)
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: deque[tuple[float, bool]] = deque()  # (time, succeeded)
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+
+    def _prune(self, now: float) -> None:
+        """Forget outcomes older than the window."""
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state."""
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if self._clock() - self._opened_at < self.open_seconds:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def failure_count(self) -> int:
+        """Number of failed calls in the window."""
+        self._prune(self._clock())
+        return sum(1 for _, succeeded in self._outcomes if not succeeded)
+
+    def failure_rate(self) -> float:
+        """Failure rate over the window (0.0 with no calls)."""
+        failures = self.failure_count()
+        if not self._outcomes:
+            return 0.0
+        return failures / len(self._outcomes)
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go through, claiming the probe if half-open."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.OPEN:
+            return False
+
+        # Half-open: one probe at a time; a probe that never reported back
+        # is given up on after another open interval
+        now = self._clock()
+        if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+            return False
+        self._probe_started = now
+        return True
+
+    def release_probe(self) -> None:
+        """Give back a claimed probe that told nothing about the service.
+
+        For a call that was never sent, or was turned away by a rate
+        limit, so the next caller can probe right away.
+        """
+        self._probe_started = None
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        now = self._clock()
+        if self._opened_at is not None:
+            if self.state == CircuitState.OPEN:
+                return  # A call from before the breaker opened; wait for the probe
+            logger.info(f"Circuit for {self.name} closed after a successful probe")
+            self._opened_at = None
+            self._probe_started = None
+            self._outcomes.clear()
+        self._outcomes.append((now, True))
+        self._prune(now)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker if the rate is too high."""
+        now = self._clock()
+        if self._opened_at is not None:
+            # Failed probe (or a call that started before opening): stay open
+            self._opened_at = now
+            self._probe_started = None
+            return
+
+        self._outcomes.append((now, False))
+        self._prune(now)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and self.failure_rate() >= self.failure_rate_threshold
+        ):
+            logger.warning(
+                f"Circuit for {self.name} opened: {self.failure_rate():.0%} of "
+                f"{len(self._outcomes)} recent calls failed"
+            )
+            self._opened_at = now
+            self._probe_started = None
+
+    def reset(self) -> None:
+        """Close the breaker and forget all outcomes."""
+        self._outcomes.clear()
+        self._opened_at = None
+        self._probe_started = None
+
+    def get_status(self) -> dict:
+        """Get breaker status for health endpoints and logs."""
+        state = self.state
+        status = {
+            "state": state.value,
+            "failure_rate": round(self.failure_rate(), 3),
+            "recent_calls": len(self._outcomes),
+        }
+        if state == CircuitState.OPEN:
+            status["retry_in_seconds"] = round(
+                self.open_seconds - (self._clock() - self._opened_at), 1
+            )
+        return status
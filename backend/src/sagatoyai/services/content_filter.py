@@ -1,33 +1,320 @@
-"""Content filtering for child safety."""
+"""Content filtering for child safety.
+
+Blocked terms are loaded from per-language lists in data/content_filter/
+and compiled into one trie-shaped regex per language. A single scan finds
+every match, and because shared prefixes are merged the cost stays nearly
+flat as the lists grow (see scripts/benchmark_content_filter.py).
+
+Every matcher checks the terms of all lists, since children and LLMs mix
+languages: English "kill" is blocked in a Swedish conversation too. A
+list's "[allowed]" section names words that are harmless in its own
+language, and only that language's matcher lets them through (Swedish
+"sex" is six).
+"""
 
 import logging
 import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional
+
+from sagatoyai.services.sentence_segmenter import SentenceSegmenter
 
 logger = logging.getLogger(__name__)
 
-INAPPROPRIATE_PATTERNS = [
-    r"\b(kill|murder|death|die|blood|weapon|gun|knife)\b",
-    r"\b(hate|stupid|idiot|dumb)\b",
-    r"\b(sex|porn|nude)\b",
-    r"\b(drug|alcohol|beer|wine)\b",
-]
+TERM_LISTS_DIR = Path(__file__).parent.parent / "data" / "content_filter"
+
+FILTER_REPLACEMENTS = {
+    "en": "Let's talk about something fun and happy instead!",
+    "sv": "Vi pratar om något roligt och glatt istället!",
+}
+
+# Term list section for words that must not be blocked in that language
+ALLOWED_CATEGORY = "allowed"
+
+
+@dataclass(frozen=True)
+class FilterMatch:
+    """A blocked term found in text."""
+
+    start: int
+    end: int
+    term: str
+    category: str
+    language: str
+
+
+def load_term_list(path: Path) -> dict[str, str]:
+    """Load a term list file into a term -> category mapping.
+
+    The file has "[category]" section headers followed by one term per
+    line. Blank lines and "#" comments are ignored.
+    """
+    terms = {}
+    category = "inappropriate"
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            category = line[1:-1].strip()
+            continue
+        terms[line.casefold()] = category
+    return terms
+
+
+def build_trie_pattern(terms: Iterable[str]) -> str:
+    """Build a regex alternation with shared prefixes factored out.
+
+    ["kill", "killer", "knife"] becomes "k(?:ill(?:er)?|nife)", so the
+    regex engine only ever follows the branches the text can match.
+    """
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: dict) -> str:
+        optional = "" in node
+        branches = [
+            re.escape(char) + render(child) for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if optional else group
+
+    return render(trie)
+
+
+class TermMatcher:
+    """Single-pass matcher for a set of whole-word terms."""
+
+    def __init__(self, terms: dict[str, tuple[str, str]]):
+        """Initialize matcher.
+
+        Args:
+            terms: Mapping of term -> (category, language)
+        """
+        self._terms = terms
+        self._pattern = None
+        if terms:
+            self._pattern = re.compile(
+                r"(?<!\w)(?:" + build_trie_pattern(terms) + r")(?!\w)",
+                re.IGNORECASE,
+            )
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _resolve(self, text: str) -> str:
+        """Find the term a matched text stands for.
+
+        Case-insensitive regex matching pairs characters that casefold()
+        doesn't ("İ" matches "i" but folds to "i\u0307"), so when the folded
+        text isn't a term, look for the term the regex itself would match.
+        Every pattern character matches one text character, so the term
+        has the same length.
+        """
+        term = text.casefold()
+        if term in self._terms:
+            return term
+        for term in self._terms:
+            if len(term) == len(text) and re.fullmatch(re.escape(term), text, re.IGNORECASE):
+                return term
+        raise LookupError(f"No content filter term matches {text!r}")
+
+    def _to_match(self, match: re.Match) -> FilterMatch:
+        term = self._resolve(match.group(0))
+        category, language = self._terms[term]
+        return FilterMatch(match.start(), match.end(), term, category, language)
+
+    def find_all(self, text: str) -> list[FilterMatch]:
+        """Find every blocked term in text."""
+        if self._pattern is None:
+            return []
+        return [self._to_match(match) for match in self._pattern.finditer(text)]
+
+    def search(self, text: str) -> Optional[FilterMatch]:
+        """Find the first blocked term in text, if any."""
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(text)
+        return self._to_match(match) if match else None
 
-COMPILED_PATTERNS = [re.compile(pattern, re.IGNORECASE)
-                     for pattern in INAPPROPRIATE_PATTERNS]
 
+@lru_cache(maxsize=None)
+def get_matcher(language: Optional[str] = None) -> TermMatcher:
+    """Get the compiled matcher for a language.
 
-def contains_inappropriate_content(text: str) -> bool:
+    Args:
+        language: Language code whose allowed words are let through, or
+            None to block every list's terms
+
+    Returns:
+        TermMatcher (built once and cached)
+    """
+    # The language's own list first, so its categories are the ones reported
+    paths = sorted(TERM_LISTS_DIR.glob("*.txt"), key=lambda path: (path.stem != language, path))
+    if language is not None and not (TERM_LISTS_DIR / f"{language}.txt").exists():
+        logger.warning(f"No content filter term list for language '{language}'")
+
+    terms: dict[str, tuple[str, str]] = {}
+    allowed: set[str] = set()
+    for path in paths:
+        for term, category in load_term_list(path).items():
+            if category != ALLOWED_CATEGORY:
+                terms.setdefault(term, (category, path.stem))
+            elif path.stem == language:
+                allowed.add(term)
+    for term in allowed:
+        terms.pop(term, None)
+
+    logger.info(f"Compiled content filter for {language or 'all languages'}: {len(terms)} terms")
+    return TermMatcher(terms)
+
+
+def find_inappropriate_content(text: str, language: Optional[str] = None) -> list[FilterMatch]:
+    """Find blocked terms in text with their spans and categories.
+
+    Args:
+        text: Text to check
+        language: Language code, or None to ignore every list's allowed words
+    """
+    matches = get_matcher(language).find_all(text)
+    if matches:
+        logger.warning(
+            "Inappropriate content detected: "
+            + ", ".join(f"{m.term} ({m.category})" for m in matches)
+        )
+    return matches
+
+
+def contains_inappropriate_content(text: str, language: Optional[str] = None) -> bool:
     """Check if text contains inappropriate content for children."""
-    for pattern in COMPILED_PATTERNS:
-        if pattern.search(text):
-            logger.warning(
-                f"Inappropriate content detected: {pattern.pattern}")
-            return True
+    match = get_matcher(language).search(text)
+    if match:
+        logger.warning(f"Inappropriate content detected: {match.term} ({match.category})")
+        return True
     return False
 
 
-def filter_content(text: str) -> str:
+def filter_content(text: str, language: Optional[str] = None) -> str:
     """Filter inappropriate content from text."""
-    if contains_inappropriate_content(text):
-        return "Let's talk about something fun and happy instead!"
+    if contains_inappropriate_content(text, language):
+        return FILTER_REPLACEMENTS.get(language, FILTER_REPLACEMENTS["en"])
     return text
+
+
+class StreamingContentFilter:
+    """Filters streamed LLM text sentence by sentence.
+
+    Text is released only as complete, clean sentences. A sentence with a
+    blocked term is replaced by a friendly redirect (once per response) as
+    soon as the offending word is complete, and the rest of it is dropped.
+    Words split across chunks are only checked once they are whole.
+    """
+
+    def __init__(self, language: Optional[str] = None, early_clause_chars: Optional[int] = None):
+        """Initialize streaming filter.
+
+        Args:
+            language: Language code for term lists and the replacement text
+            early_clause_chars: Release a long first sentence at its first
+                comma (see SentenceSegmenter)
+        """
+        self.language = language
+        self._matcher = get_matcher(language)
+        self._segmenter = SentenceSegmenter(language, early_clause_chars)
+        self._checked_upto = 0  # Unfinished text prefix known to hold no blocked words
+        self._dropping = False  # Current sentence was unsafe
+        self._replaced = False
+        self.replaced_sentences = 0
+
+    def _replacement(self) -> list[str]:
+        """Get the replacement text, emitted only once per response."""
+        self.replaced_sentences += 1
+        if self._replaced:
+            return []
+        self._replaced = True
+        return [FILTER_REPLACEMENTS.get(self.language, FILTER_REPLACEMENTS["en"])]
+
+    def _check_partial(self) -> list[str]:
+        """Check complete words of the unfinished sentence."""
+        if self._dropping:
+            return []
+        pending = self._segmenter.pending
+        last_space = max(pending.rfind(" "), pending.rfind("\n"))
+        if last_space <= self._checked_upto:
+            return []
+        match = self._matcher.search(pending[:last_space])
+        self._checked_upto = last_space
+        if match is None:
+            return []
+        logger.warning(f"Inappropriate content in stream: {match.term} ({match.category})")
+        self._dropping = True
+        return self._replacement()
+
+    def _finish_sentence(self, sentence: str) -> list[str]:
+        """Release or replace a completed sentence."""
+        self._checked_upto = 0
+        dropping, self._dropping = self._dropping, False
+
+        if not sentence or dropping:
+            return []
+        match = self._matcher.search(sentence)
+        if match is not None:
+            logger.warning(f"Inappropriate content in stream: {match.term} ({match.category})")
+            return self._replacement()
+        return [sentence]
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add streamed text and get sentences that are safe to speak.
+
+        Args:
+            chunk: Next piece of LLM output
+
+        Returns:
+            Complete sentences (or the replacement text), possibly empty
+        """
+        released = []
+        for sentence in self._segmenter.feed(chunk):
+            released.extend(self._finish_sentence(sentence))
+        released.extend(self._check_partial())
+        return released
+
+    def flush(self) -> list[str]:
+        """Release whatever is left when the stream ends."""
+        released = []
+        for sentence in self._segmenter.flush():
+            released.extend(self._finish_sentence(sentence))
+        self._dropping = False
+        return released
+
+
+async def filter_text_stream(
+    stream: AsyncIterator[str],
+    language: Optional[str] = None,
+    early_clause_chars: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """Turn an LLM token stream into a stream of clean sentences.
+
+    Args:
+        stream: Async iterator of text chunks
+        language: Language code for term lists and the replacement text
+        early_clause_chars: Release a long first sentence at its first comma
+
+    Yields:
+        Sentences that are safe to speak
+    """
+    stream_filter = StreamingContentFilter(language, early_clause_chars)
+    async for chunk in stream:
+        for sentence in stream_filter.feed(chunk):
+            yield sentence
+    for sentence in stream_filter.flush():
+        yield sentence
@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Optional
 
+from sagatoyai.models import StoryPosition
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +42,7 @@ class ConversationContext:
 
     # Current activity state
     current_story: Optional[str] = None
+    story_position: Optional[StoryPosition] = None
     current_topic: Optional[str] = None
 
     def add_turn(self, role: str, content: str, intent: Optional[str] = None) -> None:
@@ -101,6 +104,7 @@ class ConversationContext:
         """Clear conversation history."""
         self.history = []
         self.current_story = None
+        self.story_position = None
         self.current_topic = None
 
 
@@ -0,0 +1,436 @@
+"""Persistent Edge TTS websocket sessions.
+
+edge_tts.Communicate opens a new TLS websocket for every text it speaks,
+so a reply spoken sentence by sentence pays a handshake per sentence. The
+speech service accepts any number of SSML requests, one after another, on
+one connection, so EdgeSessionPool keeps warm connections and reuses them
+across sentences and requests. The voice is part of each request, so any
+session can speak any voice. Sessions are replaced before the service's
+connection lifetime runs out, idle ones are closed, and a request that
+finds its connection dead is retried once on a fresh one.
+
+The wire protocol is the one edge_tts speaks, and its helpers are reused.
+They are private to edge_tts, so if an edge-tts release moves them
+EDGE_SESSIONS_AVAILABLE is False and speech goes through edge_tts.Communicate.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, Optional
+from xml.sax.saxutils import escape, unescape
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+try:
+    from edge_tts.communicate import (
+        _SSL_CTX,
+        connect_id,
+        date_to_string,
+        mkssml,
+        remove_incompatible_characters,
+        split_text_by_byte_length,
+        ssml_headers_plus_data,
+    )
+    from edge_tts.constants import SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+    from edge_tts.data_classes import TTSConfig
+    from edge_tts.drm import DRM
+
+    EDGE_SESSIONS_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"edge_tts internals unavailable ({e}), Edge TTS sessions disabled")
+    EDGE_SESSIONS_AVAILABLE = False
+
+# The connection token covers a 5-minute window; replace sessions well before
+SESSION_MAX_AGE = 240.0
+# The service drops quiet connections, so idle sessions are closed first
+SESSION_MAX_IDLE = 60.0
+DEFAULT_MAX_IDLE_SESSIONS = 4
+DEFAULT_WARM_SESSIONS = 1
+MAINTENANCE_INTERVAL = 15.0
+CONNECT_TIMEOUT = 10.0
+RECEIVE_TIMEOUT = 60.0
+DRAIN_TIMEOUT = 5.0
+
+# Output is 48 kbit/s CBR MP3; metadata offsets are in 100 ns ticks
+_TICKS_PER_SECOND = 10_000_000
+_MP3_BITRATE_BPS = 48_000
+_MAX_SSML_TEXT_BYTES = 4096
+
+BOUNDARY_TYPES = ("WordBoundary", "SentenceBoundary")
+
+
+class EdgeSessionError(Exception):
+    """Edge TTS session error."""
+
+    pass
+
+
+def _parse_headers(header: str) -> dict[str, str]:
+    """Parse a message's "Name:value" header lines."""
+    headers = {}
+    for line in header.split("\r\n"):
+        name, separator, value = line.partition(":")
+        if separator:
+            headers[name] = value
+    return headers
+
+
+class EdgeSession:
+    """One websocket connection to the speech service."""
+
+    def __init__(self, http: aiohttp.ClientSession, boundary: str, url: Optional[str] = None):
+        """Initialize session.
+
+        Args:
+            http: HTTP client session to connect with
+            boundary: Metadata the service sends ("WordBoundary" or "SentenceBoundary")
+            url: Service URL (defaults to the Edge read-aloud endpoint)
+        """
+        self.boundary = boundary
+        self.url = url
+        self.created = 0.0
+        self.last_used = 0.0
+        self.requests = 0
+        self._http = http
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._active_request: Optional[str] = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the connection is gone."""
+        return self._ws is None or self._ws.closed
+
+    def usable(self, now: Optional[float] = None) -> bool:
+        """Whether the session can take another request."""
+        now = time.monotonic() if now is None else now
+        return (
+            not self.closed
+            and self._active_request is None
+            and now - self.created < SESSION_MAX_AGE
+            and now - self.last_used < SESSION_MAX_IDLE
+        )
+
+    async def connect(self, retry_forbidden: bool = True) -> None:
+        """Open the websocket and send the synthesis configuration."""
+        if self.url is not None:
+            url, headers, ssl = self.url, WSS_HEADERS, True
+        else:
+            url = (
+                f"{WSS_URL}&ConnectionId={connect_id()}"
+                f"&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
+                f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}"
+            )
+            headers, ssl = DRM.headers_with_muid(WSS_HEADERS), _SSL_CTX
+
+        try:
+            self._ws = await asyncio.wait_for(
+                self._http.ws_connect(url, compress=15, headers=headers, ssl=ssl),
+                CONNECT_TIMEOUT,
+            )
+        except aiohttp.ClientResponseError as e:
+            if e.status != 403 or not retry_forbidden:
+                raise EdgeSessionError(f"Could not connect to Edge TTS: {e}")
+            # Our clock is off from the service's; edge_tts corrects the skew
+            DRM.handle_client_response_error(e)
+            return await self.connect(retry_forbidden=False)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise EdgeSessionError(f"Could not connect to Edge TTS: {e!r}")
+
+        word_boundary = self.boundary == "WordBoundary"
+        await self._send(
+            f"X-Timestamp:{date_to_string()}\r\n"
+            "Content-Type:application/json; charset=utf-8\r\n"
+            "Path:speech.config\r\n\r\n"
+            '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+            f'"sentenceBoundaryEnabled":"{str(not word_boundary).lower()}",'
+            f'"wordBoundaryEnabled":"{str(word_boundary).lower()}"'
+            "},"
+            '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"'
+            "}}}}\r\n"
+        )
+        self.created = self.last_used = time.monotonic()
+
+    async def close(self) -> None:
+        """Close the connection."""
+        ws, self._ws = self._ws, None
+        if ws is not None and not ws.closed:
+            await ws.close()
+
+    async def _send(self, message: str) -> None:
+        """Send one text message."""
+        if self.closed:
+            raise EdgeSessionError("Edge TTS connection is closed")
+        try:
+            await self._ws.send_str(message)
+        except (aiohttp.ClientError, ConnectionError) as e:
+            await self.close()
+            raise EdgeSessionError(f"Edge TTS connection lost: {e!r}")
+
+    async def synthesize(self, config: "TTSConfig", text: str) -> AsyncIterator[dict]:
+        """Speak text, yielding edge_tts-style chunks.
+
+        Chunks are {"type": "audio", "data": bytes} and boundary events
+        {"type", "offset", "duration", "text"} with offsets in 100 ns ticks
+        from the start of the text. Long texts go out as several requests,
+        as edge_tts does.
+        """
+        parts = split_text_by_byte_length(
+            escape(remove_incompatible_characters(text)), _MAX_SSML_TEXT_BYTES
+        )
+        audio_bytes = 0
+        for part in parts:
+            offset = audio_bytes * 8 * _TICKS_PER_SECOND // _MP3_BITRATE_BPS
+            request = self._request(config, part)
+            try:
+                async for chunk in request:
+                    if chunk["type"] == "audio":
+                        audio_bytes += len(chunk["data"])
+                    else:
+                        chunk["offset"] += offset
+                    yield chunk
+            finally:
+                # Finish (or drain) the request before the session is reused
+                await request.aclose()
+
+    async def _request(self, config: "TTSConfig", escaped_text: bytes) -> AsyncIterator[dict]:
+        """Send one SSML request and yield its chunks until the turn ends."""
+        request_id = connect_id()
+        self._active_request = request_id
+        self.requests += 1
+        try:
+            await self._send(
+                ssml_headers_plus_data(request_id, date_to_string(), mkssml(config, escaped_text))
+            )
+            received_audio = False
+            async for chunk in self._receive(request_id):
+                if chunk["type"] == "audio":
+                    received_audio = True
+                yield chunk
+            if not received_audio:
+                raise EdgeSessionError("No audio received from Edge TTS")
+        finally:
+            if self._active_request is not None and not self.closed:
+                # Caller stopped early: let the turn finish so the next request starts clean
+                try:
+                    await asyncio.wait_for(self._drain(request_id), DRAIN_TIMEOUT)
+                except (EdgeSessionError, asyncio.TimeoutError):
+                    await self.close()
+            self._active_request = None
+            self.last_used = time.monotonic()
+
+    async def _drain(self, request_id: str) -> None:
+        """Discard the rest of a request's messages."""
+        async for _ in self._receive(request_id):
+            pass
+
+    async def _receive(self, request_id: str) -> AsyncIterator[dict]:
+        """Yield a request's audio and metadata until its turn.end."""
+        while True:
+            try:
+                message = await self._ws.receive(timeout=RECEIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await self.close()
+                raise EdgeSessionError("Edge TTS stopped responding")
+
+            if message.type == aiohttp.WSMsgType.TEXT:
+                header, _, body = message.data.partition("\r\n\r\n")
+                headers = _parse_headers(header)
+                if headers.get("X-RequestId", request_id) != request_id:
+                    continue  # Left over from an abandoned request
+                path = headers.get("Path")
+                if path == "turn.end":
+                    self._active_request = None
+                    return
+                if path == "audio.metadata":
+                    for event in json.loads(body)["Metadata"]:
+                        if event["Type"] in BOUNDARY_TYPES:
+                            yield {
+                                "type": event["Type"],
+                                "offset": event["Data"]["Offset"],
+                                "duration": event["Data"]["Duration"],
+                                "text": unescape(event["Data"]["text"]["Text"]),
+                            }
+
+            elif message.type == aiohttp.WSMsgType.BINARY:
+                if len(message.data) < 2:
+                    raise EdgeSessionError("Malformed audio message from Edge TTS")
+                header_length = int.from_bytes(message.data[:2], "big")
+                headers = _parse_headers(message.data[2:2 + header_length].decode())
+                if headers.get("X-RequestId", request_id) != request_id:
+                    continue
+                body = message.data[2 + header_length:]
+                if headers.get("Path") == "audio" and body:
+                    yield {"type": "audio", "data": body}
+
+            else:
+                await self.close()
+                raise EdgeSessionError(f"Edge TTS connection closed ({message.type.name})")
+
+
+class EdgeSessionPool:
+    """Warm Edge TTS sessions shared by all voices and requests."""
+
+    def __init__(
+        self,
+        max_idle_sessions: Optional[int] = None,
+        warm_sessions: Optional[int] = None,
+        url: Optional[str] = None,
+    ):
+        """Initialize pool.
+
+        Args:
+            max_idle_sessions: Idle sessions kept open per boundary type
+                (defaults to EDGE_TTS_MAX_IDLE_SESSIONS env)
+            warm_sessions: Sessions kept connected ahead of demand by the
+                maintenance task (defaults to EDGE_TTS_WARM_SESSIONS env)
+            url: Service URL (defaults to the Edge read-aloud endpoint)
+        """
+        if max_idle_sessions is None:
+            max_idle_sessions = int(
+                os.getenv("EDGE_TTS_MAX_IDLE_SESSIONS", DEFAULT_MAX_IDLE_SESSIONS)
+            )
+        if warm_sessions is None:
+            warm_sessions = int(os.getenv("EDGE_TTS_WARM_SESSIONS", DEFAULT_WARM_SESSIONS))
+        self.max_idle_sessions = max_idle_sessions
+        self.warm_sessions = warm_sessions
+        self.url = url
+        self.connects = 0
+        self.reuses = 0
+        self._idle: dict[str, list[EdgeSession]] = {boundary: [] for boundary in BOUNDARY_TYPES}
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._maintenance: Optional[asyncio.Task] = None
+
+    async def _connect(self, boundary: str) -> EdgeSession:
+        """Open a new session."""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(trust_env=True)
+        session = EdgeSession(self._http, boundary, self.url)
+        await session.connect()
+        self.connects += 1
+        return session
+
+    async def _acquire(self, boundary: str) -> EdgeSession:
+        """Take a usable idle session, or open one."""
+        idle = self._idle[boundary]
+        now = time.monotonic()
+        while idle:
+            session = idle.pop()
+            if session.usable(now):
+                self.reuses += 1
+                return session
+            await session.close()
+        return await self._connect(boundary)
+
+    async def _release(self, session: EdgeSession) -> None:
+        """Return a session to the pool, or close it."""
+        idle = self._idle[session.boundary]
+        if session.usable() and len(idle) < self.max_idle_sessions:
+            idle.append(session)
+        else:
+            await session.close()
+
+    async def stream(
+        self,
+        text: str,
+        voice: str,
+        rate: str = "+0%",
+        boundary: str = "SentenceBoundary",
+    ) -> AsyncIterator[dict]:
+        """Speak text on a pooled session, yielding edge_tts-style chunks.
+
+        Args:
+            text: Text to speak
+            voice: Edge TTS voice name
+            rate: Speaking rate, e.g. "-10%"
+            boundary: Boundary events to receive ("WordBoundary" or "SentenceBoundary")
+
+        Raises:
+            EdgeSessionError: If synthesis fails, or sessions are unavailable
+        """
+        if not EDGE_SESSIONS_AVAILABLE:
+            raise EdgeSessionError("Edge TTS sessions need edge-tts 7.3")
+        config = TTSConfig(voice, rate, "+0%", "+0Hz", boundary)
+        for attempt in range(2):
+            session = await self._acquire(boundary)
+            reused = session.requests > 0
+            received = False
+            stream = session.synthesize(config, text)
+            try:
+                async for chunk in stream:
+                    received = True
+                    yield chunk
+                return
+            except EdgeSessionError as e:
+                # A reused connection may have been dropped by the service
+                # while idle: try once more on a new one
+                if received or not reused or attempt:
+                    raise
+                logger.info(f"Reconnecting Edge TTS session: {e}")
+            finally:
+                await stream.aclose()
+                await self._release(session)
+
+    async def start(self) -> None:
+        """Connect warm sessions and keep them fresh in the background."""
+        if not EDGE_SESSIONS_AVAILABLE:
+            return
+        if self._maintenance is None or self._maintenance.done():
+            self._maintenance = asyncio.create_task(self._maintain())
+
+    async def _maintain(self) -> None:
+        """Replace aging sessions and keep warm ones ready."""
+        while True:
+            try:
+                await self.refresh()
+            except EdgeSessionError as e:
+                logger.warning(f"Could not warm Edge TTS sessions: {e}")
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+    async def refresh(self) -> None:
+        """Close sessions near expiry and top up the warm ones."""
+        # Refresh a maintenance interval early so no request gets an expiring session
+        soon = time.monotonic() + MAINTENANCE_INTERVAL
+        for boundary, idle in self._idle.items():
+            keep = [session for session in idle if session.usable(soon)]
+            for session in idle:
+                if session not in keep:
+                    await session.close()
+            idle[:] = keep
+
+        warm = self._idle["SentenceBoundary"]
+        while len(warm) < min(self.warm_sessions, self.max_idle_sessions):
+            warm.append(await self._connect("SentenceBoundary"))
+
+    def get_status(self) -> dict:
+        """Get pool counters for health endpoints and logs."""
+        return {
+            "idle": {boundary: len(idle) for boundary, idle in self._idle.items()},
+            "connects": self.connects,
+            "reuses": self.reuses,
+        }
+
+    async def close(self) -> None:
+        """Stop maintenance and close every session."""
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            try:
+                await self._maintenance
+            except asyncio.CancelledError:
+                pass
+            self._maintenance = None
+        for idle in self._idle.values():
+            for session in idle:
+                await session.close()
+            idle.clear()
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+
+# Global Edge TTS session pool
+edge_sessions = EdgeSessionPool()
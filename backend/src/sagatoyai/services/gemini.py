@@ -1,13 +1,18 @@
 """Google Gemini integration for story generation and conversations."""
 
+import asyncio
 import logging
 import os
 from pathlib import Path
 from typing import Optional
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 
 from sagatoyai.models import Intent
+from sagatoyai.services.intent_classifier import intent_classifier
+from sagatoyai.services.prompt_builder import prompt_builder
+from sagatoyai.services.rate_limiter import DEFAULT_RETRY_AFTER, parse_retry_delay
 
 logger = logging.getLogger(__name__)
 
@@ -50,19 +55,7 @@ Make every story fun, educational, and age-appropriate."""
 
     def _detect_intent(self, user_input: str) -> Intent:
         """Detect user intent from input."""
-        user_lower = user_input.lower()
-        if any(word in user_lower for word in ["weather", "temperature", "rain", "sunny", "väder"]):
-            return Intent.WEATHER
-        elif any(word in user_lower for word in ["story", "tell me", "berättelse", "saga"]):
-            return Intent.STORY
-        elif any(word in user_lower for word in ["sing", "song", "music", "sjung", "sång"]):
-            return Intent.SONG
-        elif any(
-            word in user_lower
-            for word in ["math", "plus", "minus", "times", "divide", "räkna", "matte"]
-        ):
-            return Intent.MATH
-        return Intent.GENERAL
+        return intent_classifier.detect(user_input)
 
     async def generate_response(
         self,
@@ -87,9 +80,17 @@ Make every story fun, educational, and age-appropriate."""
                 system_instruction=system_instruction,
             )
 
-            response = model.generate_content(prompt)
+            # The SDK call blocks, so it runs in a thread to keep the event loop free
+            response = await asyncio.to_thread(model.generate_content, prompt)
             return response.text
 
+        except google_exceptions.ResourceExhausted as e:
+            retry_after = parse_retry_delay(str(e))
+            logger.warning(f"Gemini rate limited, retry after {retry_after}s")
+            raise GeminiError(
+                f"Rate limited: {e}",
+                retry_after=DEFAULT_RETRY_AFTER if retry_after is None else retry_after,
+            )
         except Exception as e:
             logger.error(f"Gemini generation failed: {e}")
             raise GeminiError(f"Failed to generate response: {e}")
@@ -118,7 +119,9 @@ Make every story fun, educational, and age-appropriate."""
 
         except Exception as e:
             logger.error(f"Story generation failed: {e}")
-            raise GeminiError(f"Failed to generate story: {e}")
+            raise GeminiError(
+                f"Failed to generate story: {e}", retry_after=getattr(e, "retry_after", None)
+            )
 
     async def generate_conversation_response(
         self,
@@ -138,43 +141,41 @@ Make every story fun, educational, and age-appropriate."""
         """
         intent = self._detect_intent(user_input)
 
-        if language == "sv":
-            system_instruction = """Du är en vänlig AI-assistent i en gosig leksak som pratar med barn 3-10 år.
-Använd enkelt, varmt och uppmuntrande språk. Håll svaren korta (2-3 meningar).
-Var lekfull och fantasifull. Använd aldrig komplicerade ord eller läskiga ämnen.
-Svara alltid på svenska."""
-        else:
-            system_instruction = """You are a friendly AI assistant inside a plush toy, talking to children aged 3-10.
-Use simple, warm, and encouraging language. Keep responses short (2-3 sentences).
-Be playful and imaginative. Never use complex words or scary topics.
-Always respond in English."""
-
-        # Build prompt with context
-        if context:
-            conversation_history = "\n".join(
-                [f"{msg['role']}: {msg['content']}" for msg in context[-3:]]
-            )
-            full_prompt = f"Previous conversation:\n{conversation_history}\n\nChild: {user_input}"
-        else:
-            full_prompt = user_input
+        built = prompt_builder.build(
+            user_input=user_input,
+            language=language,
+            context=context,
+            provider="gemini",
+        )
 
         try:
             response = await self.generate_response(
-                prompt=full_prompt,
-                system_instruction=system_instruction,
+                prompt=built.as_text(),
+                system_instruction=built.system_instruction,
                 language=language,
             )
             return response, intent
 
         except Exception as e:
             logger.error(f"Conversation generation failed: {e}")
-            raise GeminiError(f"Failed to generate conversation: {e}")
+            raise GeminiError(
+                f"Failed to generate conversation: {e}",
+                retry_after=getattr(e, "retry_after", None),
+            )
 
 
 class GeminiError(Exception):
     """Gemini service error."""
 
-    pass
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        """Initialize error.
+
+        Args:
+            message: Error message
+            retry_after: Seconds to wait before retrying, set when rate limited
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 # Fallback message
@@ -1,12 +1,17 @@
 """Groq LLM service for ultra-fast inference."""
 
+import asyncio
 import logging
 import os
 from typing import Optional, Tuple
 
+import groq
 from groq import Groq
 
 from sagatoyai.models import Intent
+from sagatoyai.services.intent_classifier import intent_classifier
+from sagatoyai.services.prompt_builder import prompt_builder
+from sagatoyai.services.rate_limiter import DEFAULT_RETRY_AFTER, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -32,27 +37,7 @@ class GroqService:
 
     def _detect_intent(self, user_input: str) -> Intent:
         """Detect user intent from input."""
-        user_lower = user_input.lower()
-        if any(
-            word in user_lower
-            for word in ["weather", "temperature", "rain", "sunny", "väder", "vädret"]
-        ):
-            return Intent.WEATHER
-        elif any(
-            word in user_lower
-            for word in ["story", "tell me", "berättelse", "saga", "berätta"]
-        ):
-            return Intent.STORY
-        elif any(
-            word in user_lower for word in ["sing", "song", "music", "sjung", "sång"]
-        ):
-            return Intent.SONG
-        elif any(
-            word in user_lower
-            for word in ["math", "plus", "minus", "times", "divide", "räkna", "matte"]
-        ):
-            return Intent.MATH
-        return Intent.GENERAL
+        return intent_classifier.detect(user_input)
 
     async def generate_response(
         self,
@@ -76,7 +61,9 @@ class GroqService:
             raise GroqError("Groq client not initialized - check API key")
 
         try:
-            chat_completion = self.client.chat.completions.create(
+            # The SDK call blocks, so it runs in a thread to keep the event loop free
+            chat_completion = await asyncio.to_thread(
+                self.client.chat.completions.create,
                 messages=[
                     {"role": "system", "content": system_instruction},
                     {"role": "user", "content": prompt},
@@ -88,6 +75,13 @@ class GroqService:
 
             return chat_completion.choices[0].message.content
 
+        except groq.RateLimitError as e:
+            retry_after = parse_retry_after(e.response.headers)
+            logger.warning(f"Groq rate limited, retry after {retry_after}s")
+            raise GroqError(
+                f"Rate limited: {e}",
+                retry_after=DEFAULT_RETRY_AFTER if retry_after is None else retry_after,
+            )
         except Exception as e:
             logger.error(f"Groq generation failed: {e}")
             raise GroqError(f"Failed to generate response: {e}")
@@ -110,32 +104,17 @@ class GroqService:
         """
         intent = self._detect_intent(user_input)
 
-        if language == "sv":
-            system_instruction = """Du är en vänlig AI-assistent i en gosig leksak som pratar med barn 3-10 år.
-Använd enkelt, varmt och uppmuntrande språk. Håll svaren korta (2-3 meningar).
-Var lekfull och fantasifull. Använd aldrig komplicerade ord eller läskiga ämnen.
-Svara alltid på svenska."""
-        else:
-            system_instruction = """You are a friendly AI assistant inside a plush toy, talking to children aged 3-10.
-Use simple, warm, and encouraging language. Keep responses short (2-3 sentences).
-Be playful and imaginative. Never use complex words or scary topics.
-Always respond in English."""
-
-        # Build prompt with context
-        if context:
-            conversation_history = "\n".join(
-                [f"{msg['role']}: {msg['content']}" for msg in context[-3:]]
-            )
-            full_prompt = (
-                f"Previous conversation:\n{conversation_history}\n\nChild: {user_input}"
-            )
-        else:
-            full_prompt = user_input
+        built = prompt_builder.build(
+            user_input=user_input,
+            language=language,
+            context=context,
+            provider="groq",
+        )
 
         try:
             response = await self.generate_response(
-                prompt=full_prompt,
-                system_instruction=system_instruction,
+                prompt=built.as_text(),
+                system_instruction=built.system_instruction,
                 temperature=0.7,
                 max_tokens=200,
             )
@@ -143,13 +122,24 @@ Always respond in English."""
 
         except Exception as e:
             logger.error(f"Conversation generation failed: {e}")
-            raise GroqError(f"Failed to generate conversation: {e}")
+            raise GroqError(
+                f"Failed to generate conversation: {e}",
+                retry_after=getattr(e, "retry_after", None),
+            )
 
 
 class GroqError(Exception):
     """Groq service error."""
 
-    pass
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        """Initialize error.
+
+        Args:
+            message: Error message
+            retry_after: Seconds to wait before retrying, set when rate limited
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 # Fallback message
@@ -0,0 +1,203 @@
+"""Lightweight intent classifier shared by all LLM services.
+
+A linear model over character n-grams of each word, trained on a labeled
+English/Swedish set (see scripts/train_intent_classifier.py) and shipped as
+precomputed weights. Word-boundary markers keep "rain" from matching
+"train", and scoring is a handful of dict lookups per class, so a
+transcript is classified in tens of microseconds.
+"""
+
+import json
+import logging
+import math
+import random
+import re
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Optional
+
+from sagatoyai.models import Intent
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = Path(__file__).parent.parent / "data" / "intent_model.json"
+
+NGRAM_SIZES = (2, 3, 4)
+
+# Below this confidence the classifier answers GENERAL
+DEFAULT_CONFIDENCE_THRESHOLD = 0.6
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+|\d+")
+NUMBER_FEATURE = "<num>"
+
+
+def extract_features(text: str) -> set[str]:
+    """Extract word-bounded character n-grams from text.
+
+    Each word is padded as "<word>" so n-grams at word edges differ from
+    the same letters inside a longer word. The padded word itself is also
+    a feature. Every number is the single feature NUMBER_FEATURE, so "5"
+    and "6" count the same however few of them the training data has.
+    """
+    features = set()
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if word.isdigit():
+            features.add(NUMBER_FEATURE)
+            continue
+        padded = f"<{word}>"
+        features.add(padded)
+        for size in NGRAM_SIZES:
+            for start in range(len(padded) - size + 1):
+                features.add(padded[start:start + size])
+    return features
+
+
+@dataclass
+class IntentPrediction:
+    """Classifier output."""
+
+    intent: Intent
+    confidence: float
+    scores: dict[Intent, float]
+
+
+class IntentClassifier:
+    """Linear char-n-gram intent classifier with precomputed weights."""
+
+    def __init__(
+        self,
+        model_path: Optional[Path] = None,
+        confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+    ):
+        """Initialize classifier.
+
+        Args:
+            model_path: Path to weights JSON (defaults to the bundled model)
+            confidence_threshold: Minimum confidence to trust a non-GENERAL intent
+        """
+        self.model_path = model_path or MODEL_PATH
+        self.confidence_threshold = confidence_threshold
+        self._intents: list[Intent] = []
+        self._bias: list[float] = []
+        self._weights: list[dict[str, float]] = []
+
+    def _load(self) -> None:
+        """Load weights from disk on first use."""
+        model = json.loads(self.model_path.read_text(encoding="utf-8"))
+        self.load_weights(model)
+        logger.info(
+            f"Loaded intent model with {sum(len(w) for w in self._weights)} weights"
+        )
+
+    def load_weights(self, model: dict) -> None:
+        """Load a model dict as produced by train_intent_model()."""
+        self._intents = [Intent(name) for name in model["intents"]]
+        self._bias = list(model["bias"])
+        self._weights = [dict(weights) for weights in model["weights"]]
+
+    def classify(self, text: str) -> IntentPrediction:
+        """Classify text into an intent with a confidence score.
+
+        Args:
+            text: Transcript of what the child said
+
+        Returns:
+            IntentPrediction; GENERAL if confidence is below the threshold
+        """
+        if not self._weights:
+            self._load()
+
+        features = extract_features(text)
+        logits = [
+            bias + sum(map(weights.get, features, repeat(0.0)))
+            for bias, weights in zip(self._bias, self._weights)
+        ]
+        probabilities = _softmax(logits)
+        best = max(range(len(probabilities)), key=probabilities.__getitem__)
+
+        intent = self._intents[best]
+        confidence = probabilities[best]
+        if confidence < self.confidence_threshold:
+            intent = Intent.GENERAL
+
+        return IntentPrediction(
+            intent=intent,
+            confidence=confidence,
+            scores=dict(zip(self._intents, probabilities)),
+        )
+
+    def detect(self, text: str) -> Intent:
+        """Get the intent for text."""
+        return self.classify(text).intent
+
+
+def _softmax(logits: list[float]) -> list[float]:
+    """Convert logits to probabilities."""
+    top = max(logits)
+    exps = [math.exp(logit - top) for logit in logits]
+    total = sum(exps)
+    return [value / total for value in exps]
+
+
+def train_intent_model(
+    examples: Iterable[tuple[str, Intent]],
+    epochs: int = 40,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+    seed: int = 0,
+    prune_below: float = 0.01,
+) -> dict:
+    """Train multinomial logistic regression weights.
+
+    Args:
+        examples: (text, intent) pairs
+        epochs: Passes over the data
+        learning_rate: Initial SGD step size (decays per epoch)
+        l2: L2 regularization strength
+        seed: Shuffle seed, for reproducible weights
+        prune_below: Drop weights smaller than this from the output
+
+    Returns:
+        Model dict with "intents", "bias" and "weights" keys
+    """
+    intents = list(Intent)
+    data = [(extract_features(text), intents.index(intent)) for text, intent in examples]
+    rng = random.Random(seed)
+
+    bias = [0.0] * len(intents)
+    weights: list[dict[str, float]] = [{} for _ in intents]
+
+    for epoch in range(epochs):
+        rng.shuffle(data)
+        rate = learning_rate / (1 + epoch * 0.1)
+        for features, label in data:
+            logits = [
+                b + sum(w.get(f, 0.0) for f in features) for b, w in zip(bias, weights)
+            ]
+            probabilities = _softmax(logits)
+            for index, probability in enumerate(probabilities):
+                gradient = probability - (1.0 if index == label else 0.0)
+                bias[index] -= rate * gradient
+                class_weights = weights[index]
+                for feature in features:
+                    value = class_weights.get(feature, 0.0)
+                    class_weights[feature] = value - rate * (gradient + l2 * value)
+
+    return {
+        "intents": [intent.value for intent in intents],
+        "ngram_sizes": list(NGRAM_SIZES),
+        "bias": [round(b, 4) for b in bias],
+        "weights": [
+            {
+                feature: round(value, 4)
+                for feature, value in sorted(class_weights.items())
+                if abs(value) >= prune_below
+            }
+            for class_weights in weights
+        ],
+    }
+
+
+# Global intent classifier instance
+intent_classifier = IntentClassifier()
@@ -0,0 +1,170 @@
+"""Intent router - answer intents with a local source of truth before the LLM.
+
+Some questions have a correct answer we can compute ourselves (weather from
+Open-Meteo, simple arithmetic) or already have on disk (pre-generated
+library stories). Sending those to Groq/Gemini costs a round
+trip and the LLM would only guess. The router handles them locally and
+passes everything else on to the LLM fallback chain.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from sagatoyai.models import Intent, WeatherData
+from sagatoyai.services.intent_classifier import intent_classifier
+from sagatoyai.services.language import get_weather_description_language
+from sagatoyai.services.llm_fallback import (
+    LLMProvider,
+    LLMResult,
+    llm_fallback_service,
+)
+from sagatoyai.services.math_solver import solve_math
+from sagatoyai.services.story_library import get_story_audio_path, story_catalog
+from sagatoyai.services.weather import extract_location, weather_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEATHER_LOCATION = "stockholm"
+
+# Display names for LOCATIONS keys in Swedish answers
+SWEDISH_LOCATION_NAMES = {
+    "stockholm": "Stockholm",
+    "gothenburg": "Göteborg",
+    "malmo": "Malmö",
+}
+
+# "Why does it rain?" is weather chatter, not a request for the forecast
+_EXPLANATION_QUESTION = re.compile(
+    r"^\W*(?:\w+\W+){0,2}?(why|how come|varför|hur kommer)\b", re.IGNORECASE
+)
+
+LocalHandler = Callable[[str, str], Awaitable[Optional[str]]]
+
+
+def format_weather_answer(weather: WeatherData, location: str, language: str) -> str:
+    """Turn weather data into a short child-friendly answer.
+
+    Args:
+        weather: Current weather from WeatherService
+        location: LOCATIONS key the weather is for
+        language: Language code ('en' or 'sv')
+
+    Returns:
+        Answer text in the requested language
+    """
+    temperature = round(weather.temperature_celsius)
+
+    if language != "sv":
+        return f"In {weather.location} it's {temperature} degrees! {weather.description}"
+
+    templates = get_weather_description_language("sv")
+    name = SWEDISH_LOCATION_NAMES.get(location, weather.location)
+    answer = f"I {name} är det {temperature} grader."
+    if weather.condition in templates:
+        answer += f" {templates[weather.condition]}"
+    if temperature < 5:
+        answer += f" {templates['cold']}"
+    elif temperature >= 20:
+        answer += f" {templates['warm']}"
+    return answer
+
+
+def _read_story_text(path: Path) -> Optional[str]:
+    """Read a library story's text, or None if it isn't generated yet."""
+    if not path.is_file():
+        return None
+    return path.read_text(encoding="utf-8")
+
+
+class IntentRouter:
+    """Routes a conversation turn to a local handler or the LLM."""
+
+    def __init__(self):
+        """Initialize router with local handlers per intent."""
+        self._handlers: dict[Intent, LocalHandler] = {
+            Intent.WEATHER: self._handle_weather,
+            Intent.MATH: self._handle_math,
+            Intent.STORY: self._handle_story,
+        }
+
+    async def _handle_weather(self, user_input: str, language: str) -> Optional[str]:
+        """Answer a weather question from the weather service."""
+        if _EXPLANATION_QUESTION.search(user_input):
+            return None
+
+        location = extract_location(user_input) or DEFAULT_WEATHER_LOCATION
+        weather = await weather_service.get_weather(location)
+        return format_weather_answer(weather, location, language)
+
+    async def _handle_math(self, user_input: str, language: str) -> Optional[str]:
+        """Answer simple spoken arithmetic without the LLM."""
+        return solve_math(user_input, language)
+
+    async def _handle_story(self, user_input: str, language: str) -> Optional[str]:
+        """Tell a library story matching the request if its text is already generated."""
+        matches = story_catalog.search(user_input, limit=1)
+        if not matches:
+            return None
+
+        match = matches[0]
+        audio_path = get_story_audio_path(match.series_id, match.story_id, language)
+        # Disk reads stay off the event loop
+        text = await asyncio.to_thread(_read_story_text, audio_path.with_suffix(".txt"))
+        if text is not None:
+            logger.info(f"Telling library story {match.story_id} (score {match.score:.1f})")
+        return text
+
+    async def generate_response(
+        self,
+        user_input: str,
+        language: str = "sv",
+        context: Optional[list] = None,
+    ) -> LLMResult:
+        """Answer locally when possible, otherwise ask the LLM.
+
+        Args:
+            user_input: User's message
+            language: Language code ('en' or 'sv')
+            context: Previous conversation context
+
+        Returns:
+            LLMResult; provider is LOCAL when no LLM was called
+        """
+        prediction = intent_classifier.classify(user_input)
+        intent = prediction.intent
+        handler = self._handlers.get(intent)
+
+        if handler is not None:
+            start_time = time.time()
+            try:
+                text = await handler(user_input, language)
+            except Exception as e:
+                logger.warning(f"Local {intent.value} handler failed, using LLM: {e}")
+                text = None
+
+            if text:
+                latency_ms = (time.time() - start_time) * 1000
+                logger.info(
+                    f"Answered {intent.value} locally in {latency_ms:.0f}ms "
+                    f"(confidence {prediction.confidence:.2f})"
+                )
+                return LLMResult(
+                    text=text,
+                    intent=intent,
+                    provider=LLMProvider.LOCAL,
+                    latency_ms=latency_ms,
+                )
+
+        return await llm_fallback_service.generate_response(
+            user_input=user_input,
+            language=language,
+            context=context,
+        )
+
+
+# Global intent router instance
+intent_router = IntentRouter()
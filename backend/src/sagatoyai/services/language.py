@@ -1,66 +1,152 @@
 """Language detection and management."""
 
+import json
 import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
 from typing import Optional
 
+from sagatoyai.services.prompt_builder import SYSTEM_PROMPTS
+
 logger = logging.getLogger(__name__)
 
-# Swedish keywords for detection
-SWEDISH_KEYWORDS = [
-    "hej",
-    "hallå",
-    "tjena",
-    "morsning",
-    "godmorgon",
-    "godnatt",
-    "tack",
-    "varsågod",
-    "förlåt",
-    "ja",
-    "nej",
-]
-
-# English keywords for detection
-ENGLISH_KEYWORDS = [
-    "hello",
-    "hi",
-    "hey",
-    "good morning",
-    "good night",
-    "thanks",
-    "please",
-    "sorry",
-    "yes",
-    "no",
-]
-
-
-def detect_language(text: str) -> str:
-    """Detect language from text.
+LANGUAGE_MODEL_PATH = Path(__file__).parent.parent / "data" / "language_model.json"
+
+# Below this confidence detect_language() returns the caller's default
+DEFAULT_CONFIDENCE_THRESHOLD = 0.6
+
+_NON_LETTERS = re.compile(r"[^\w']+|[\d_]+")
+
+
+def extract_trigrams(text: str) -> list[str]:
+    """Get character trigrams of text, with spaces marking word edges."""
+    normalized = " " + _NON_LETTERS.sub(" ", text.lower()).strip() + " "
+    if len(normalized) < 3 or not normalized.strip():
+        return []
+    return [normalized[i:i + 3] for i in range(len(normalized) - 2)]
+
+
+@dataclass
+class LanguageGuess:
+    """Language identification result."""
+
+    language: str
+    confidence: float
+    scores: dict[str, float]
+
+
+class LanguageIdentifier:
+    """Character-trigram language identifier.
+
+    Each language has a table of trigram log-probabilities (see
+    scripts/train_language_model.py). A text's score per language is the sum
+    of its trigrams' log-probabilities, and confidence is the softmax of
+    those scores. Adding a language only needs a corpus and a retrain.
+    """
+
+    def __init__(self, model_path: Optional[Path] = None):
+        """Initialize identifier.
+
+        Args:
+            model_path: Path to model JSON (defaults to the bundled model)
+        """
+        self.model_path = model_path or LANGUAGE_MODEL_PATH
+        self._tables: dict[str, dict[str, float]] = {}
+        self._floors: dict[str, float] = {}
+
+    def load_model(self, model: dict) -> None:
+        """Load a model dict as produced by train_language_model()."""
+        self._tables = {lang: dict(info["logprobs"]) for lang, info in model.items()}
+        self._floors = {lang: info["floor"] for lang, info in model.items()}
+
+    @property
+    def languages(self) -> list[str]:
+        """Languages the model can identify."""
+        if not self._tables:
+            self.load_model(json.loads(self.model_path.read_text(encoding="utf-8")))
+        return list(self._tables)
+
+    def identify(self, text: str) -> Optional[LanguageGuess]:
+        """Identify the language of text.
+
+        Args:
+            text: Input text to analyze
+
+        Returns:
+            LanguageGuess, or None if the text has no letters to go on
+        """
+        languages = self.languages
+        trigrams = extract_trigrams(text)
+        if not trigrams:
+            return None
+
+        scores = {
+            lang: sum(map(self._tables[lang].get, trigrams, repeat(self._floors[lang])))
+            for lang in languages
+        }
+        top = max(scores.values())
+        exps = {lang: math.exp(score - top) for lang, score in scores.items()}
+        total = sum(exps.values())
+        best = max(exps, key=exps.get)
+
+        return LanguageGuess(
+            language=best,
+            confidence=exps[best] / total,
+            scores=scores,
+        )
+
+
+def train_language_model(corpora: dict[str, str], top_n: int = 4000, k: float = 0.5) -> dict:
+    """Build trigram log-probability tables from text corpora.
 
     Args:
-        text: Input text to analyze
+        corpora: Mapping of language code -> training text
+        top_n: Keep this many most frequent trigrams per language
+        k: Add-k smoothing constant
 
     Returns:
-        Language code: 'sv' for Swedish, 'en' for English
+        Model dict mapping language -> {"floor", "logprobs"}
     """
-    text_lower = text.lower()
+    counts = {lang: Counter(extract_trigrams(text)) for lang, text in corpora.items()}
+    vocabulary = set().union(*counts.values())
+
+    model = {}
+    for lang, lang_counts in counts.items():
+        denominator = sum(lang_counts.values()) + k * len(vocabulary)
+        model[lang] = {
+            "floor": round(math.log(k / denominator), 3),
+            "logprobs": {
+                trigram: round(math.log((count + k) / denominator), 3)
+                for trigram, count in lang_counts.most_common(top_n)
+            },
+        }
+    return model
 
-    # Check for Swedish keywords
-    swedish_matches = sum(
-        1 for keyword in SWEDISH_KEYWORDS if keyword in text_lower)
 
-    # Check for English keywords
-    english_matches = sum(
-        1 for keyword in ENGLISH_KEYWORDS if keyword in text_lower)
+language_identifier = LanguageIdentifier()
 
-    # Return detected language
-    if swedish_matches > english_matches:
-        logger.info(f"Detected Swedish language (matches: {swedish_matches})")
-        return "sv"
-    else:
-        logger.info(f"Detected English language (matches: {english_matches})")
-        return "en"
+
+def detect_language(text: str, default: str = "en") -> str:
+    """Detect language from text.
+
+    Args:
+        text: Input text to analyze
+        default: Language to assume when the text is too short or ambiguous
+
+    Returns:
+        Language code, e.g. 'sv' for Swedish, 'en' for English
+    """
+    guess = language_identifier.identify(text)
+    if guess is None or guess.confidence < DEFAULT_CONFIDENCE_THRESHOLD:
+        logger.debug(f"Language uncertain, using default '{default}'")
+        return default
+
+    logger.debug(f"Detected language {guess.language} (confidence {guess.confidence:.2f})")
+    return guess.language
 
 
 def get_system_prompt(language: str) -> str:
@@ -72,16 +158,7 @@ def get_system_prompt(language: str) -> str:
     Returns:
         System prompt in the specified language
     """
-    if language == "sv":
-        return """Du är en vänlig AI-assistent i en gosig leksak som pratar med barn mellan 3-10 år.
-Använd enkelt, varmt och uppmuntrande språk. Håll svaren korta (2-3 meningar).
-Var lekfull och fantasifull. Använd aldrig komplicerade ord eller läskiga ämnen.
-Svara alltid på svenska."""
-    else:
-        return """You are a friendly AI assistant inside a plush toy, talking to children aged 3-10.
-Use simple, warm, and encouraging language. Keep responses short (2-3 sentences).
-Be playful and imaginative. Never use complex words or scary topics.
-Always respond in English."""
+    return SYSTEM_PROMPTS.get(language, SYSTEM_PROMPTS["en"])
 
 
 def get_tts_voice(language: str) -> str:
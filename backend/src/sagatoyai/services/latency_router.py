@@ -0,0 +1,154 @@
+"""Latency-aware ordering of LLM providers.
+
+Provider speed changes through the day, and differs by language and by
+kind of question. LatencyRouter keeps an exponentially weighted average
+of latency and error rate, plus a window of recent latencies for p95,
+for every (provider, language, intent). Providers are tried in order of
+expected time to an answer: the average latency, plus the time a failure
+costs weighted by how often the provider fails. A small share of
+requests tries a random other provider first, so the estimates of
+providers that aren't currently first stay fresh.
+"""
+
+import random
+from collections import deque
+from typing import Optional, Sequence
+
+DEFAULT_SMOOTHING = 0.2
+DEFAULT_EXPLORATION_RATE = 0.05
+# Recent latencies kept per key for percentiles
+LATENCY_WINDOW = 50
+# Time a failed call costs before the next provider answers
+FAILURE_PENALTY_MS = 5000.0
+
+
+class LatencyStats:
+    """Latency and error statistics for one key."""
+
+    def __init__(self, smoothing: float = DEFAULT_SMOOTHING):
+        """Initialize empty statistics.
+
+        Args:
+            smoothing: Weight of each new call in the averages
+        """
+        self.smoothing = smoothing
+        self.calls = 0
+        self.ewma_ms: Optional[float] = None  # Successful calls only
+        self.error_rate = 0.0
+        self._recent_ms: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency_ms: float, success: bool) -> None:
+        """Record one call."""
+        self.calls += 1
+        self.error_rate += self.smoothing * ((0.0 if success else 1.0) - self.error_rate)
+        if not success:
+            return
+        self._recent_ms.append(latency_ms)
+        if self.ewma_ms is None:
+            self.ewma_ms = latency_ms
+        else:
+            self.ewma_ms += self.smoothing * (latency_ms - self.ewma_ms)
+
+    def p95_ms(self) -> Optional[float]:
+        """95th percentile of recent successful latencies."""
+        if not self._recent_ms:
+            return None
+        ordered = sorted(self._recent_ms)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    def expected_ms(self) -> Optional[float]:
+        """Expected time to an answer, or None before the first call."""
+        if self.ewma_ms is None:
+            # Every call so far failed
+            return FAILURE_PENALTY_MS if self.calls else None
+        return self.ewma_ms + self.error_rate * FAILURE_PENALTY_MS
+
+    def get_status(self) -> dict:
+        """Get statistics for health endpoints and logs."""
+        p95 = self.p95_ms()
+        expected = self.expected_ms()
+        return {
+            "calls": self.calls,
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "expected_ms": round(expected, 1) if expected is not None else None,
+        }
+
+
+class LatencyRouter:
+    """Orders providers by expected time to an answer."""
+
+    def __init__(
+        self,
+        smoothing: float = DEFAULT_SMOOTHING,
+        exploration_rate: float = DEFAULT_EXPLORATION_RATE,
+        rng: Optional[random.Random] = None,
+    ):
+        """Initialize router.
+
+        Args:
+            smoothing: Weight of each new call in the averages
+            exploration_rate: Share of requests that try another provider first
+            rng: Random source for exploration
+        """
+        self.smoothing = smoothing
+        self.exploration_rate = exploration_rate
+        self._rng = rng or random.Random()
+        # Keyed by (provider, language, intent), and (provider, None, None)
+        # across all requests, used for keys without calls of their own
+        self._stats: dict[tuple[str, Optional[str], Optional[str]], LatencyStats] = {}
+
+    def _get(self, key: tuple[str, Optional[str], Optional[str]]) -> LatencyStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = LatencyStats(self.smoothing)
+        return stats
+
+    def record(
+        self, provider: str, language: str, intent: str, latency_ms: float, success: bool
+    ) -> None:
+        """Record the outcome of a call."""
+        self._get((provider, language, intent)).record(latency_ms, success)
+        self._get((provider, None, None)).record(latency_ms, success)
+
+    def expected_ms(self, provider: str, language: str, intent: str) -> Optional[float]:
+        """Expected time to an answer, or None if the provider is unmeasured."""
+        for key in ((provider, language, intent), (provider, None, None)):
+            stats = self._stats.get(key)
+            if stats is not None and stats.expected_ms() is not None:
+                return stats.expected_ms()
+        return None
+
+    def order(self, providers: Sequence[str], language: str, intent: str) -> list[str]:
+        """Order providers, fastest expected first.
+
+        Unmeasured providers go first, so each gets measured once; ties
+        keep the given order. Once all are measured, exploration sometimes
+        moves another provider to the front.
+        """
+        expected = {
+            provider: self.expected_ms(provider, language, intent) for provider in providers
+        }
+        ordered = sorted(providers, key=lambda provider: expected[provider] or 0.0)
+        if (
+            len(ordered) > 1
+            and None not in expected.values()
+            and self._rng.random() < self.exploration_rate
+        ):
+            explored = self._rng.choice(ordered[1:])
+            ordered.remove(explored)
+            ordered.insert(0, explored)
+        return ordered
+
+    def get_status(self, provider: str) -> dict:
+        """Statistics for a provider, overall and per language and intent."""
+        overall = self._stats.get((provider, None, None))
+        return {
+            "overall": overall.get_status() if overall else None,
+            "by_request": {
+                f"{language}:{intent}": stats.get_status()
+                for (name, language, intent), stats in self._stats.items()
+                if name == provider and language is not None
+            },
+        }
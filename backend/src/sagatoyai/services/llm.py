@@ -7,6 +7,8 @@ from typing import Optional
 import httpx
 
 from sagatoyai.models import Intent
+from sagatoyai.services.intent_classifier import intent_classifier
+from sagatoyai.services.prompt_builder import prompt_builder
 
 logger = logging.getLogger(__name__)
 
@@ -27,41 +29,28 @@ class LLMService:
         """Initialize LLM service."""
         self.ollama_url = ollama_url
         self.model = "llama3.1"
-        self.system_prompt = """You are a friendly AI assistant inside a plush toy, talking to children aged 3-10.
-Use simple, warm, and encouraging language. Keep responses short (2-3 sentences).
-Be playful and imaginative. Never use complex words or scary topics."""
 
     def _detect_intent(self, user_input: str) -> Intent:
         """Detect user intent from input."""
-        user_lower = user_input.lower()
-        if any(word in user_lower for word in ["weather", "temperature", "rain", "sunny"]):
-            return Intent.WEATHER
-        elif any(word in user_lower for word in ["story", "tell me about", "once upon"]):
-            return Intent.STORY
-        elif any(word in user_lower for word in ["sing", "song", "music"]):
-            return Intent.SONG
-        elif any(
-            word in user_lower for word in ["math", "plus", "minus", "times", "divide", "calculate"]
-        ):
-            return Intent.MATH
-        return Intent.GENERAL
+        return intent_classifier.detect(user_input)
 
     async def generate_response(
         self,
         prompt: str,
         session_id: str,
         context: Optional[list] = None,
+        language: str = "en",
     ) -> LLMResponse:
         """Generate response to user input."""
         try:
             intent = self._detect_intent(prompt)
 
-            messages = [{"role": "system", "content": self.system_prompt}]
-
-            if context:
-                messages.extend(context)
-
-            messages.append({"role": "user", "content": prompt})
+            messages = prompt_builder.build(
+                user_input=prompt,
+                language=language,
+                context=context,
+                provider="ollama",
+            ).as_messages()
 
             async with httpx.AsyncClient(timeout=30.0) as client:
                 response = await client.post(
@@ -104,7 +93,10 @@ Be playful and imaginative. Never use complex words or scary topics."""
                     json={
                         "model": self.model,
                         "messages": [
-                            {"role": "system", "content": self.system_prompt},
+                            {
+                                "role": "system",
+                                "content": prompt_builder.get_system_prompt("en", "ollama"),
+                            },
                             {"role": "user", "content": story_prompt},
                         ],
                         "stream": False,
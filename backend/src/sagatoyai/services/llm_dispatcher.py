@@ -0,0 +1,172 @@
+"""Priority scheduling of LLM calls.
+
+Live conversation turns, story generation and background jobs share the
+same provider quotas. LLMDispatcher hands out call slots by request
+class: a waiting interactive turn is always served before any queued
+story or background job, and stories and background jobs each have a
+concurrency cap below the total, so they can never take every slot. A
+burst of bedtime stories therefore queues behind "hej Saga" instead of
+in front of it. Queue times are tracked per class.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from sagatoyai.services.latency_router import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_STORY_CONCURRENCY = 2
+DEFAULT_BACKGROUND_CONCURRENCY = 1
+
+
+class RequestClass(str, Enum):
+    """Kinds of LLM work, highest priority first."""
+
+    INTERACTIVE = "interactive"  # A child is waiting for the answer
+    STORY = "story"  # Live story generation
+    BACKGROUND = "background"  # Nobody is waiting
+
+    @property
+    def priority(self) -> int:
+        """Queue position of the class, 0 for the most urgent."""
+        return _PRIORITY[self]
+
+
+_PRIORITY = {request_class: priority for priority, request_class in enumerate(RequestClass)}
+
+
+class LLMDispatcher:
+    """Priority queue of LLM call slots with per-class concurrency caps."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        class_limits: Optional[dict[RequestClass, int]] = None,
+    ):
+        """Initialize dispatcher.
+
+        Args:
+            max_concurrency: Calls running at once across all classes
+                (defaults to LLM_MAX_CONCURRENCY)
+            class_limits: Caps per class (default from LLM_STORY_CONCURRENCY
+                and LLM_BACKGROUND_CONCURRENCY; interactive turns are only
+                limited by the total)
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+        if class_limits is None:
+            class_limits = {
+                RequestClass.STORY: int(
+                    os.getenv("LLM_STORY_CONCURRENCY", DEFAULT_STORY_CONCURRENCY)
+                ),
+                RequestClass.BACKGROUND: int(
+                    os.getenv("LLM_BACKGROUND_CONCURRENCY", DEFAULT_BACKGROUND_CONCURRENCY)
+                ),
+            }
+        self.max_concurrency = max_concurrency
+        self.class_limits = {
+            request_class: min(class_limits.get(request_class, max_concurrency), max_concurrency)
+            for request_class in RequestClass
+        }
+        self._running = {request_class: 0 for request_class in RequestClass}
+        # (priority, arrival, class, future) of callers waiting for a slot
+        self._waiters: list[tuple[int, int, RequestClass, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._queue_times = {request_class: LatencyStats() for request_class in RequestClass}
+
+    def _has_room(self, request_class: RequestClass) -> bool:
+        return (
+            sum(self._running.values()) < self.max_concurrency
+            and self._running[request_class] < self.class_limits[request_class]
+        )
+
+    def _dispatch(self) -> None:
+        """Start waiters in priority order while there is room.
+
+        A waiter blocked only by its class cap doesn't hold up lower
+        classes, but nothing is started past a waiter blocked by the total.
+        """
+        blocked = []
+        while self._waiters:
+            entry = heapq.heappop(self._waiters)
+            _, _, request_class, future = entry
+            if future.done():
+                continue  # Cancelled while waiting
+            if sum(self._running.values()) >= self.max_concurrency:
+                blocked.append(entry)
+                break
+            if not self._has_room(request_class):
+                blocked.append(entry)
+                continue
+            self._running[request_class] += 1
+            future.set_result(None)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    @asynccontextmanager
+    async def slot(self, request_class: RequestClass) -> AsyncIterator[None]:
+        """Hold an LLM call slot for the duration of the block."""
+        queued_at = time.monotonic()
+        if not self._waiters and self._has_room(request_class):
+            self._running[request_class] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(
+                self._waiters,
+                (_PRIORITY[request_class], next(self._arrivals), request_class, future),
+            )
+            self._dispatch()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was granted just as we were cancelled
+                    self._running[request_class] -= 1
+                    self._dispatch()
+                raise
+
+        wait_ms = (time.monotonic() - queued_at) * 1000
+        self._queue_times[request_class].record(wait_ms, True)
+        if wait_ms > 1000:
+            logger.info(f"{request_class.value} LLM call waited {wait_ms:.0f}ms for a slot")
+        try:
+            yield
+        finally:
+            self._running[request_class] -= 1
+            self._dispatch()
+
+    def get_status(self) -> dict:
+        """Slots, queue lengths and queue times per class."""
+        waiting = {request_class: 0 for request_class in RequestClass}
+        for _, _, request_class, future in self._waiters:
+            if not future.done():
+                waiting[request_class] += 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "classes": {
+                request_class.value: {
+                    "running": self._running[request_class],
+                    "waiting": waiting[request_class],
+                    "limit": self.class_limits[request_class],
+                    "queue_time": {
+                        key: value
+                        for key, value in self._queue_times[request_class].get_status().items()
+                        if key in ("calls", "ewma_ms", "p95_ms")
+                    },
+                }
+                for request_class in RequestClass
+            },
+        }
+
+
+# Global LLM dispatcher
+llm_dispatcher = LLMDispatcher()
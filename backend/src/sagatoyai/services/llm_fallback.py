@@ -5,16 +5,32 @@ Provides resilience by trying multiple LLM providers in sequence.
 """
 
 import logging
+import os
+import time
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional, Callable, Awaitable
 
 from sagatoyai.models import Intent
+from sagatoyai.services.circuit_breaker import CircuitBreaker, CircuitState
 from sagatoyai.services.groq_service import groq_service, GroqError
+from sagatoyai.services.intent_classifier import intent_classifier
+from sagatoyai.services.latency_router import DEFAULT_EXPLORATION_RATE, LatencyRouter
+from sagatoyai.services.llm_dispatcher import LLMDispatcher, RequestClass, llm_dispatcher
 from sagatoyai.services.gemini import gemini_service, GeminiError
+from sagatoyai.services.rate_limiter import ProviderRateLimiter, RateLimitError
+from sagatoyai.services.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
+# Requests per minute we may send each provider (free-tier quotas),
+# overridden by <PROVIDER>_REQUESTS_PER_MINUTE; 0 or unset means no limit
+DEFAULT_REQUESTS_PER_MINUTE = {"groq": 30, "gemini": 10}
+# How long a turn may wait in a provider's queue before trying the next one
+DEFAULT_QUEUE_TIMEOUT = 2.0
+# Stories aren't waited on live, so they can queue longer
+STORY_QUEUE_TIMEOUT = 30.0
+
 
 class LLMProvider(str, Enum):
     """Available LLM providers."""
@@ -22,6 +38,7 @@ class LLMProvider(str, Enum):
     GROQ = "groq"
     GEMINI = "gemini"
     OLLAMA = "ollama"
+    LOCAL = "local"  # Answered by a local handler, no LLM call
 
 
 @dataclass
@@ -34,52 +51,109 @@ class LLMResult:
     latency_ms: float
     fallback_used: bool = False
     fallback_reason: Optional[str] = None
+    cached: bool = False
+    # Seconds until a rate-limited provider takes requests again, set on
+    # the fallback message when rate limits were part of the failure
+    retry_after: Optional[float] = None
+
+
+class StoryGenerationError(Exception):
+    """No provider could generate a story."""
 
 
 class LLMFallbackService:
     """LLM service with automatic fallback between providers.
 
-    Tries providers in order of preference:
+    Tries providers in order of expected time to an answer, measured per
+    language and intent (see LatencyRouter). Until there are measurements
+    the configured order is used:
     1. Groq (fastest, ~0.5s)
     2. Gemini (smart, ~1-2s)
     3. Ollama (local, variable)
 
-    If one fails, automatically tries the next.
+    If one fails, automatically tries the next. Each provider has a
+    circuit breaker: a provider failing most of its recent calls is
+    skipped for a while, then probed with a single call, so outages heal
+    on their own without every request waiting on a dead upstream. Each
+    provider also has a rate limiter sized to our quota (see
+    ProviderRateLimiter); a 429 pauses the provider for its Retry-After
+    instead of counting as a failure.
     """
 
     def __init__(
         self,
         primary: LLMProvider = LLMProvider.GROQ,
         fallbacks: Optional[list[LLMProvider]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        router: Optional[LatencyRouter] = None,
+        dispatcher: Optional[LLMDispatcher] = None,
     ):
         """Initialize fallback service.
 
         Args:
-            primary: Primary LLM provider to try first
+            primary: Provider tried first until latencies are measured
             fallbacks: List of fallback providers in order
+            clock: Time source for provider health (monotonic seconds)
+            router: Provider ordering (defaults to one with
+                LLM_EXPLORATION_RATE exploration)
+            dispatcher: Priority scheduler for calls (defaults to the shared one)
         """
         self.primary = primary
         self.fallbacks = fallbacks or [LLMProvider.GEMINI]
+        self.router = router or LatencyRouter(
+            exploration_rate=float(os.getenv("LLM_EXPLORATION_RATE", DEFAULT_EXPLORATION_RATE))
+        )
+
+        self.dispatcher = dispatcher or llm_dispatcher
+        self.queue_timeout = float(os.getenv("LLM_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT))
 
         # Track provider health
-        self._provider_failures: dict[LLMProvider, int] = {}
-        self._max_failures = 3  # Temporarily skip provider after N failures
+        self._breakers = {
+            provider: CircuitBreaker(f"llm:{provider.value}", clock=clock)
+            for provider in LLMProvider
+            if provider != LLMProvider.LOCAL
+        }
+        self._limiters = {
+            provider: ProviderRateLimiter(
+                f"llm:{provider.value}", _requests_per_minute(provider), clock=clock
+            )
+            for provider in self._breakers
+        }
 
     def _is_provider_healthy(self, provider: LLMProvider) -> bool:
-        """Check if provider is healthy (not too many recent failures)."""
-        return self._provider_failures.get(provider, 0) < self._max_failures
+        """Check if provider is healthy (its breaker isn't open)."""
+        return self._breakers[provider].state != CircuitState.OPEN
 
     def _record_success(self, provider: LLMProvider) -> None:
-        """Record successful call, reset failure count."""
-        self._provider_failures[provider] = 0
+        """Record successful call."""
+        self._breakers[provider].record_success()
+
+    def _record_rate_limit(
+        self, provider: LLMProvider, error: Exception, rate_limited_for: list[float]
+    ) -> bool:
+        """Pause a provider that answered 429.
+
+        A rate limit isn't an outage, so it doesn't count against the
+        provider's breaker or latency, and a half-open probe is given back.
+
+        Returns:
+            Whether the error was a rate limit
+        """
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is None:
+            return False
+        self._limiters[provider].pause(retry_after)
+        self._breakers[provider].release_probe()
+        rate_limited_for.append(retry_after)
+        return True
 
     def _record_failure(self, provider: LLMProvider) -> None:
         """Record failed call."""
-        self._provider_failures[provider] = self._provider_failures.get(
-            provider, 0) + 1
+        breaker = self._breakers[provider]
+        breaker.record_failure()
         logger.warning(
             f"Provider {provider} failed, "
-            f"failure count: {self._provider_failures[provider]}"
+            f"recent failure rate: {breaker.failure_rate():.0%}"
         )
 
     async def _call_groq(
@@ -139,64 +213,112 @@ class LLMFallbackService:
         Returns:
             LLMResult with response and metadata
         """
-        import time
-
-        # Build provider order
-        providers = [self.primary] + self.fallbacks
-
-        # Filter to healthy providers
-        healthy_providers = [
-            p for p in providers if self._is_provider_healthy(p)]
+        # Context-free repeat questions are answered from the cache
+        detected_intent = intent_classifier.detect(user_input)
+        cacheable = response_cache.is_cacheable(detected_intent, context)
+        if cacheable:
+            cached = response_cache.get(user_input, language, detected_intent)
+            if cached is not None:
+                return LLMResult(
+                    text=cached.text,
+                    intent=detected_intent,
+                    provider=LLMProvider(cached.provider),
+                    latency_ms=0,
+                    cached=True,
+                )
 
-        # If no healthy providers, try all anyway
-        if not healthy_providers:
-            logger.warning("No healthy providers, trying all")
-            healthy_providers = providers
-            # Reset failure counts
-            self._provider_failures = {}
+        # Fastest expected provider first for this kind of question
+        providers = [
+            LLMProvider(name)
+            for name in self.router.order(
+                [p.value for p in [self.primary] + self.fallbacks],
+                language,
+                detected_intent.value,
+            )
+        ]
 
         last_error = None
         fallback_used = False
         fallback_reason = None
+        rate_limited_for: list[float] = []  # Retry-after of rate-limited providers
+
+        for i, provider in enumerate(providers):
+            # Skips open breakers; a half-open one lets a single probe through
+            if not self._breakers[provider].allow_request():
+                logger.info(f"Skipping LLM provider {provider}: circuit open")
+                last_error = last_error or f"{provider} unavailable (circuit open)"
+                fallback_used = True
+                fallback_reason = fallback_reason or f"{provider} unavailable"
+                continue
 
-        for i, provider in enumerate(healthy_providers):
-            try:
-                start_time = time.time()
+            # A slot ahead of any queued story or background work
+            async with self.dispatcher.slot(RequestClass.INTERACTIVE):
+                try:
+                    await self._limiters[provider].acquire(
+                        self.queue_timeout, RequestClass.INTERACTIVE.priority
+                    )
+                except RateLimitError as e:
+                    logger.info(f"Skipping LLM provider {provider}: {e}")
+                    self._breakers[provider].release_probe()
+                    last_error = e
+                    rate_limited_for.append(e.retry_after)
+                    fallback_used = True
+                    fallback_reason = f"{provider} rate limited"
+                    continue
 
-                logger.info(f"Trying LLM provider: {provider}")
-                text, intent = await self._call_provider(
-                    provider, user_input, language, context
-                )
+                try:
+                    start_time = time.time()
 
-                latency_ms = (time.time() - start_time) * 1000
+                    logger.info(f"Trying LLM provider: {provider}")
+                    text, intent = await self._call_provider(
+                        provider, user_input, language, context
+                    )
 
-                self._record_success(provider)
+                    latency_ms = (time.time() - start_time) * 1000
 
-                logger.info(
-                    f"LLM response from {provider} in {latency_ms:.0f}ms"
-                )
+                    self._record_success(provider)
+                    self.router.record(
+                        provider.value, language, detected_intent.value, latency_ms, True
+                    )
 
-                return LLMResult(
-                    text=text,
-                    intent=intent,
-                    provider=provider,
-                    latency_ms=latency_ms,
-                    fallback_used=fallback_used,
-                    fallback_reason=fallback_reason,
-                )
+                    if cacheable:
+                        response_cache.put(
+                            user_input, language, detected_intent, text, provider.value
+                        )
 
-            except (GroqError, GeminiError, Exception) as e:
-                last_error = e
-                self._record_failure(provider)
+                    logger.info(
+                        f"LLM response from {provider} in {latency_ms:.0f}ms"
+                    )
 
-                if i < len(healthy_providers) - 1:
-                    fallback_used = True
-                    fallback_reason = f"{provider} failed: {str(e)[:50]}"
-                    logger.warning(
-                        f"Provider {provider} failed, trying next: {e}"
+                    return LLMResult(
+                        text=text,
+                        intent=intent,
+                        provider=provider,
+                        latency_ms=latency_ms,
+                        fallback_used=fallback_used,
+                        fallback_reason=fallback_reason,
                     )
-                else:
-                    logger.error(f"All providers failed, last error: {e}")
+
+                except (GroqError, GeminiError, Exception) as e:
+                    last_error = e
+                    if not self._record_rate_limit(provider, e, rate_limited_for):
+                        self._record_failure(provider)
+                        self.router.record(
+                            provider.value,
+                            language,
+                            detected_intent.value,
+                            (time.time() - start_time) * 1000,
+                            False,
+                        )
+
+                    if i < len(providers) - 1:
+                        fallback_used = True
+                        fallback_reason = f"{provider} failed: {str(e)[:50]}"
+                        logger.warning(
+                            f"Provider {provider} failed, trying next: {e}"
+                        )
+                    else:
+                        logger.error(f"All providers failed, last error: {e}")
 
         # All providers failed, return fallback message
         fallback_messages = {
@@ -211,54 +333,101 @@ class LLMFallbackService:
             latency_ms=0,
             fallback_used=True,
             fallback_reason=f"All providers failed: {last_error}",
+            retry_after=min(rate_limited_for) if rate_limited_for else None,
         )
 
     async def generate_story(
         self,
         story_prompt: str,
         language: str = "sv",
+        request_class: RequestClass = RequestClass.STORY,
     ) -> str:
         """Generate story with fallback.
 
-        Stories are longer, so we prefer Gemini for quality.
+        Stories are longer, so we prefer Gemini for quality. They are
+        scheduled behind live conversation turns (see LLMDispatcher).
+
+        Args:
+            story_prompt: Story generation prompt
+            language: Language code
+            request_class: STORY, or BACKGROUND when nobody is waiting
+
+        Raises:
+            RateLimitError: If providers were rate limited and none answered,
+                so the caller can tell the device when to retry
+            StoryGenerationError: If every provider failed otherwise; there
+                is no stand-in story, since callers save what they get
         """
         providers = [LLMProvider.GEMINI, LLMProvider.GROQ]
+        rate_limited_for: list[float] = []
 
         for provider in providers:
-            try:
-                if provider == LLMProvider.GEMINI:
-                    return await gemini_service.generate_story(
-                        story_prompt=story_prompt,
-                        language=language,
-                    )
-                elif provider == LLMProvider.GROQ:
-                    # Groq can also generate stories
-                    system_prompt = gemini_service.storybook_prompt
-                    return await groq_service.generate_response(
-                        prompt=story_prompt,
-                        system_instruction=system_prompt,
-                        temperature=0.8,
-                        max_tokens=1500,
-                    )
-            except Exception as e:
-                logger.warning(f"Story generation failed with {provider}: {e}")
+            if not self._breakers[provider].allow_request():
+                logger.info(f"Skipping story provider {provider}: circuit open")
                 continue
-
-        # Fallback story
-        if language == "sv":
-            return "Det var en gång en liten kanin som ville ha ett äventyr. Men just nu är sagoberättaren lite trött. Kom tillbaka snart för fler sagor!"
-        return "Once upon a time, there was a little rabbit who wanted an adventure. But the storyteller is a bit tired right now. Come back soon for more stories!"
+            async with self.dispatcher.slot(request_class):
+                try:
+                    await self._limiters[provider].acquire(
+                        STORY_QUEUE_TIMEOUT, request_class.priority
+                    )
+                except RateLimitError as e:
+                    logger.info(f"Skipping story provider {provider}: {e}")
+                    self._breakers[provider].release_probe()
+                    rate_limited_for.append(e.retry_after)
+                    continue
+                try:
+                    if provider == LLMProvider.GEMINI:
+                        story = await gemini_service.generate_story(
+                            story_prompt=story_prompt,
+                            language=language,
+                        )
+                    elif provider == LLMProvider.GROQ:
+                        # Groq can also generate stories
+                        system_prompt = gemini_service.storybook_prompt
+                        story = await groq_service.generate_response(
+                            prompt=story_prompt,
+                            system_instruction=system_prompt,
+                            temperature=0.8,
+                            max_tokens=1500,
+                        )
+                    self._record_success(provider)
+                    return story
+                except Exception as e:
+                    if not self._record_rate_limit(provider, e, rate_limited_for):
+                        self._record_failure(provider)
+                    logger.warning(f"Story generation failed with {provider}: {e}")
+                    continue
+
+        if rate_limited_for:
+            raise RateLimitError("Story providers are rate limited", min(rate_limited_for))
+        raise StoryGenerationError("All story providers failed")
 
     def get_provider_status(self) -> dict:
         """Get status of all providers."""
         return {
             provider.value: {
-                "failures": self._provider_failures.get(provider, 0),
                 "healthy": self._is_provider_healthy(provider),
+                "failures": breaker.failure_count(),
+                "circuit": breaker.get_status(),
+                "latency": self.router.get_status(provider.value),
+                "rate_limit": self._limiters[provider].get_status(),
             }
-            for provider in LLMProvider
+            for provider, breaker in self._breakers.items()
         }
 
+    def get_dispatcher_status(self) -> dict:
+        """Get LLM call slots and queue times per request class."""
+        return self.dispatcher.get_status()
+
+
+def _requests_per_minute(provider: LLMProvider) -> Optional[float]:
+    """Our request quota for a provider, None if unlimited."""
+    value = os.getenv(
+        f"{provider.value.upper()}_REQUESTS_PER_MINUTE",
+        DEFAULT_REQUESTS_PER_MINUTE.get(provider.value, 0),
+    )
+    return float(value) or None
+
 
 # Global fallback service instance
 llm_fallback_service = LLMFallbackService(
@@ -0,0 +1,300 @@
+"""Deterministic solver for spoken arithmetic questions.
+
+Parses questions like "what is three plus four?" or "vad är tjugo delat med
+fem?" into numbers and operators, evaluates them without eval(), and answers
+from child-friendly templates. Anything it can't parse returns None so the
+caller can hand the question to the LLM.
+"""
+
+import logging
+import re
+from fractions import Fraction
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+MAX_OPERANDS = 6
+MAX_NUMBER = 1_000_000
+
+NUMBER_WORDS = {
+    "en": {
+        "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+        "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+        "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+        "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+        "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40,
+        "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+    },
+    "sv": {
+        "noll": 0, "en": 1, "ett": 1, "två": 2, "tre": 3, "fyra": 4,
+        "fem": 5, "sex": 6, "sju": 7, "åtta": 8, "nio": 9, "tio": 10,
+        "elva": 11, "tolv": 12, "tretton": 13, "fjorton": 14, "femton": 15,
+        "sexton": 16, "sjutton": 17, "arton": 18, "nitton": 19, "tjugo": 20,
+        "trettio": 30, "fyrtio": 40, "femtio": 50, "sextio": 60,
+        "sjuttio": 70, "åttio": 80, "nittio": 90,
+    },
+}
+SCALE_WORDS = {
+    "hundred": 100, "thousand": 1000,
+    "hundra": 100, "tusen": 1000,
+}
+
+# Spoken operators, longest phrases first so "divided by" wins over "by"
+OPERATOR_PHRASES = [
+    ("multiplied by", "*"), ("divided by", "/"), ("take away", "-"),
+    ("multiplicerat med", "*"), ("dividerat med", "/"), ("delat med", "/"),
+    ("delat på", "/"), ("ta bort", "-"),
+    ("plus", "+"), ("minus", "-"), ("times", "*"),
+    ("gånger", "*"), ("genom", "/"),
+    ("+", "+"), ("-", "-"), ("*", "*"), ("x", "*"), ("×", "*"), ("/", "/"), ("÷", "/"),
+]
+_OPERATOR_PATTERN = re.compile(
+    "|".join(
+        rf"(?<!\w){re.escape(phrase)}(?!\w)" if phrase[0].isalpha() else re.escape(phrase)
+        for phrase, _ in OPERATOR_PHRASES
+    )
+)
+_OPERATORS = dict(OPERATOR_PHRASES)
+
+# Words allowed before/after the expression ("what is ... ?", "vad blir ...")
+FILLER_WORDS = {
+    "hey", "hi", "toy", "saga", "what", "what's", "whats", "is", "are", "does",
+    "make", "makes", "equal", "equals", "how", "much", "many", "calculate",
+    "tell", "me", "can", "you", "please", "the", "answer", "to", "of",
+    "hej", "vad", "är", "blir", "hur", "mycket", "många", "räkna", "kan", "du",
+    "snälla", "säg", "mig", "svaret", "på", "lika", "med",
+}
+
+SPOKEN_OPERATORS = {
+    "en": {"+": "plus", "-": "minus", "*": "times", "/": "divided by"},
+    "sv": {"+": "plus", "-": "minus", "*": "gånger", "/": "delat med"},
+}
+ANSWER_TEMPLATES = {
+    "en": [
+        "{expression} is {result}! Great counting!",
+        "{expression} makes {result}! You're a math star!",
+        "Let's see... {expression} is {result}! Well done!",
+    ],
+    "sv": [
+        "{expression} är {result}! Bra räknat!",
+        "{expression} blir {result}! Du är en mattestjärna!",
+        "Vi ser efter... {expression} är {result}! Snyggt!",
+    ],
+}
+DIVIDE_BY_ZERO_ANSWERS = {
+    "en": "Oh! We can't share things into zero groups. Try dividing by another number!",
+    "sv": "Oj! Man kan inte dela något i noll delar. Prova att dela med ett annat tal!",
+}
+
+_WORD_HYPHEN = re.compile(r"(?<=[^\W\d_])-(?=[^\W\d_])")
+_TOKEN_PATTERN = re.compile(r"\d+(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?|[+\-*/×÷]|[\w']+")
+# English digit grouping: "1,000" or "12,500.5"
+_THOUSANDS_GROUPED = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?")
+
+Number = Union[int, Fraction]
+
+
+def _number_parts(word: str, language: str) -> Optional[list[str]]:
+    """Split a number word into its parts ("tjugoett" -> tjugo, ett).
+
+    Returns:
+        List of number words, or None if the token isn't a number word
+    """
+    units = NUMBER_WORDS.get(language, NUMBER_WORDS["en"])
+    parts = []
+    rest = word
+    while rest:
+        for length in range(len(rest), 0, -1):
+            prefix = rest[:length]
+            if prefix in units or prefix in SCALE_WORDS:
+                parts.append(prefix)
+                rest = rest[length:]
+                break
+        else:
+            return None
+    return parts
+
+
+def _words_to_number(parts: list[str], language: str) -> Optional[int]:
+    """Combine number words ("twenty", "one") into a value.
+
+    Returns None for sequences that aren't one number, like "three four".
+    """
+    units = NUMBER_WORDS.get(language, NUMBER_WORDS["en"])
+    total = 0
+    current = 0
+    for part in parts:
+        if part == "hundred" or part == "hundra":
+            if current >= 100:
+                return None
+            current = (current or 1) * 100
+        elif part in SCALE_WORDS:
+            total += (current or 1) * SCALE_WORDS[part]
+            current = 0
+        else:
+            value = units[part]
+            below_hundred = current % 100
+            # Allowed: first word of a group, or a unit after a round ten
+            after_round_ten = below_hundred >= 20 and below_hundred % 10 == 0
+            if below_hundred and not (after_round_ten and value < 10):
+                return None
+            current += value
+    return total + current
+
+
+def _parse_number(token: str, language: str) -> Optional[Number]:
+    """Parse a digit token like "12", "3,5" (sv) or "1,000" (en).
+
+    Swedish writes a decimal comma, English uses the comma to group
+    thousands.
+    """
+    if token.isdigit():
+        return int(token)
+    if language == "sv":
+        token = token.replace(",", ".")
+    elif "," in token:
+        if not _THOUSANDS_GROUPED.fullmatch(token):
+            return None
+        token = token.replace(",", "")
+    try:
+        return Fraction(token)
+    except ValueError:
+        return None
+
+
+def parse_expression(text: str, language: str = "en") -> Optional[list]:
+    """Parse spoken arithmetic into alternating numbers and operators.
+
+    Args:
+        text: Question, e.g. "what is three plus four?"
+        language: Language code ('en' or 'sv')
+
+    Returns:
+        List like [3, "+", 4], or None if the text isn't a simple sum
+    """
+    text = text.lower().replace("’", "'")
+    # "twenty-one" is one number, not a subtraction
+    text = _WORD_HYPHEN.sub(" ", text)
+    text = _OPERATOR_PATTERN.sub(lambda m: f" {_OPERATORS[m.group(0)]} ", text)
+
+    items: list = []
+    number_words: list[str] = []
+    trailing = False
+
+    def close_number() -> bool:
+        if not number_words:
+            return True
+        value = _words_to_number(number_words, language)
+        number_words.clear()
+        if value is None:
+            return False
+        items.append(value)
+        return True
+
+    for token in _TOKEN_PATTERN.findall(text):
+        if token in "+-*/" and len(token) == 1:
+            if trailing or not close_number() or not items or isinstance(items[-1], str):
+                return None
+            items.append(token)
+            continue
+
+        number = _parse_number(token, language)
+        parts = None if number is not None else _number_parts(token, language)
+        if number is not None or parts:
+            if trailing:
+                return None
+            if number is not None:
+                if number_words or (items and not isinstance(items[-1], str)):
+                    return None
+                items.append(number)
+            else:
+                if items and not isinstance(items[-1], str):
+                    return None
+                number_words.extend(parts)
+            continue
+
+        # "three hundred and five"
+        if token in ("and", "och") and number_words:
+            continue
+        if token in FILLER_WORDS:
+            if items or number_words:
+                trailing = True
+            continue
+        return None
+
+    if not close_number():
+        return None
+
+    operands = items[::2]
+    if len(items) < 3 or len(items) % 2 == 0 or len(operands) > MAX_OPERANDS:
+        return None
+    if any(abs(operand) > MAX_NUMBER for operand in operands):
+        return None
+    return items
+
+
+def evaluate(items: list) -> Number:
+    """Evaluate parsed items with normal operator precedence.
+
+    Raises:
+        ZeroDivisionError: On division by zero
+    """
+    # First pass: * and /
+    terms: list = [Fraction(items[0])]
+    for operator, operand in zip(items[1::2], items[2::2]):
+        if operator == "*":
+            terms[-1] = terms[-1] * operand
+        elif operator == "/":
+            terms[-1] = terms[-1] / Fraction(operand)
+        else:
+            terms.extend([operator, Fraction(operand)])
+
+    # Second pass: + and -
+    result = terms[0]
+    for operator, operand in zip(terms[1::2], terms[2::2]):
+        result = result + operand if operator == "+" else result - operand
+
+    if result.denominator == 1:
+        return int(result)
+    return result
+
+
+def _format_number(value: Number, language: str) -> str:
+    """Format a number for speech; Swedish uses a decimal comma."""
+    if isinstance(value, int) or value.denominator == 1:
+        return str(int(value))
+    text = f"{float(value):.2f}".rstrip("0").rstrip(".")
+    return text.replace(".", ",") if language == "sv" else text
+
+
+def solve_math(text: str, language: str = "en") -> Optional[str]:
+    """Answer a spoken arithmetic question.
+
+    Args:
+        text: What the child said
+        language: Language code ('en' or 'sv')
+
+    Returns:
+        Child-friendly answer, or None if the question couldn't be parsed
+    """
+    if language not in ANSWER_TEMPLATES:
+        language = "en"
+
+    items = parse_expression(text, language)
+    if items is None:
+        return None
+
+    try:
+        result = evaluate(items)
+    except ZeroDivisionError:
+        return DIVIDE_BY_ZERO_ANSWERS[language]
+
+    spoken = SPOKEN_OPERATORS[language]
+    expression = " ".join(
+        spoken[item] if isinstance(item, str) else _format_number(item, language)
+        for item in items
+    )
+    templates = ANSWER_TEMPLATES[language]
+    template = templates[sum(map(ord, expression)) % len(templates)]
+    answer = template.format(expression=expression, result=_format_number(result, language))
+    return answer[0].upper() + answer[1:]
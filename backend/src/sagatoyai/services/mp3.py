@@ -0,0 +1,169 @@
+"""Minimal MPEG audio frame parsing for joining and indexing MP3 files.
+
+Only MPEG-1/2/2.5 Layer III is understood, which is what Edge TTS and
+LAME produce. Frames are self-contained, so MP3 files can be joined
+seamlessly by dropping tags and partial frames and concatenating the
+frames that are left.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
+
+# Bitrates in kbit/s by bitrate index, for MPEG-1 and MPEG-2/2.5 Layer III
+_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Sample rates by version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    """A parsed Layer III frame header."""
+
+    sample_rate: int
+    bitrate_kbps: int
+    samples: int  # Samples per frame
+    length: int  # Frame length in bytes, header included
+    mono: bool
+
+    @property
+    def duration(self) -> float:
+        """Frame duration in seconds."""
+        return self.samples / self.sample_rate
+
+
+@dataclass(frozen=True)
+class Frame:
+    """Location of a frame within MP3 data."""
+
+    offset: int
+    header: FrameHeader
+
+
+def parse_frame_header(data: bytes, offset: int = 0) -> Optional[FrameHeader]:
+    """Parse a Layer III frame header at offset, or None if there isn't one."""
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[1 if mpeg1 else 2][bitrate_index]
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    coefficient = 144 if mpeg1 else 72
+    return FrameHeader(
+        sample_rate=sample_rate,
+        bitrate_kbps=bitrate,
+        samples=1152 if mpeg1 else 576,
+        length=coefficient * bitrate * 1000 // sample_rate + padding,
+        mono=(b3 >> 6) == 3,
+    )
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Get the offset just past a leading ID3v2 tag, or 0."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+@lru_cache(maxsize=256)
+def _frame_length(header: bytes) -> int:
+    """Frame length for a 4-byte header, or 0 if it isn't one (cached for streaming)."""
+    parsed = parse_frame_header(header)
+    return parsed.length if parsed is not None else 0
+
+
+def next_unit_length(data: bytes) -> Optional[int]:
+    """Length of the frame at the start of streamed MP3 data.
+
+    Used to cut a live stream at frame boundaries. A leading ID3v2 tag or
+    bytes before the next frame sync count as one unit, so they pass
+    through without being mistaken for audio.
+
+    Returns:
+        Length in bytes (possibly more than len(data)), or None if more
+        data is needed to tell
+    """
+    if len(data) < 4:
+        return None
+    length = _frame_length(bytes(data[:4]))
+    if length:
+        return length
+    if bytes(data[:3]) == b"ID3":
+        return _skip_id3v2(data) or None
+    sync = bytes(data).find(b"\xff", 1)
+    return sync if sync != -1 else len(data)
+
+
+def _is_info_frame(data: bytes, frame: Frame) -> bool:
+    """Check for a Xing/Info/VBRI header frame, which holds no audio."""
+    header = frame.header
+    mpeg1 = header.samples == 1152
+    side_info = (17 if header.mono else 32) if mpeg1 else (9 if header.mono else 17)
+    start = frame.offset + 4 + side_info
+    tag = data[start:start + 4]
+    return tag in (b"Xing", b"Info") or data[frame.offset + 36:frame.offset + 40] == b"VBRI"
+
+
+def iter_frames(data: bytes) -> Iterator[Frame]:
+    """Find the complete audio frames in MP3 data.
+
+    Tags, Xing/Info header frames, garbage and a truncated last frame are
+    skipped. A candidate header only counts if the next frame follows
+    right after it (or it ends the data), which rules out false syncs.
+    """
+    offset = _skip_id3v2(data)
+    end = len(data)
+    while offset + 4 <= end:
+        header = parse_frame_header(data, offset)
+        if header is None or offset + header.length > end:
+            offset += 1
+            continue
+        next_offset = offset + header.length
+        if next_offset + 4 <= end and parse_frame_header(data, next_offset) is None:
+            if data[next_offset:next_offset + 3] != b"TAG":
+                offset += 1
+                continue
+        frame = Frame(offset, header)
+        if not _is_info_frame(data, frame):
+            yield frame
+        offset = next_offset
+
+
+def audio_frames(data: bytes) -> bytes:
+    """Strip everything but complete audio frames from MP3 data."""
+    return b"".join(
+        data[frame.offset:frame.offset + frame.header.length] for frame in iter_frames(data)
+    )
+
+
+def concat_mp3(parts: Iterable[bytes]) -> bytes:
+    """Join MP3 files at frame boundaries into one seamless stream."""
+    return b"".join(audio_frames(part) for part in parts)
+
+
+def mp3_duration(data: bytes) -> float:
+    """Duration of MP3 data in seconds, from its frames."""
+    return sum(frame.header.duration for frame in iter_frames(data))
@@ -0,0 +1,332 @@
+"""Pool of persistent Piper TTS worker processes.
+
+Starting Piper loads its ONNX voice model, which takes far longer than
+synthesizing a sentence. Each voice therefore gets a few long-lived workers
+(services/piper_worker.py) that load the model once and then take requests
+over their stdin/stdout pipes. Workers are driven with asyncio, so the event
+loop never blocks on synthesis; crashed workers are restarted, and workers
+that sat idle are pinged before reuse.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from sagatoyai.services.piper_worker import (
+    FRAME_AUDIO,
+    FRAME_END,
+    FRAME_ERROR,
+    FRAME_HEADER,
+    FRAME_PONG,
+    FRAME_READY,
+)
+from sagatoyai.services.sentence_segmenter import split_sentences
+
+logger = logging.getLogger(__name__)
+
+PIPER_VOICES = {
+    "sv": "sv_SE-nst-medium",
+    "en": "en_US-lessac-medium",
+}
+
+# Voice models are looked up as <PIPER_DATA_DIR>/<voice>.onnx
+PIPER_DATA_DIR = Path(os.getenv("PIPER_DATA_DIR", "piper_voices"))
+
+DEFAULT_WORKERS_PER_VOICE = 2
+
+# Audio is resampled to the rate the toy plays at
+DEFAULT_DEVICE_SAMPLE_RATE = 16000
+STARTUP_TIMEOUT = 60.0
+PING_TIMEOUT = 5.0
+DRAIN_TIMEOUT = 10.0
+
+# Idle workers older than this are pinged before being handed out
+HEALTH_CHECK_AFTER = 60.0
+
+
+class PiperError(Exception):
+    """Piper worker error."""
+
+    pass
+
+
+class PiperWorker:
+    """One Piper process with a voice model loaded."""
+
+    def __init__(self, command: list[str]):
+        """Initialize worker.
+
+        Args:
+            command: Command line that starts the worker process
+        """
+        self.command = command
+        self.sample_rate: Optional[int] = None
+        self.last_used = 0.0
+        self._process: Optional[asyncio.subprocess.Process] = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the process is running."""
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self, timeout: float = STARTUP_TIMEOUT) -> None:
+        """Start the process and wait until the model is loaded."""
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        try:
+            kind, payload = await asyncio.wait_for(self._read_frame(), timeout)
+        except (PiperError, asyncio.TimeoutError) as e:
+            await self.stop()
+            raise PiperError(f"Piper worker failed to start: {e!r}")
+        if kind != FRAME_READY:
+            await self.stop()
+            raise PiperError(f"Unexpected frame from Piper worker: {kind!r}")
+
+        self.sample_rate = json.loads(payload)["sample_rate"]
+        self.last_used = time.monotonic()
+
+    async def stop(self) -> None:
+        """Stop the process."""
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), 2.0)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def _read_frame(self) -> tuple[bytes, bytes]:
+        """Read one (type, payload) frame from the worker."""
+        try:
+            header = await self._process.stdout.readexactly(FRAME_HEADER.size)
+            kind, length = FRAME_HEADER.unpack(header)
+            payload = await self._process.stdout.readexactly(length) if length else b""
+        except asyncio.IncompleteReadError:
+            raise PiperError("Piper worker exited")
+        return kind, payload
+
+    async def _send(self, request: dict) -> None:
+        """Send one request line to the worker."""
+        if not self.alive:
+            raise PiperError("Piper worker is not running")
+        try:
+            self._process.stdin.write(json.dumps(request).encode() + b"\n")
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            raise PiperError("Piper worker exited")
+
+    async def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        """Check that the worker still answers."""
+        try:
+            await self._send({"ping": True})
+            kind, _ = await asyncio.wait_for(self._read_frame(), timeout)
+        except (PiperError, asyncio.TimeoutError):
+            return False
+        return kind == FRAME_PONG
+
+    async def synthesize(
+        self, sentences: list[str], sample_rate: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Synthesize sentences, yielding 16-bit mono PCM as the worker produces it.
+
+        All sentences are queued on the worker at once, so it moves straight
+        on to the next one while the previous one's audio is being played.
+
+        Args:
+            sentences: Text to speak, one request per sentence
+            sample_rate: Output sample rate (defaults to the voice's own rate)
+        """
+        self.last_used = time.monotonic()
+        for sentence in sentences:
+            await self._send({"text": sentence, "sample_rate": sample_rate})
+        pending = len(sentences)
+        try:
+            while pending:
+                kind, payload = await self._read_frame()
+                if kind == FRAME_AUDIO:
+                    yield payload
+                elif kind == FRAME_END:
+                    pending -= 1
+                elif kind == FRAME_ERROR:
+                    pending -= 1
+                    raise PiperError(payload.decode(errors="replace"))
+                else:
+                    raise PiperError(f"Unexpected frame from Piper worker: {kind!r}")
+        finally:
+            if pending and self.alive:
+                # Caller stopped early: skip the rest so the next request starts clean
+                try:
+                    await asyncio.wait_for(self._drain(pending), DRAIN_TIMEOUT)
+                except (PiperError, asyncio.TimeoutError):
+                    await self.stop()
+
+    async def _drain(self, pending: int) -> None:
+        """Read and discard frames up to the end of the pending requests."""
+        while pending:
+            kind, _ = await self._read_frame()
+            if kind in (FRAME_END, FRAME_ERROR):
+                pending -= 1
+
+
+class PiperWorkerPool:
+    """Persistent workers for one Piper voice."""
+
+    def __init__(
+        self,
+        voice: str,
+        size: int = DEFAULT_WORKERS_PER_VOICE,
+        command: Optional[list[str]] = None,
+    ):
+        """Initialize pool.
+
+        Args:
+            voice: Piper voice name, e.g. "sv_SE-nst-medium"
+            size: Number of worker processes
+            command: Worker command line (defaults to piper_worker with the voice model)
+        """
+        self.voice = voice
+        self.size = size
+        # Run the worker file directly so it skips importing the services package
+        self.command = command or [
+            sys.executable,
+            str(Path(__file__).with_name("piper_worker.py")),
+            "--model",
+            str(PIPER_DATA_DIR / f"{voice}.onnx"),
+        ]
+        self._workers: list[PiperWorker] = []
+        self._idle: asyncio.Queue[PiperWorker] = asyncio.Queue()
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def sample_rate(self) -> Optional[int]:
+        """Native sample rate of the voice, once a worker has started."""
+        return next((w.sample_rate for w in self._workers if w.sample_rate), None)
+
+    async def start(self) -> None:
+        """Start the workers and preload the voice model."""
+        async with self._start_lock:
+            if self._workers:
+                return
+            workers = [PiperWorker(self.command) for _ in range(self.size)]
+            results = await asyncio.gather(
+                *(worker.start() for worker in workers), return_exceptions=True
+            )
+            errors = [r for r in results if isinstance(r, Exception)]
+            if len(errors) == len(workers):
+                raise PiperError(f"No Piper workers for {self.voice}: {errors[0]}")
+
+            self._workers = workers
+            for worker in workers:
+                self._idle.put_nowait(worker)
+            logger.info(
+                f"Started {len(workers) - len(errors)}/{len(workers)} Piper workers "
+                f"for {self.voice}"
+            )
+
+    async def _ensure_healthy(self, worker: PiperWorker) -> None:
+        """Restart a worker that crashed or stopped answering."""
+        if worker.alive and time.monotonic() - worker.last_used < HEALTH_CHECK_AFTER:
+            return
+        if worker.alive and await worker.ping():
+            return
+        logger.warning(f"Restarting Piper worker for {self.voice}")
+        await worker.stop()
+        await worker.start()
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[PiperWorker]:
+        """Borrow an idle, healthy worker."""
+        if not self._workers:
+            await self.start()
+        worker = await self._idle.get()
+        try:
+            await self._ensure_healthy(worker)
+            yield worker
+        finally:
+            self._idle.put_nowait(worker)
+
+    async def synthesize(
+        self, text: str, sample_rate: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Synthesize text on the next free worker, streaming PCM.
+
+        The text is sent a sentence at a time, so the first audio arrives
+        after one sentence has been synthesized rather than the whole text.
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+        async with self._acquire() as worker:
+            stream = worker.synthesize(sentences, sample_rate)
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                # Finish the worker's request before it goes back to the pool
+                await stream.aclose()
+
+    async def close(self) -> None:
+        """Stop all workers."""
+        await asyncio.gather(*(worker.stop() for worker in self._workers))
+        self._workers = []
+        self._idle = asyncio.Queue()
+
+
+class PiperTTS:
+    """Worker pools for each language's Piper voice."""
+
+    def __init__(self, workers_per_voice: Optional[int] = None):
+        """Initialize Piper TTS.
+
+        Args:
+            workers_per_voice: Workers per voice (defaults to PIPER_WORKERS env)
+        """
+        if workers_per_voice is None:
+            workers_per_voice = int(os.getenv("PIPER_WORKERS", DEFAULT_WORKERS_PER_VOICE))
+        self.workers_per_voice = workers_per_voice
+        self.sample_rate = int(os.getenv("DEVICE_SAMPLE_RATE", DEFAULT_DEVICE_SAMPLE_RATE))
+        self._pools: dict[str, PiperWorkerPool] = {}
+
+    def get_pool(self, language: str) -> PiperWorkerPool:
+        """Get the worker pool for a language's voice."""
+        voice = PIPER_VOICES.get(language, PIPER_VOICES["en"])
+        if voice not in self._pools:
+            self._pools[voice] = PiperWorkerPool(voice, self.workers_per_voice)
+        return self._pools[voice]
+
+    async def start(self, languages: Optional[list[str]] = None) -> None:
+        """Preload voices so the first request doesn't wait for model loading."""
+        for language in languages or list(PIPER_VOICES):
+            await self.get_pool(language).start()
+
+    def synthesize(
+        self, text: str, language: str = "sv", sample_rate: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Synthesize text, yielding 16-bit mono PCM as it is produced.
+
+        Args:
+            text: Text to speak
+            language: Language code, selects the voice
+            sample_rate: Output rate (defaults to DEVICE_SAMPLE_RATE)
+        """
+        return self.get_pool(language).synthesize(text, sample_rate or self.sample_rate)
+
+    async def close(self) -> None:
+        """Stop every worker."""
+        await asyncio.gather(*(pool.close() for pool in self._pools.values()))
+        self._pools = {}
+
+
+# Global Piper TTS instance
+piper_tts = PiperTTS()
@@ -0,0 +1,132 @@
+"""Long-lived Piper TTS worker process.
+
+Loads one voice model once and then synthesizes requests read from stdin
+until stdin closes. Run by the worker pool in services/piper_pool.py:
+
+    python piper_worker.py --model <path/to/voice.onnx>
+
+Requests are JSON lines: {"text": "...", "sample_rate": 16000} to
+synthesize (sample_rate is optional and resamples the output), {"ping": true}
+for a health check. Replies on stdout are frames of a 1-byte type and a 4-byte
+big-endian payload length, followed by the payload:
+
+    R  ready, payload is JSON {"sample_rate": ...}; sent once after loading
+    A  audio, payload is 16-bit mono PCM; one or more per request
+    E  end of the current request, empty payload
+    X  error for the current request, payload is the message
+    P  reply to a ping, empty payload
+"""
+
+import argparse
+import json
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterator, Optional
+
+FRAME_HEADER = struct.Struct(">cI")
+
+FRAME_READY = b"R"
+FRAME_AUDIO = b"A"
+FRAME_END = b"E"
+FRAME_ERROR = b"X"
+FRAME_PONG = b"P"
+
+
+def write_frame(stream: BinaryIO, kind: bytes, payload: bytes = b"") -> None:
+    """Write one frame and flush it to the pool."""
+    stream.write(FRAME_HEADER.pack(kind, len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+class PCMResampler:
+    """Streaming linear-interpolation resampler for 16-bit mono PCM.
+
+    Keeps the last input sample and the fractional read position between
+    chunks, so audio resampled chunk by chunk has no seams.
+    """
+
+    def __init__(self, from_rate: int, to_rate: int):
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self._previous = array("h")  # Last sample of the previous chunk
+        # Next output position relative to _previous, in units of 1/to_rate
+        # input samples, so chunked and whole-buffer output are identical
+        self._position = 0
+        self._odd_byte = b""
+
+    def process(self, pcm: bytes) -> bytes:
+        """Resample the next chunk of audio."""
+        pcm = self._odd_byte + pcm
+        if len(pcm) % 2:
+            pcm, self._odd_byte = pcm[:-1], pcm[-1:]
+        else:
+            self._odd_byte = b""
+
+        samples = array("h", self._previous)
+        samples.frombytes(pcm)
+        if len(samples) < 2:
+            self._previous = samples
+            return b""
+
+        out = array("h")
+        position = self._position
+        to_rate = self.to_rate
+        end = (len(samples) - 1) * to_rate
+        while position < end:
+            index, remainder = divmod(position, to_rate)
+            current = samples[index]
+            out.append(current + (samples[index + 1] - current) * remainder // to_rate)
+            position += self.from_rate
+
+        self._previous = samples[-1:]
+        self._position = position - end
+        return out.tobytes()
+
+
+def _synthesize(voice, text: str) -> Iterator[bytes]:
+    """Yield PCM per sentence with either piper-tts API generation."""
+    if hasattr(voice, "synthesize_stream_raw"):
+        yield from voice.synthesize_stream_raw(text)
+    else:
+        for chunk in voice.synthesize(text):
+            yield chunk.audio_int16_bytes
+
+
+def main() -> None:
+    """Serve synthesis requests until stdin closes."""
+    parser = argparse.ArgumentParser(description="Piper TTS worker")
+    parser.add_argument("--model", required=True, help="Path to the voice .onnx file")
+    args = parser.parse_args()
+
+    from piper import PiperVoice
+
+    voice = PiperVoice.load(args.model)
+    out = sys.stdout.buffer
+    write_frame(out, FRAME_READY, json.dumps({"sample_rate": voice.config.sample_rate}).encode())
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if request.get("ping"):
+            write_frame(out, FRAME_PONG)
+            continue
+        resampler: Optional[PCMResampler] = None
+        sample_rate = request.get("sample_rate")
+        if sample_rate and sample_rate != voice.config.sample_rate:
+            resampler = PCMResampler(voice.config.sample_rate, sample_rate)
+        try:
+            for audio in _synthesize(voice, request["text"]):
+                if resampler is not None:
+                    audio = resampler.process(audio)
+                write_frame(out, FRAME_AUDIO, audio)
+        except Exception as e:
+            write_frame(out, FRAME_ERROR, str(e).encode())
+            continue
+        write_frame(out, FRAME_END)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Prompt assembly shared by all LLM providers.
+
+Builds the system instruction and conversation history for a turn within a
+token budget, so prompt size (and therefore latency) is predictable and can
+be tuned in one place.
+"""
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Approximate characters per token for each provider's tokenizer.
+# Swedish text tokenizes worse than English, hence the per-language factor.
+CHARS_PER_TOKEN = {
+    "groq": 3.6,
+    "gemini": 4.0,
+    "ollama": 3.6,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.6
+LANGUAGE_TOKEN_FACTOR = {
+    "en": 1.0,
+    "sv": 1.25,
+}
+
+# Per-message overhead for chat formatting (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+DEFAULT_HISTORY_TOKEN_BUDGET = 400
+
+SYSTEM_PROMPTS = {
+    "sv": """Du är en vänlig AI-assistent i en gosig leksak som pratar med barn mellan 3-10 år.
+Använd enkelt, varmt och uppmuntrande språk. Håll svaren korta (2-3 meningar).
+Var lekfull och fantasifull. Använd aldrig komplicerade ord eller läskiga ämnen.
+Svara alltid på svenska.""",
+    "en": """You are a friendly AI assistant inside a plush toy, talking to children aged 3-10.
+Use simple, warm, and encouraging language. Keep responses short (2-3 sentences).
+Be playful and imaginative. Never use complex words or scary topics.
+Always respond in English.""",
+}
+
+
+def estimate_tokens(text: str, provider: str = "groq", language: str = "en") -> int:
+    """Estimate how many tokens a provider will count for text.
+
+    Args:
+        text: Text to measure
+        provider: Provider name ('groq', 'gemini', 'ollama')
+        language: Language code ('en' or 'sv')
+
+    Returns:
+        Estimated token count (at least 1 for non-empty text)
+    """
+    if not text:
+        return 0
+    chars_per_token = CHARS_PER_TOKEN.get(provider, DEFAULT_CHARS_PER_TOKEN)
+    factor = LANGUAGE_TOKEN_FACTOR.get(language, 1.0)
+    return max(1, int(len(text) * factor / chars_per_token + 0.5))
+
+
+@dataclass
+class BuiltPrompt:
+    """Prompt ready to send to a provider."""
+
+    system_instruction: str
+    history: list[dict] = field(default_factory=list)
+    user_input: str = ""
+    estimated_tokens: int = 0
+
+    def as_text(self) -> str:
+        """Render history and input as one prompt for text-only APIs."""
+        if not self.history:
+            return self.user_input
+
+        conversation_history = "\n".join(
+            f"{msg['role']}: {msg['content']}" for msg in self.history
+        )
+        return f"Previous conversation:\n{conversation_history}\n\nChild: {self.user_input}"
+
+    def as_messages(self) -> list[dict]:
+        """Render as a chat message list for chat APIs."""
+        return [
+            {"role": "system", "content": self.system_instruction},
+            *self.history,
+            {"role": "user", "content": self.user_input},
+        ]
+
+
+class PromptBuilder:
+    """Assembles LLM prompts within a token budget."""
+
+    def __init__(self, history_token_budget: Optional[int] = None):
+        """Initialize prompt builder.
+
+        Args:
+            history_token_budget: Max tokens spent on conversation history
+                (or from env LLM_HISTORY_TOKEN_BUDGET)
+        """
+        if history_token_budget is None:
+            history_token_budget = int(
+                os.getenv("LLM_HISTORY_TOKEN_BUDGET", DEFAULT_HISTORY_TOKEN_BUDGET)
+            )
+        self.history_token_budget = history_token_budget
+        # (language, provider) -> (system prompt, token estimate)
+        self._system_cache: dict[tuple[str, str], tuple[str, int]] = {}
+
+    def _system_prefix(self, language: str, provider: str) -> tuple[str, int]:
+        """Get the rendered system prompt and its token cost, cached."""
+        key = (language, provider)
+        cached = self._system_cache.get(key)
+        if cached is None:
+            system_prompt = SYSTEM_PROMPTS.get(language, SYSTEM_PROMPTS["en"])
+            cached = (
+                system_prompt,
+                estimate_tokens(system_prompt, provider, language),
+            )
+            self._system_cache[key] = cached
+        return cached
+
+    def get_system_prompt(self, language: str, provider: str = "groq") -> str:
+        """Get the conversation system prompt for a language."""
+        return self._system_prefix(language, provider)[0]
+
+    def select_history(
+        self,
+        context: Optional[list],
+        provider: str = "groq",
+        language: str = "en",
+        budget: Optional[int] = None,
+    ) -> tuple[list[dict], int]:
+        """Pick the most recent messages that fit in the history budget.
+
+        Messages are taken newest-first and returned in chronological order.
+
+        Returns:
+            Tuple of (selected messages, their estimated token cost)
+        """
+        if not context:
+            return [], 0
+
+        remaining = self.history_token_budget if budget is None else budget
+        selected = []
+        used = 0
+        for msg in reversed(context):
+            cost = (
+                estimate_tokens(msg["content"], provider, language)
+                + MESSAGE_OVERHEAD_TOKENS
+            )
+            if cost > remaining:
+                break
+            selected.append({"role": msg["role"], "content": msg["content"]})
+            remaining -= cost
+            used += cost
+
+        selected.reverse()
+        return selected, used
+
+    def build(
+        self,
+        user_input: str,
+        language: str = "en",
+        context: Optional[list] = None,
+        provider: str = "groq",
+        system_instruction: Optional[str] = None,
+    ) -> BuiltPrompt:
+        """Build a prompt for a conversation turn.
+
+        Args:
+            user_input: What the child said
+            language: Language code ('en' or 'sv')
+            context: Previous conversation messages, oldest first
+            provider: Provider the prompt is for, used for token estimates
+            system_instruction: Override the default system prompt
+
+        Returns:
+            BuiltPrompt with system instruction and budgeted history
+        """
+        if system_instruction is None:
+            system_instruction, system_tokens = self._system_prefix(language, provider)
+        else:
+            system_tokens = estimate_tokens(system_instruction, provider, language)
+
+        history, history_tokens = self.select_history(context, provider, language)
+        input_tokens = estimate_tokens(user_input, provider, language)
+
+        built = BuiltPrompt(
+            system_instruction=system_instruction,
+            history=history,
+            user_input=user_input,
+            estimated_tokens=system_tokens + history_tokens + input_tokens,
+        )
+        logger.debug(
+            f"Built {provider} prompt: {len(history)} history messages, "
+            f"~{built.estimated_tokens} tokens"
+        )
+        return built
+
+
+# Global prompt builder instance
+prompt_builder = PromptBuilder()
@@ -0,0 +1,280 @@
+"""Per-provider rate limiting for LLM calls.
+
+Each provider gets a token bucket sized to our quota, so a burst of
+requests is spread out instead of turning into a wall of 429 responses.
+Callers wait their turn in a queue served by priority, then arrival, so
+a live turn gets the next token ahead of any queued story. They wait only
+until their deadline: a child waiting for an answer is better served by
+the next provider, or a quick "ask me again", than by a long silence.
+When a provider does answer 429, its Retry-After (or rate-limit reset)
+headers pause the provider for exactly that long.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pause used when a 429 response doesn't say how long to wait
+DEFAULT_RETRY_AFTER = 5.0
+DEFAULT_MAX_QUEUE = 32
+
+# Groq reset headers look like "2m59.56s", "7.66s" or "120ms"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+# Gemini puts the delay in the error details: "retry_delay { seconds: 42 }"
+_RETRY_DELAY = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)")
+
+
+class RateLimitError(Exception):
+    """A provider (or our own limit for it) can't take a request right now."""
+
+    def __init__(self, message: str, retry_after: float = DEFAULT_RETRY_AFTER):
+        """Initialize error.
+
+        Args:
+            message: What was rate limited
+            retry_after: Seconds until a retry can succeed
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse a duration like "1m30s", "7.66s", "120ms" or "42" into seconds."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Get how long to wait from a rate-limited response's headers.
+
+    Understands Retry-After (seconds or an HTTP date), retry-after-ms, and
+    the x-ratelimit-reset-requests / x-ratelimit-reset-tokens durations.
+
+    Returns:
+        Seconds to wait, or None if the headers don't say
+    """
+    headers = {key.lower(): value for key, value in headers.items()}
+
+    if "retry-after-ms" in headers:
+        try:
+            return max(float(headers["retry-after-ms"]) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        seconds = parse_duration(retry_after)
+        if seconds is not None:
+            return max(seconds, 0.0)
+        try:
+            when = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            when = None
+        if when is not None:
+            return max(when.timestamp() - time.time(), 0.0)
+
+    resets = [
+        parse_duration(headers[name])
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if name in headers
+    ]
+    resets = [seconds for seconds in resets if seconds is not None]
+    return max(resets) if resets else None
+
+
+def parse_retry_delay(message: str) -> Optional[float]:
+    """Get the retry delay from a Gemini quota error message, if it has one."""
+    match = _RETRY_DELAY.search(message)
+    return float(match.group(1)) if match else None
+
+
+class TokenBucket:
+    """Classic token bucket."""
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a full bucket.
+
+        Args:
+            rate_per_second: Tokens added per second
+            capacity: Most tokens held (the largest burst)
+            clock: Time source (monotonic seconds)
+        """
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate_per_second
+        )
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        """Tokens available now."""
+        self._refill(self._clock())
+        return self._tokens
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until the given number of tokens have built up."""
+        self._refill(self._clock())
+        if self._tokens >= tokens:
+            return 0.0
+        return (tokens - self._tokens) / self.rate_per_second
+
+    def take(self) -> None:
+        """Take a token."""
+        self._refill(self._clock())
+        self._tokens -= 1
+
+
+class ProviderRateLimiter:
+    """Token bucket and deadline-aware priority queue for one provider."""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: Optional[float],
+        burst: Optional[int] = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize limiter.
+
+        Args:
+            name: Provider name, for logs and errors
+            requests_per_minute: Our quota (None for no limit)
+            burst: Requests allowed back to back (defaults to 10 s of quota)
+            max_queue: Most requests waiting at once
+            clock: Time source (monotonic seconds)
+        """
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.max_queue = max_queue
+        self._clock = clock
+        self._bucket: Optional[TokenBucket] = None
+        if requests_per_minute:
+            if burst is None:
+                burst = max(1, int(requests_per_minute / 6))
+            self._bucket = TokenBucket(requests_per_minute / 60, burst, clock)
+        self._paused_until = 0.0
+        # (priority, arrival, future) of callers waiting for a token
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._waiting = 0
+        self.rejected = 0
+        self.rate_limited = 0
+
+    def wait_time(self) -> float:
+        """Seconds until the next request could be sent."""
+        pause = max(self._paused_until - self._clock(), 0.0)
+        if self._bucket is None:
+            return pause
+        return max(pause, self._bucket.wait_time())
+
+    def _queued_wait(self, priority: int) -> float:
+        """Seconds until a new caller with this priority would get a token."""
+        pause = max(self._paused_until - self._clock(), 0.0)
+        if self._bucket is None:
+            return pause
+        ahead = sum(
+            1 for waiter_priority, _, future in self._waiters
+            if waiter_priority <= priority and not future.done()
+        )
+        return max(pause, self._bucket.wait_time(ahead + 1))
+
+    def _grant(self) -> None:
+        """Hand out tokens in priority order, then sleep until the next one."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)  # Gave up waiting
+                continue
+            wait = self.wait_time()
+            if wait > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(wait, self._grant)
+                return
+            heapq.heappop(self._waiters)
+            if self._bucket is not None:
+                self._bucket.take()
+            future.set_result(None)
+
+    async def acquire(self, timeout: float, priority: int = 0) -> None:
+        """Wait for a turn to call the provider.
+
+        Args:
+            timeout: Seconds the caller can wait
+            priority: Queue position of the caller's kind of work, lower
+                first (see RequestClass.priority)
+
+        Raises:
+            RateLimitError: If the queue is full or the wait would pass the deadline
+        """
+        if not self._waiters and self.wait_time() == 0:
+            if self._bucket is not None:
+                self._bucket.take()
+            return
+
+        if self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise RateLimitError(f"{self.name} queue is full", self.wait_time())
+        wait = self._queued_wait(priority)
+        if wait > timeout:
+            self.rejected += 1
+            raise RateLimitError(f"{self.name} is rate limited", wait)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+        self._grant()
+        self._waiting += 1
+        try:
+            # More urgent callers may still get ahead, so keep the deadline
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RateLimitError(f"{self.name} queue wait timed out", self.wait_time())
+        finally:
+            self._waiting -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Stop sending requests for a while, after a 429 response."""
+        self.rate_limited += 1
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+        logger.warning(f"{self.name} rate limited, pausing for {seconds:.1f}s")
+
+    def get_status(self) -> dict:
+        """Get limiter status for health endpoints and logs."""
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens": round(self._bucket.tokens, 2) if self._bucket else None,
+            "waiting": self._waiting,
+            "wait_seconds": round(self.wait_time(), 2),
+            "rejected": self.rejected,
+            "rate_limited": self.rate_limited,
+        }
@@ -0,0 +1,169 @@
+"""Exact-match response cache for frequent, context-free questions.
+
+Children ask the same things over and over ("what's your name?",
+"vad heter du?"). Answers to those are cached by normalized text, language
+and intent so repeat questions skip the LLM. Only text is cached here;
+the answer is synthesized like any other.
+"""
+
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sagatoyai.models import Intent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_SIZE = 500
+
+# Filler words children (and STT) put around the actual question
+_FILLER_WORDS = {"hey", "hi", "hello", "hej", "hallå", "toy", "please", "snälla"}
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Normalize text so trivially different phrasings share a cache key.
+
+    Lowercases, normalizes unicode, strips punctuation and leading filler
+    words like "hey toy", and collapses whitespace.
+    """
+    text = unicodedata.normalize("NFC", text).lower()
+    text = text.replace("’", "'")
+    text = _PUNCTUATION.sub(" ", text)
+    words = _WHITESPACE.sub(" ", text).strip().split(" ")
+    while words and words[0] in _FILLER_WORDS:
+        words.pop(0)
+    return " ".join(words)
+
+
+@dataclass
+class CachedResponse:
+    """Cached answer with usage statistics."""
+
+    text: str
+    provider: str
+    created_at: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+
+class ResponseCache:
+    """TTL + LRU cache of LLM answers keyed by (language, intent, question)."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_size: int = DEFAULT_MAX_SIZE,
+        cacheable_intents: Optional[set[Intent]] = None,
+    ):
+        """Initialize response cache.
+
+        Args:
+            ttl_seconds: How long an answer stays valid
+            max_size: Maximum number of cached answers (LRU eviction)
+            cacheable_intents: Intents whose answers may be cached
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.cacheable_intents = cacheable_intents or {Intent.GENERAL}
+        self._entries: OrderedDict[tuple[str, str, str], CachedResponse] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def is_cacheable(self, intent: Intent, context: Optional[list] = None) -> bool:
+        """Check whether a turn can be served from or stored in the cache.
+
+        Only context-free turns qualify, since answers to follow-up
+        questions depend on the conversation.
+        """
+        return not context and intent in self.cacheable_intents
+
+    def _key(self, question: str, language: str, intent: Intent) -> Optional[tuple[str, str, str]]:
+        """Build cache key, or None if the question normalizes to nothing."""
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        return (language, intent.value, normalized)
+
+    def _get_entry(self, key: Optional[tuple[str, str, str]]) -> Optional[CachedResponse]:
+        """Get a live entry, dropping it if expired."""
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, question: str, language: str, intent: Intent) -> Optional[CachedResponse]:
+        """Look up a cached answer and count the hit.
+
+        Args:
+            question: What the child said
+            language: Language code ('en' or 'sv')
+            intent: Detected intent
+
+        Returns:
+            CachedResponse or None on a miss
+        """
+        key = self._key(question, language, intent)
+        entry = self._get_entry(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        self._hits += 1
+        logger.debug(f"Response cache hit ({entry.hits}) for {key}")
+        return entry
+
+    def put(
+        self,
+        question: str,
+        language: str,
+        intent: Intent,
+        text: str,
+        provider: str,
+    ) -> None:
+        """Store an answer, evicting the least recently used entry if full."""
+        key = self._key(question, language, intent)
+        if key is None:
+            return
+
+        self._entries[key] = CachedResponse(text=text, provider=provider)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "top": [
+                {"question": key[2], "language": key[0], "hits": entry.hits}
+                for key, entry in sorted(
+                    self._entries.items(), key=lambda item: item[1].hits, reverse=True
+                )[:10]
+            ],
+        }
+
+
+# Global response cache instance
+response_cache = ResponseCache()
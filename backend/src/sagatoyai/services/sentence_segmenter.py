@@ -0,0 +1,166 @@
+"""Incremental sentence segmentation for streamed text.
+
+LLM replies arrive a few characters at a time and are spoken sentence by
+sentence. SentenceSegmenter looks at each new character once, no matter
+how long the reply gets, and keeps punctuation with its sentence so TTS
+gets the prosody right. It knows that "t.ex.", "Mr." and "3.5" don't end
+a sentence, and that an ellipsis only does when a capitalized word
+follows. The first sentence of a reply can optionally be cut early at a
+comma, so speech starts sooner when it is long.
+"""
+
+import re
+from typing import Optional
+
+SENTENCE_END_CHARS = ".!?…"
+CLAUSE_END_CHARS = ",;:"
+# Closing quotes and brackets stay with the sentence they end
+CLOSING_CHARS = "\"'”’»)]"
+OPENING_CHARS = "\"'“‘«(["
+
+# Abbreviations by language, lowercase and without the final period
+ABBREVIATIONS = {
+    "sv": frozenset({
+        "t.ex", "bl.a", "d.v.s", "dvs", "o.s.v", "osv", "m.m", "m.fl", "s.k",
+        "p.g.a", "pga", "f.d", "fr.o.m", "t.o.m", "o.d", "f.kr", "e.kr", "ca",
+        "kl", "nr", "st", "resp", "jfr", "obs", "tel", "sid", "forts",
+    }),
+    "en": frozenset({
+        "mr", "mrs", "ms", "dr", "prof", "st", "sr", "jr", "mt", "vs", "e.g",
+        "i.e", "approx", "fig", "dept", "ave", "inc", "ltd",
+    }),
+}
+_ALL_ABBREVIATIONS = frozenset().union(*ABBREVIATIONS.values())
+
+# Characters where a sentence or clause might end
+_BREAK_CANDIDATE = re.compile(r"[.!?…,;:\n]")
+
+
+class SentenceSegmenter:
+    """Splits streamed text into sentences as soon as each one is complete."""
+
+    def __init__(self, language: Optional[str] = None, early_clause_chars: Optional[int] = None):
+        """Initialize segmenter.
+
+        Args:
+            language: Language code for abbreviations (None knows all languages)
+            early_clause_chars: If set, a first sentence at least this long is
+                released at its first comma (or ; or :) instead of its end
+        """
+        self.abbreviations = ABBREVIATIONS.get(language, _ALL_ABBREVIATIONS)
+        self.early_clause_chars = early_clause_chars
+        self._buffer = ""
+        self._scan_pos = 0  # Next buffer index to look at
+        self._released = False  # Whether anything has been released yet
+
+    @property
+    def pending(self) -> str:
+        """Text received but not yet released."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add streamed text and get the sentences it completes.
+
+        Args:
+            chunk: Next piece of text
+
+        Returns:
+            Complete sentences with their punctuation, possibly empty
+        """
+        buffer = self._buffer + chunk
+        sentences = []
+        start = 0
+        position = self._scan_pos
+
+        while True:
+            match = _BREAK_CANDIDATE.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+            decision = self._check_break(buffer, start, match.start())
+            if decision is None:
+                # Can't tell until more text arrives
+                position = match.start()
+                break
+            position, is_break = decision
+            if is_break:
+                sentence = buffer[start:position].strip()
+                if sentence:
+                    sentences.append(sentence)
+                    self._released = True
+                start = position
+
+        self._buffer = buffer[start:]
+        self._scan_pos = position - start
+        return sentences
+
+    def flush(self) -> list[str]:
+        """Release whatever is left when the stream ends."""
+        sentence = self._buffer.strip()
+        self._buffer = ""
+        self._scan_pos = 0
+        return [sentence] if sentence else []
+
+    def _check_break(self, buffer: str, start: int, index: int) -> Optional[tuple[int, bool]]:
+        """Decide whether the punctuation at index ends a sentence.
+
+        Returns:
+            (index just past the punctuation, whether it is a break), or
+            None if the text after it hasn't arrived yet
+        """
+        char = buffer[index]
+        if char == "\n":
+            return index + 1, True
+
+        length = len(buffer)
+        if char in CLAUSE_END_CHARS:
+            if (
+                self.early_clause_chars is None
+                or self._released
+                or index - start < self.early_clause_chars
+            ):
+                return index + 1, False
+            if index + 1 == length:
+                return None
+            # "1,5" is a number, not a clause
+            return index + 1, buffer[index + 1].isspace()
+
+        punctuation_end = index
+        while punctuation_end < length and buffer[punctuation_end] in SENTENCE_END_CHARS:
+            punctuation_end += 1
+        end = punctuation_end
+        while end < length and buffer[end] in CLOSING_CHARS:
+            end += 1
+        if end == length:
+            return None
+        if not buffer[end].isspace():
+            # "3.5", "t.ex" or "?!" in the middle of a word
+            return end, False
+
+        punctuation = buffer[index:punctuation_end]
+        if "…" in punctuation or ".." in punctuation:
+            # An ellipsis is a pause unless the next word starts a new sentence
+            next_word = end
+            while next_word < length and buffer[next_word].isspace():
+                next_word += 1
+            if next_word == length:
+                return None
+            return end, buffer[next_word].isupper()
+
+        if punctuation == ".":
+            word_start = index
+            while word_start > start and not buffer[word_start - 1].isspace():
+                word_start -= 1
+            word = buffer[word_start:index].lstrip(OPENING_CHARS)
+            if word.lower() in self.abbreviations:
+                return end, False
+            if len(word) == 1 and word.isupper() and word != "I":
+                return end, False  # An initial, as in "J. K. Rowling"
+
+        return end, True
+
+
+def split_sentences(text: str, language: Optional[str] = None) -> list[str]:
+    """Split complete text into sentences (see SentenceSegmenter)."""
+    segmenter = SentenceSegmenter(language)
+    return segmenter.feed(text) + segmenter.flush()
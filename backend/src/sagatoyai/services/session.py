@@ -6,7 +6,7 @@ from typing import Optional
 
 import redis.asyncio as redis
 
-from sagatoyai.models import Message, SessionContext
+from sagatoyai.models import Message, SessionContext, StoryPosition
 
 SESSION_EXPIRE_MINUTES = 30
 
@@ -97,9 +97,16 @@ class SessionManager:
         return context
 
     async def set_story_context(
-        self, session_id: str, story_content: str
+        self,
+        session_id: str,
+        story_content: str,
+        position: Optional[StoryPosition] = None,
     ) -> Optional[SessionContext]:
-        """Store current story in session for continuation."""
+        """Store current story in session for continuation.
+
+        Library stories also store their position, so "continue the story"
+        can resume the pre-generated audio at the right segment.
+        """
         if not self._redis:
             await self.connect()
 
@@ -108,6 +115,28 @@ class SessionManager:
             return None
 
         context.current_story = story_content
+        context.story_position = position
+
+        await self._redis.setex(
+            self._session_key(session_id),
+            SESSION_EXPIRE_MINUTES * 60,
+            context.model_dump_json(),
+        )
+
+        return context
+
+    async def set_story_segment(
+        self, session_id: str, segment: int
+    ) -> Optional[SessionContext]:
+        """Record how far into the current library story playback got."""
+        if not self._redis:
+            await self.connect()
+
+        context = await self.get_context(session_id)
+        if context is None or context.story_position is None:
+            return None
+
+        context.story_position.segment = segment
 
         await self._redis.setex(
             self._session_key(session_id),
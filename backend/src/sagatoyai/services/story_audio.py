@@ -0,0 +1,164 @@
+"""Segmented story audio with a seek index.
+
+Library stories are synthesized as short segments of a few sentences each
+and stored as one MP3 next to a <story_id>.index.json file mapping every
+segment to its span of the story text, its byte range in the MP3 and its
+start time. Segments are whole MP3 frames, so playback can start at any
+segment's byte offset (an ordinary Range request) and an interrupted
+story continues instantly, without new synthesis.
+
+Stories are always synthesized with an MP3 engine (STORY_TTS_PROVIDER),
+whatever TTS_PROVIDER picks for live speech.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from sagatoyai.models import StoryAudioIndex, StorySegment
+from sagatoyai.services.mp3 import mp3_duration, parse_frame_header
+from sagatoyai.services.story_library import get_story_audio_path
+from sagatoyai.services.tts import tts_service
+from sagatoyai.services.tts_engines import TTSEngine, tts_engines
+
+logger = logging.getLogger(__name__)
+
+# Roughly 15 seconds of speech per segment
+STORY_SEGMENT_CHARS = 250
+
+# Engine for library stories; must produce MP3
+STORY_TTS_PROVIDER = os.getenv("STORY_TTS_PROVIDER", "edge")
+
+_WORD = re.compile(r"\S+")
+
+
+def get_story_index_path(series_id: str, story_id: str, language: str = "sv") -> Optional[Path]:
+    """Get where a story's seek index lives, or None if the story is unknown."""
+    audio_path = get_story_audio_path(series_id, story_id, language)
+    if audio_path is None:
+        return None
+    return audio_path.with_suffix(".index.json")
+
+
+def get_story_tts_engine() -> TTSEngine:
+    """The engine library stories are synthesized with."""
+    return tts_engines.get(STORY_TTS_PROVIDER)
+
+
+def build_story_index(
+    series_id: str,
+    story_id: str,
+    language: str,
+    text: str,
+    chunks: list[tuple[str, bytes]],
+) -> StoryAudioIndex:
+    """Build the seek index for audio made of consecutive chunks.
+
+    Args:
+        series_id: Story series ID
+        story_id: Story ID
+        language: Language code
+        text: The full story text
+        chunks: (chunk text, audio) pairs as returned by synthesize_chunks
+
+    Returns:
+        Index over the concatenated chunk audio
+    """
+    # Chunking only changes whitespace, so chunk words line up with text words
+    words = [match.span() for match in _WORD.finditer(text)]
+    word_index = 0
+    byte_offset = 0
+    start_time = 0.0
+    segments = []
+
+    for index, (chunk_text, audio) in enumerate(chunks):
+        word_count = len(chunk_text.split())
+        first, last = words[word_index], words[word_index + word_count - 1]
+        word_index += word_count
+
+        duration = mp3_duration(audio)
+        segments.append(StorySegment(
+            index=index,
+            text_start=first[0],
+            text_end=last[1],
+            byte_offset=byte_offset,
+            byte_length=len(audio),
+            start_time=round(start_time, 3),
+            duration=round(duration, 3),
+        ))
+        byte_offset += len(audio)
+        start_time += duration
+
+    return StoryAudioIndex(
+        series_id=series_id,
+        story_id=story_id,
+        language=language,
+        duration=round(start_time, 3),
+        audio_size=byte_offset,
+        segments=segments,
+    )
+
+
+async def synthesize_story(
+    series_id: str,
+    story_id: str,
+    text: str,
+    language: str = "sv",
+) -> tuple[bytes, StoryAudioIndex]:
+    """Synthesize a story as segments.
+
+    Returns:
+        (MP3 audio, seek index)
+
+    Raises:
+        TTSError: If synthesis fails or doesn't produce MP3
+    """
+    chunks = await tts_service.synthesize_chunks(
+        text,
+        language,
+        max_chars=STORY_SEGMENT_CHARS,
+        provider=STORY_TTS_PROVIDER,
+        audio_format="mp3",
+    )
+    index = build_story_index(series_id, story_id, language, text, chunks)
+    return b"".join(audio for _, audio in chunks), index
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def save_story_audio(audio: bytes, index: StoryAudioIndex, text: Optional[str] = None) -> Path:
+    """Save story audio and its index (and optionally text) into the library.
+
+    Returns:
+        Path of the saved MP3
+
+    Raises:
+        ValueError: If the audio doesn't start with an MP3 frame
+    """
+    if parse_frame_header(audio) is None:
+        raise ValueError(f"Audio for story {index.story_id} is not MP3")
+    audio_path = get_story_audio_path(index.series_id, index.story_id, index.language)
+    index_path = get_story_index_path(index.series_id, index.story_id, index.language)
+    if text is not None:
+        _write_atomic(audio_path.with_suffix(".txt"), text.encode("utf-8"))
+    _write_atomic(audio_path, audio)
+    _write_atomic(index_path, index.model_dump_json(indent=2).encode())
+    return audio_path
+
+
+def load_story_index(
+    series_id: str, story_id: str, language: str = "sv"
+) -> Optional[StoryAudioIndex]:
+    """Load a story's seek index, or None if it has none."""
+    index_path = get_story_index_path(series_id, story_id, language)
+    if index_path is None or not index_path.is_file():
+        return None
+    return StoryAudioIndex.model_validate_json(index_path.read_bytes())
@@ -1,156 +1,66 @@
-"""Story library with curated series for children."""
-
-from typing import Dict, List
-
-# Story series catalog
-STORY_SERIES = {
-    "trex": {
-        "name": "T-Rex Adventures",
-        "character": "T-Rex the friendly dinosaur",
-        "theme": "Geography and Swedish cities",
-        "stories": [
-            {
-                "id": "trex_stockholm",
-                "title": "T-Rex visits Stockholm",
-                "location": "Stockholm",
-                "landmarks": ["Vasa Museum", "Gamla Stan", "Royal Palace"],
-                "lesson": "Learning about Swedish history and culture",
-            },
-            {
-                "id": "trex_gothenburg",
-                "title": "T-Rex in Gothenburg",
-                "location": "Gothenburg",
-                "landmarks": ["Liseberg", "Harbor", "Fish Market"],
-                "lesson": "Exploring Sweden's second largest city",
-            },
-            {
-                "id": "trex_malmo",
-                "title": "T-Rex discovers Malmö",
-                "location": "Malmö",
-                "landmarks": ["Turning Torso", "Öresund Bridge", "Malmöhus Castle"],
-                "lesson": "Understanding modern Swedish architecture",
-            },
-            {
-                "id": "trex_copenhagen",
-                "title": "T-Rex crosses to Copenhagen",
-                "location": "Copenhagen",
-                "landmarks": ["Tivoli Gardens", "Little Mermaid", "Nyhavn"],
-                "lesson": "Learning about Denmark, Sweden's neighbor",
-            },
-        ],
-    },
-    "kanin": {
-        "name": "Kanin and Friends",
-        "character": "Kanin the clever rabbit",
-        "theme": "Friendship and problem-solving",
-        "stories": [
-            {
-                "id": "kanin_forest",
-                "title": "Kanin in the Forest",
-                "location": "Swedish forest",
-                "friends": ["Squirrel", "Hedgehog", "Owl"],
-                "lesson": "Teamwork and helping each other",
-            },
-            {
-                "id": "kanin_lake",
-                "title": "Kanin by the Lake",
-                "location": "Beautiful Swedish lake",
-                "friends": ["Ducklings", "Frog", "Fish"],
-                "lesson": "Caring for those who are lost",
-            },
-            {
-                "id": "kanin_river",
-                "title": "Kanin at the River",
-                "location": "Flowing river",
-                "friends": ["Beaver", "Otter", "Birds"],
-                "lesson": "Building things together",
-            },
-            {
-                "id": "kanin_sea",
-                "title": "Kanin's Beach Adventure",
-                "location": "Swedish coastline",
-                "friends": ["Seagull", "Crab", "Seal"],
-                "lesson": "Exploring new places with friends",
-            },
-        ],
-    },
-    "delfin": {
-        "name": "Delfin the Helper",
-        "character": "Delfin the kind dolphin",
-        "theme": "Helping others and ocean life",
-        "stories": [
-            {
-                "id": "delfin_fishermen",
-                "title": "Delfin helps the Fishermen",
-                "location": "Gothenburg harbor",
-                "activity": "Helping fishermen find fish",
-                "lesson": "Working together and being helpful",
-            },
-            {
-                "id": "delfin_rescue",
-                "title": "Delfin's Brave Rescue",
-                "location": "Swedish west coast",
-                "activity": "Rescuing a child in the water",
-                "lesson": "Being brave and helping in emergencies",
-            },
-            {
-                "id": "delfin_swimming",
-                "title": "Delfin teaches Swimming",
-                "location": "Safe swimming area",
-                "activity": "Teaching kids water safety",
-                "lesson": "Learning to swim safely",
-            },
-            {
-                "id": "delfin_ocean",
-                "title": "Delfin cleans the Ocean",
-                "location": "Swedish waters",
-                "activity": "Cleaning plastic from the sea",
-                "lesson": "Taking care of our environment",
-            },
-        ],
-    },
-}
+"""Story library with curated series for children.
 
+The catalog lives in data/stories.json and is loaded on first use into
+indexes by story ID, series and keyword (location, character, lesson, ...),
+so "tell me a story about Malmö" is a few dict lookups rather than a scan
+or an LLM round trip. Keywords are indexed by a rough stem, so inflected
+forms ("kaninerna", "dinosaurs") find the story too. Prompts are built
+once per story and language.
+"""
 
-def get_story_series() -> Dict:
-    """Get all available story series."""
-    return STORY_SERIES
+import json
+import logging
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
 
+logger = logging.getLogger(__name__)
 
-def get_series_list() -> List[str]:
-    """Get list of series names."""
-    return list(STORY_SERIES.keys())
-
-
-def get_stories_in_series(series_id: str) -> List[Dict]:
-    """Get all stories in a specific series."""
-    if series_id in STORY_SERIES:
-        return STORY_SERIES[series_id]["stories"]
-    return []
-
+CATALOG_PATH = Path(__file__).parent.parent / "data" / "stories.json"
 
-def get_story_prompt(series_id: str, story_id: str, language: str = "en") -> str:
-    """Generate story prompt for LLM based on series and story ID."""
-    if series_id not in STORY_SERIES:
-        return None
+# Pre-generated story audio, laid out as <lang>/<series>/<story_id>.mp3
+# (written by scripts/generate_stories.py)
+STORIES_DIR = Path(os.getenv("STORIES_DIR", "stories"))
 
-    series = STORY_SERIES[series_id]
-    story = next((s for s in series["stories"] if s["id"] == story_id), None)
+# How much a query word counts when it matches each story field
+FIELD_WEIGHTS = {
+    "location": 3.0,
+    "keywords": 3.0,
+    "landmarks": 2.0,
+    "title": 2.0,
+    "character": 2.0,
+    "friends": 1.5,
+    "series": 1.5,
+    "activity": 1.0,
+    "lesson": 1.0,
+    "theme": 0.5,
+}
 
-    if not story:
-        return None
+# Words that say nothing about which story is wanted (diacritics stripped)
+STOPWORDS = frozenset({
+    # English
+    "a", "about", "an", "and", "at", "by", "can", "for", "from", "in", "is", "it",
+    "me", "my", "of", "on", "one", "please", "read", "story", "stories", "tell",
+    "the", "to", "us", "want", "with", "you",
+    # Swedish
+    "av", "beratta", "den", "det", "du", "en", "ett", "for", "jag", "kan",
+    "las", "lasa", "med", "mig", "oss", "och", "om", "pa", "saga", "sagan", "sagor",
+    "som", "till", "vill",
+})
 
-    # Build prompt based on language
-    if language == "sv":
-        prompt = f"""Skriv en rolig och lärorik barnberättelse (3-5 minuter lång) för barn 3-10 år.
+PROMPT_TEMPLATES = {
+    "sv": """Skriv en rolig och lärorik barnberättelse (3-5 minuter lång) för barn 3-10 år.
 
-Serie: {series['name']}
-Huvudkaraktär: {series['character']}
-Titel: {story['title']}
-Plats: {story['location']}
+Serie: {series_name}
+Huvudkaraktär: {character}
+Titel: {title}
+Plats: {location}
 
-Tema: {series['theme']}
-Läxa: {story.get('lesson', '')}
+Tema: {theme}
+Läxa: {lesson}
 
 Inkludera:
 - Enkelt, varmt språk för barn
@@ -158,17 +68,16 @@ Inkludera:
 - Positiv läxa
 - Lyckligt slut
 
-Berättelsen ska vara engagerande, fantasifull och lämplig för barn."""
-    else:
-        prompt = f"""Write a fun and educational children's story (3-5 minutes long) for kids aged 3-10.
+Berättelsen ska vara engagerande, fantasifull och lämplig för barn.""",
+    "en": """Write a fun and educational children's story (3-5 minutes long) for kids aged 3-10.
 
-Series: {series['name']}
-Main Character: {series['character']}
-Title: {story['title']}
-Location: {story['location']}
+Series: {series_name}
+Main Character: {character}
+Title: {title}
+Location: {location}
 
-Theme: {series['theme']}
-Lesson: {story.get('lesson', '')}
+Theme: {theme}
+Lesson: {lesson}
 
 Include:
 - Simple, warm language for children
@@ -176,6 +85,226 @@ Include:
 - Positive lesson
 - Happy ending
 
-The story should be engaging, imaginative, and age-appropriate."""
+The story should be engaging, imaginative, and age-appropriate.""",
+}
+
+# Common Swedish and English inflection endings (diacritics stripped),
+# longest first, and the shortest stem left after removing one
+INFLECTION_SUFFIXES = (
+    "arnas", "ernas", "ornas", "arna", "erna", "orna",
+    "ens", "ets", "an", "ar", "en", "er", "es", "et", "na", "or",
+    "a", "e", "s",
+)
+MIN_STEM_LENGTH = 4
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+def normalize_keyword(word: str) -> str:
+    """Casefold and strip diacritics, so "Malmö" and "malmo" match."""
+    decomposed = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem_keyword(word: str) -> str:
+    """Strip inflection endings, so "drakarna", "draken" and "drake" match.
+
+    Not a real stemmer: both the catalog and queries go through it, so
+    it only has to reduce the forms of a word to the same string.
+    """
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in INFLECTION_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+                word = word[:-len(suffix)]
+                stripped = True
+                break
+    return word
+
+
+def extract_keywords(text: str) -> list[str]:
+    """Split text into normalized words, dropping stopwords."""
+    words = (normalize_keyword(word) for word in _WORD_PATTERN.findall(text))
+    return [word for word in words if len(word) > 1 and word not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class StoryMatch:
+    """A catalog story matching a search query."""
+
+    series_id: str
+    story_id: str
+    score: float
+
+
+class StoryCatalog:
+    """Indexed, file-backed story catalog."""
+
+    def __init__(self, catalog_path: Optional[Path] = None):
+        """Initialize catalog.
+
+        Args:
+            catalog_path: Path to catalog JSON (defaults to the bundled catalog)
+        """
+        self.catalog_path = catalog_path or CATALOG_PATH
+        self._series: Optional[dict] = None
+        self._stories: dict[str, tuple[str, dict]] = {}  # story_id -> (series_id, story)
+        self._order: dict[str, int] = {}  # story_id -> catalog position
+        self._keywords: dict[str, dict[str, float]] = {}  # stem -> story_id -> weight
+        self._prompts: dict[tuple[str, str], str] = {}
+
+    def _load(self) -> None:
+        """Load the catalog from disk on first use."""
+        data = json.loads(self.catalog_path.read_text(encoding="utf-8"))
+        self.load_data(data)
+        logger.info(
+            f"Loaded story catalog: {len(self._series)} series, {len(self._stories)} stories"
+        )
+
+    def load_data(self, data: dict) -> None:
+        """Load a catalog dict ({"series": {...}}) and build the indexes."""
+        self._series = data["series"]
+        self._stories = {}
+        self._order = {}
+        self._keywords = {}
+        self._prompts = {}
+
+        for series_id, series in self._series.items():
+            for story in series["stories"]:
+                self._stories[story["id"]] = (series_id, story)
+                self._order[story["id"]] = len(self._order)
+                fields = {
+                    "series": f"{series_id} {series['name']}",
+                    "character": series["character"],
+                    "theme": series["theme"],
+                    "keywords": " ".join(series.get("keywords", []) + story.get("keywords", [])),
+                }
+                for field in FIELD_WEIGHTS:
+                    value = story.get(field)
+                    if isinstance(value, list):
+                        value = " ".join(value)
+                    if value:
+                        fields[field] = value
+                for field, text in fields.items():
+                    self._index(story["id"], text, FIELD_WEIGHTS[field])
 
-    return prompt
+    def _index(self, story_id: str, text: str, weight: float) -> None:
+        """Add the words of text to the keyword index for a story."""
+        for word in extract_keywords(text):
+            postings = self._keywords.setdefault(stem_keyword(word), {})
+            postings[story_id] = max(postings.get(story_id, 0.0), weight)
+
+    @property
+    def series(self) -> dict:
+        """All series, keyed by series ID."""
+        if self._series is None:
+            self._load()
+        return self._series
+
+    def get_story(self, series_id: str, story_id: str) -> Optional[Dict]:
+        """Get a story by series and story ID."""
+        if self._series is None:
+            self._load()
+        entry = self._stories.get(story_id)
+        if entry is None or entry[0] != series_id:
+            return None
+        return entry[1]
+
+    def find_story(self, story_id: str) -> Optional[tuple[str, Dict]]:
+        """Get (series_id, story) for a story ID."""
+        if self._series is None:
+            self._load()
+        return self._stories.get(story_id)
+
+    def search(self, query: str, limit: int = 3) -> List[StoryMatch]:
+        """Find stories matching what the child asked for.
+
+        Args:
+            query: Free text, e.g. "tell me a story about Malmö"
+            limit: Maximum number of matches
+
+        Returns:
+            Matches, best first (catalog order breaks ties)
+        """
+        if self._series is None:
+            self._load()
+        scores: dict[str, float] = {}
+        for word in {stem_keyword(word) for word in extract_keywords(query)}:
+            for story_id, weight in self._keywords.get(word, {}).items():
+                scores[story_id] = scores.get(story_id, 0.0) + weight
+
+        ranked = sorted(scores, key=lambda story_id: (-scores[story_id], self._order[story_id]))
+        return [
+            StoryMatch(self._stories[story_id][0], story_id, scores[story_id])
+            for story_id in ranked[:limit]
+        ]
+
+    def get_prompt(self, series_id: str, story_id: str, language: str = "en") -> Optional[str]:
+        """Get the LLM prompt for a story, built once per language."""
+        template_language = "sv" if language == "sv" else "en"
+        key = (story_id, template_language)
+        prompt = self._prompts.get(key)
+        if prompt is not None and self._stories[story_id][0] == series_id:
+            return prompt
+
+        story = self.get_story(series_id, story_id)
+        if not story:
+            return None
+
+        series = self._series[series_id]
+        prompt = PROMPT_TEMPLATES[template_language].format(
+            series_name=series["name"],
+            character=series["character"],
+            title=story["title"],
+            location=story["location"],
+            theme=series["theme"],
+            lesson=story.get("lesson", ""),
+        )
+        self._prompts[key] = prompt
+        return prompt
+
+
+# Global story catalog instance
+story_catalog = StoryCatalog()
+
+
+def get_story_series() -> Dict:
+    """Get all available story series."""
+    return story_catalog.series
+
+
+def get_series_list() -> List[str]:
+    """Get list of series names."""
+    return list(story_catalog.series.keys())
+
+
+def get_stories_in_series(series_id: str) -> List[Dict]:
+    """Get all stories in a specific series."""
+    if series_id in story_catalog.series:
+        return story_catalog.series[series_id]["stories"]
+    return []
+
+
+def get_story(series_id: str, story_id: str) -> Optional[Dict]:
+    """Get a story by series and story ID."""
+    return story_catalog.get_story(series_id, story_id)
+
+
+def get_story_audio_path(series_id: str, story_id: str, language: str = "sv") -> Optional[Path]:
+    """Get where a story's pre-generated audio lives.
+
+    Only IDs found in the catalog resolve to a path, so request parameters
+    can never point outside STORIES_DIR. The file itself may not exist yet.
+
+    Returns:
+        Path to the MP3, or None if the story is unknown
+    """
+    if get_story(series_id, story_id) is None:
+        return None
+    return STORIES_DIR / language / series_id / f"{story_id}.mp3"
+
+
+def get_story_prompt(series_id: str, story_id: str, language: str = "en") -> str:
+    """Generate story prompt for LLM based on series and story ID."""
+    return story_catalog.get_prompt(series_id, story_id, language)
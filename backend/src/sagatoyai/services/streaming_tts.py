@@ -6,14 +6,29 @@ Reduces perceived latency by starting audio playback before full response.
 
 import asyncio
 import logging
-import os
-import re
-from typing import AsyncIterator, Optional
+from bisect import bisect_left
+from typing import AsyncIterator, Callable, Optional
 
-import edge_tts
+from sagatoyai.services.content_filter import filter_text_stream
+from sagatoyai.services.mp3 import iter_frames
+from sagatoyai.services.sentence_segmenter import SentenceSegmenter, split_sentences
+from sagatoyai.services.tts_engines import TTSError, tts_engines
+from sagatoyai.services.word_timings import WordTimingIndex
 
 logger = logging.getLogger(__name__)
 
+# Default AudioChunkBuffer capacity, in chunks
+DEFAULT_BUFFER_CHUNKS = 16
+
+# Boundary event offsets and durations are in 100 ns ticks
+_TICKS_PER_SECOND = 10_000_000
+
+# Speaking rate used before any utterance has been timed: ~150 words per
+# minute, slowed by the -10% rate adjustment to ~135
+DEFAULT_WORDS_PER_SECOND = 135 / 60
+# Weight of each newly timed utterance in the measured speaking rate
+SPEAKING_RATE_SMOOTHING = 0.2
+
 
 class StreamingTTSService:
     """Text-to-Speech service with streaming support.
@@ -29,30 +44,22 @@ class StreamingTTSService:
 
     def __init__(self):
         """Initialize streaming TTS service."""
-        # Voice settings
-        self.voices = {
-            "sv": os.getenv("TTS_VOICE_SV", "sv-SE-SofieNeural"),
-            "en": os.getenv("TTS_VOICE_EN", "en-US-JennyNeural"),
-        }
-        self.rate = os.getenv("TTS_RATE", "-10%")
-
-        # Sentence splitting patterns
-        self.sentence_pattern = re.compile(r'[.!?]+\s*')
+        # Voices, rate and connection limits live on the shared Edge engine
+        self.engine = tts_engines.get("edge")
+        # Measured seconds per word by language, from timed utterances
+        self._seconds_per_word: dict[str, float] = {}
 
-    def _split_into_sentences(self, text: str) -> list[str]:
+    def _split_into_sentences(self, text: str, language: Optional[str] = None) -> list[str]:
         """Split text into sentences for streaming.
 
         Args:
             text: Full text to split
+            language: Language code for abbreviations
 
         Returns:
-            List of sentences
+            List of sentences, punctuation kept
         """
-        # Split on sentence endings
-        sentences = self.sentence_pattern.split(text)
-
-        # Filter empty and clean up
-        sentences = [s.strip() for s in sentences if s.strip()]
+        sentences = split_sentences(text, language)
 
         # If no sentences found, return whole text
         if not sentences:
@@ -64,28 +71,60 @@ class StreamingTTSService:
         self,
         text: str,
         language: str = "sv",
+        timings: Optional[WordTimingIndex] = None,
     ) -> AsyncIterator[bytes]:
         """Stream audio chunks for text.
 
         Args:
             text: Text to convert to speech
             language: Language code
+            timings: If given, filled with each word's timing as the audio
+                arrives, and marked complete at the end
 
         Yields:
             Audio chunks as bytes
         """
-        voice = self.voices.get(language, self.voices["en"])
-
+        if timings is None:
+            stream = self.engine.stream(text, language)
+        else:
+            stream = self._timed_stream(text, language, timings)
         try:
-            communicate = edge_tts.Communicate(text, voice, rate=self.rate)
-
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    yield chunk["data"]
+            async for chunk in stream:
+                yield chunk
 
-        except Exception as e:
+        except TTSError as e:
             logger.error(f"Streaming TTS failed: {e}")
             raise TTSStreamError(f"Failed to stream TTS: {e}")
+        finally:
+            # Frees the engine's connection slot even if playback stops early
+            await stream.aclose()
+
+    async def _timed_stream(
+        self, text: str, language: str, timings: WordTimingIndex
+    ) -> AsyncIterator[bytes]:
+        """Stream audio while recording WordBoundary events into timings."""
+        stream = self.engine.stream_events(text, language, "WordBoundary")
+        try:
+            async for chunk in stream:
+                if chunk["type"] == "audio":
+                    yield chunk["data"]
+                else:
+                    timings.add(chunk)
+        finally:
+            await stream.aclose()
+
+        timings.complete = True
+        self._record_speaking_rate(language, timings)
+
+    def _record_speaking_rate(self, language: str, timings: WordTimingIndex) -> None:
+        """Update the measured speaking rate from a timed utterance."""
+        if not len(timings) or timings.duration <= 0:
+            return
+        seconds_per_word = timings.duration / len(timings)
+        previous = self._seconds_per_word.get(language)
+        if previous is not None:
+            seconds_per_word = previous + SPEAKING_RATE_SMOOTHING * (seconds_per_word - previous)
+        self._seconds_per_word[language] = seconds_per_word
 
     async def synthesize_sentences_streaming(
         self,
@@ -103,7 +142,7 @@ class StreamingTTSService:
         Yields:
             Tuples of (sentence_text, audio_bytes)
         """
-        sentences = self._split_into_sentences(text)
+        sentences = self._split_into_sentences(text, language)
 
         for sentence in sentences:
             if not sentence:
@@ -122,11 +161,50 @@ class StreamingTTSService:
                 logger.error(f"Failed to synthesize sentence: {e}")
                 continue
 
+    async def synthesize_sentences_batched(
+        self,
+        text: str,
+        language: str = "sv",
+    ) -> AsyncIterator[tuple[str, bytes]]:
+        """Stream audio sentence by sentence from a single TTS request.
+
+        The whole text is spoken in one request, and the service's
+        sentence boundary events are used to cut the audio into sentences
+        (see SentenceAudioSplitter). This gives the same (sentence, audio)
+        pairs as synthesize_sentences_streaming with one round trip, and
+        the voice keeps its natural intonation across sentences.
+
+        Args:
+            text: Full text to convert
+            language: Language code
+
+        Yields:
+            Tuples of (sentence_text, audio_bytes)
+        """
+        splitter = SentenceAudioSplitter(text)
+        stream = self.engine.stream_events(text, language, "SentenceBoundary")
+        try:
+            async for chunk in stream:
+                if chunk["type"] == "audio":
+                    for sentence in splitter.add_audio(chunk["data"]):
+                        yield sentence
+                else:
+                    splitter.add_boundary(chunk)
+        except TTSError as e:
+            logger.error(f"Batched TTS failed: {e}")
+            raise TTSStreamError(f"Failed to stream TTS: {e}")
+        finally:
+            await stream.aclose()
+
+        for sentence in splitter.flush():
+            yield sentence
+
     async def synthesize_with_llm_streaming(
         self,
         llm_stream: AsyncIterator[str],
         language: str = "sv",
         min_chunk_size: int = 50,
+        content_filter: bool = True,
     ) -> AsyncIterator[bytes]:
         """Stream TTS as LLM generates text.
 
@@ -136,44 +214,36 @@ class StreamingTTSService:
         Args:
             llm_stream: Async iterator yielding text chunks from LLM
             language: Language code
-            min_chunk_size: Minimum characters before starting TTS
+            min_chunk_size: A first sentence at least this long is spoken
+                from its first comma, so audio starts sooner
+            content_filter: Only speak sentences that pass the content filter
 
         Yields:
             Audio chunks
         """
-        buffer = ""
+        if content_filter:
+            # The filter releases whole, checked sentences - speak each at once
+            sentences = filter_text_stream(llm_stream, language, min_chunk_size)
+        else:
+            sentences = self._segment_stream(llm_stream, language, min_chunk_size)
+
+        async for sentence in sentences:
+            async for audio_chunk in self.synthesize_streaming(sentence, language):
+                yield audio_chunk
 
+    async def _segment_stream(
+        self,
+        llm_stream: AsyncIterator[str],
+        language: str,
+        early_clause_chars: int,
+    ) -> AsyncIterator[str]:
+        """Turn a token stream into sentences without content filtering."""
+        segmenter = SentenceSegmenter(language, early_clause_chars)
         async for text_chunk in llm_stream:
-            buffer += text_chunk
-
-            # Check if we have a complete sentence
-            sentences = self._split_into_sentences(buffer)
-
-            if len(sentences) > 1:
-                # We have at least one complete sentence
-                complete_sentence = sentences[0]
-                buffer = " ".join(sentences[1:])
-
-                # Generate TTS for complete sentence
-                async for audio_chunk in self.synthesize_streaming(
-                    complete_sentence, language
-                ):
-                    yield audio_chunk
-
-            elif len(buffer) >= min_chunk_size and buffer.endswith((" ", ",")):
-                # Buffer is getting long, flush it
-                async for audio_chunk in self.synthesize_streaming(
-                    buffer.strip(), language
-                ):
-                    yield audio_chunk
-                buffer = ""
-
-        # Flush remaining buffer
-        if buffer.strip():
-            async for audio_chunk in self.synthesize_streaming(
-                buffer.strip(), language
-            ):
-                yield audio_chunk
+            for sentence in segmenter.feed(text_chunk):
+                yield sentence
+        for sentence in segmenter.flush():
+            yield sentence
 
     async def synthesize_to_bytes(
         self,
@@ -193,16 +263,24 @@ class StreamingTTSService:
         self,
         text: str,
         language: str = "sv",
+        timings: Optional[WordTimingIndex] = None,
     ) -> float:
         """Estimate audio duration in seconds.
 
-        Rough estimate based on word count and speaking rate.
+        Args:
+            text: Text to be spoken
+            language: Language code
+            timings: Word timings of the synthesized text, if available
+
+        Returns:
+            The real duration when complete timings are given; otherwise
+            word count times the speaking rate measured from earlier
+            utterances in the language (or a default rate)
         """
-        words = len(text.split())
-        # Average speaking rate: ~150 words per minute
-        # With -10% rate adjustment: ~135 words per minute
-        words_per_second = 135 / 60
-        return words / words_per_second
+        if timings is not None and timings.complete:
+            return timings.duration
+        seconds_per_word = self._seconds_per_word.get(language, 1 / DEFAULT_WORDS_PER_SECOND)
+        return len(text.split()) * seconds_per_word
 
 
 class TTSStreamError(Exception):
@@ -210,51 +288,322 @@ class TTSStreamError(Exception):
     pass
 
 
+class SentenceAudioSplitter:
+    """Cuts one utterance's MP3 stream into sentences using boundary events.
+
+    Each SentenceBoundary event gives a sentence's start time and duration.
+    Audio is cut at the first frame past the middle of the pause between
+    two sentences, so every part is whole frames and no speech is lost. A
+    sentence is released as soon as the next one's boundary and enough
+    audio have arrived.
+    """
+
+    def __init__(self, text: str):
+        """Initialize splitter.
+
+        Args:
+            text: The full text, used as one sentence if no events arrive
+        """
+        self.text = text
+        self._audio = bytearray()
+        self._audio_position = 0  # Stream byte position where _audio begins
+        # Frames are parsed once, as they arrive: stream position and
+        # utterance time (in 100 ns ticks, so frames add up exactly) of each
+        # frame not yet released, and how far parsing has got
+        self._frame_positions: list[int] = []
+        self._frame_times: list[int] = []
+        self._scanned = 0
+        self._scanned_time = 0
+        # (text, start, end) in ticks
+        self._sentences: list[tuple[str, int, int]] = []
+        self._released = 0
+
+    def add_boundary(self, event: dict) -> None:
+        """Record a SentenceBoundary event (offsets in 100 ns ticks)."""
+        if event["type"] != "SentenceBoundary":
+            return
+        start = event["offset"]
+        self._sentences.append((event["text"], start, start + event["duration"]))
+
+    def add_audio(self, data: bytes) -> list[tuple[str, bytes]]:
+        """Add audio and get the sentences it completes."""
+        self._audio += data
+        self._scan()
+        return self._release(final=False)
+
+    def flush(self) -> list[tuple[str, bytes]]:
+        """Release the remaining sentences when the stream ends."""
+        if not self._sentences:
+            self._sentences.append((self.text, 0, 0))
+        released = self._release(final=True)
+        if self._released < len(self._sentences):
+            released.append((self._sentences[-1][0], bytes(self._audio)))
+            self._released = len(self._sentences)
+        self._audio_position += len(self._audio)
+        self._audio = bytearray()
+        return released
+
+    def _scan(self) -> None:
+        """Parse the complete frames that arrived since the last call."""
+        unscanned = self._audio[self._scanned - self._audio_position:]
+        scanned_to = 0
+        for frame in iter_frames(unscanned):
+            self._frame_positions.append(self._scanned + frame.offset)
+            self._frame_times.append(self._scanned_time)
+            self._scanned_time += round(frame.header.duration * _TICKS_PER_SECOND)
+            scanned_to = frame.offset + frame.header.length
+        self._scanned += scanned_to
+
+    def _release(self, final: bool) -> list[tuple[str, bytes]]:
+        """Cut off every sentence whose end is known and fully received."""
+        released = []
+        while self._released + 1 < len(self._sentences):
+            text, _, end = self._sentences[self._released]
+            next_start = self._sentences[self._released + 1][1]
+            # The first frame starting at or after the cut time
+            index = bisect_left(
+                self._frame_times, (end + next_start) // 2 if end <= next_start else next_start
+            )
+            if index < len(self._frame_times):
+                offset = self._frame_positions[index] - self._audio_position
+            elif final:
+                # The audio ended early: this sentence gets the rest
+                offset = len(self._audio)
+            else:
+                break
+            released.append((text, bytes(self._audio[:offset])))
+            del self._audio[:offset]
+            self._audio_position += offset
+            self._scanned = max(self._scanned, self._audio_position)
+            kept = bisect_left(self._frame_positions, self._audio_position)
+            del self._frame_positions[:kept]
+            del self._frame_times[:kept]
+            self._released += 1
+        return released
+
+
 class AudioChunkBuffer:
-    """Buffer for managing audio chunks in streaming.
+    """Fixed-capacity ring buffer that cuts streamed audio into playback chunks.
 
-    Useful for the hardware side to manage playback.
+    Useful for the hardware side to manage playback. Audio is copied once,
+    into the ring, and chunks are handed out as memoryviews into it. The
+    ring mirrors its first chunk_size bytes past its end, so a chunk that
+    wraps around is still one contiguous view. A chunk stays valid until
+    the next add(), write() or flush().
+
+    With frame_length set (e.g. mp3.next_unit_length), chunks hold whole
+    frames only, so every chunk can be decoded on its own. A frame longer
+    than a chunk is passed through in chunk-sized pieces.
     """
 
-    def __init__(self, chunk_size: int = 4096):
+    def __init__(
+        self,
+        chunk_size: int = 4096,
+        capacity: Optional[int] = None,
+        frame_length: Optional[Callable[[memoryview], Optional[int]]] = None,
+    ):
         """Initialize buffer.
 
         Args:
-            chunk_size: Size of chunks to yield
+            chunk_size: Size of chunks to yield (the maximum, when frame-aligned)
+            capacity: Bytes the ring holds (defaults to DEFAULT_BUFFER_CHUNKS chunks)
+            frame_length: Returns the length of the frame at the start of the
+                given data, or None if it needs more data to tell
         """
+        if capacity is None:
+            capacity = chunk_size * DEFAULT_BUFFER_CHUNKS
+        if capacity < chunk_size:
+            raise ValueError("capacity must hold at least one chunk")
         self.chunk_size = chunk_size
-        self._buffer = bytearray()
-
-    def add(self, data: bytes) -> list[bytes]:
-        """Add data to buffer and return complete chunks.
+        self.capacity = capacity
+        self.frame_length = frame_length
+        self._store = bytearray(capacity + chunk_size)
+        self._view = memoryview(self._store)
+        # Absolute stream positions; ring offsets are taken modulo capacity
+        self._read = 0
+        self._write = 0
+        self._scan = 0  # End of the whole frames counted into the next chunk
+        self._frame_remaining = 0  # Rest of an oversized frame still to pass through
+        self.underruns = 0
+        self.overruns = 0
+
+    def __len__(self) -> int:
+        """Bytes buffered."""
+        return self._write - self._read
+
+    @property
+    def free(self) -> int:
+        """Bytes that can be written without overrunning."""
+        return self.capacity - len(self)
+
+    def write(self, data: bytes) -> int:
+        """Write as much data as fits.
 
         Args:
             data: Audio data to add
 
         Returns:
-            List of complete chunks ready for playback
+            Bytes written; if that is less than len(data) an overrun is counted
         """
-        self._buffer.extend(data)
+        written = self._write_some(data)
+        if written < len(data):
+            self.overruns += 1
+        return written
 
-        chunks = []
-        while len(self._buffer) >= self.chunk_size:
-            chunk = bytes(self._buffer[:self.chunk_size])
-            self._buffer = self._buffer[self.chunk_size:]
-            chunks.append(chunk)
+    def read(self) -> Optional[memoryview]:
+        """Take the next complete chunk.
+
+        Returns:
+            The chunk, or None (counted as an underrun) if none is ready
+        """
+        size = self._next_chunk_size()
+        if size is None:
+            self.underruns += 1
+            return None
+        return self._take(size)
+
+    def add(self, data: bytes) -> list[memoryview]:
+        """Add data to buffer and return complete chunks.
 
-        return chunks
+        Data larger than the free space is taken in parts; chunks cut
+        before the last part are copied out, since their space is reused.
 
-    def flush(self) -> Optional[bytes]:
+        Args:
+            data: Audio data to add
+
+        Returns:
+            List of complete chunks ready for playback
+        """
+        chunks: list[memoryview] = []
+        copied = 0
+        while True:
+            written = self._write_some(data)
+            if written < len(data):
+                data = memoryview(data)[written:]
+            else:
+                data = b""
+            taken = len(chunks)
+            size = self._next_chunk_size()
+            while size is not None:
+                chunks.append(self._take(size))
+                size = self._next_chunk_size()
+            if not data:
+                return chunks
+            if not written and len(chunks) == taken:
+                raise BufferError("Audio buffer is full but holds no complete chunk")
+            for index in range(copied, len(chunks)):
+                chunks[index] = memoryview(bytes(chunks[index]))
+            copied = len(chunks)
+
+    def flush(self) -> Optional[memoryview]:
         """Flush remaining data in buffer.
 
         Returns:
             Remaining data or None if empty
         """
-        if self._buffer:
-            data = bytes(self._buffer)
-            self._buffer = bytearray()
-            return data
-        return None
+        remaining = len(self)
+        if not remaining:
+            return None
+        start = self._read % self.capacity
+        if start + remaining <= len(self._store):
+            data = self._view[start:start + remaining]
+        else:
+            wrapped = start + remaining - self.capacity
+            data = memoryview(bytes(self._view[start:self.capacity]) + self._view[:wrapped])
+        self._read = self._write = self._scan = 0
+        self._frame_remaining = 0
+        return data
+
+    def get_status(self) -> dict:
+        """Get buffer fill level and underrun/overrun counters."""
+        return {
+            "capacity": self.capacity,
+            "buffered": len(self),
+            "underruns": self.underruns,
+            "overruns": self.overruns,
+        }
+
+    def _write_some(self, data: bytes) -> int:
+        """Copy as much of data into the ring as fits."""
+        read, write = self._read, self._write
+        if read == write:
+            # Empty: start over at the front so chunks rarely wrap
+            self._read = self._write = self._scan = read = write = 0
+        capacity = self.capacity
+        count = len(data)
+        free = capacity - (write - read)
+        if count > free:
+            count = free
+            if not count:
+                return 0
+            data = memoryview(data)[:count]
+
+        view = self._view
+        start = write % capacity
+        end = start + count
+        mirror = self.chunk_size
+        if end <= capacity:
+            view[start:end] = data
+            if start < mirror:
+                # Keep the mirror past the end in step with the front of the ring
+                end = end if end < mirror else mirror
+                view[capacity + start:capacity + end] = view[start:end]
+        else:
+            data = memoryview(data)
+            first = capacity - start
+            view[start:capacity] = data[:first]
+            view[:count - first] = data[first:]
+            end = count - first if count - first < mirror else mirror
+            view[capacity:capacity + end] = view[:end]
+
+        self._write = write + count
+        return count
+
+    def _chunk_view(self, position: int, length: int) -> memoryview:
+        """Contiguous view of up to chunk_size buffered bytes."""
+        start = position % self.capacity
+        return self._view[start:start + length]
+
+    def _take(self, size: int) -> memoryview:
+        """Remove a chunk of size bytes from the front."""
+        chunk = self._chunk_view(self._read, size)
+        self._read += size
+        return chunk
+
+    def _next_chunk_size(self) -> Optional[int]:
+        """Size of the next complete chunk, or None if there isn't one yet."""
+        if self.frame_length is None:
+            return self.chunk_size if self._write - self._read >= self.chunk_size else None
+
+        # Frames already counted are remembered, so each byte is scanned once
+        while True:
+            chunk = self._scan - self._read
+            if chunk == self.chunk_size:
+                return chunk
+            unscanned = self._write - self._scan
+            if self._frame_remaining:
+                frame = self._frame_remaining
+            elif not unscanned:
+                return None
+            else:
+                frame = self.frame_length(
+                    self._chunk_view(self._scan, min(unscanned, self.chunk_size))
+                )
+                if frame is None:
+                    return None
+
+            if chunk + frame > self.chunk_size:
+                if chunk:
+                    return chunk
+                if unscanned < self.chunk_size:
+                    return None
+                self._frame_remaining = frame - self.chunk_size
+                self._scan += self.chunk_size
+                return self.chunk_size
+            if unscanned < frame:
+                return None
+            self._frame_remaining = 0
+            self._scan += frame
 
 
 # Global streaming TTS service
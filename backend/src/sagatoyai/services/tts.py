@@ -1,11 +1,56 @@
 """Text-to-Speech service with multi-provider and language support."""
 
+import asyncio
 import logging
 import os
-from typing import AsyncIterator
+import re
+from typing import AsyncIterator, Optional
+
+from sagatoyai.services.mp3 import audio_frames
+from sagatoyai.services.sentence_segmenter import split_sentences
+from sagatoyai.services.tts_engines import TTSEngine, TTSError, tts_engines
 
 logger = logging.getLogger(__name__)
 
+# Long texts are synthesized in chunks of up to this many characters
+LONG_TEXT_CHUNK_CHARS = 600
+DEFAULT_CHUNK_CONCURRENCY = 4
+DEFAULT_CHUNK_RETRIES = 3
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def split_text_chunks(text: str, max_chars: int = LONG_TEXT_CHUNK_CHARS) -> list[str]:
+    """Split text into chunks at paragraph, then sentence, boundaries.
+
+    Whole paragraphs are packed together while they fit in max_chars; a
+    paragraph that is too long is packed sentence by sentence instead. A
+    single sentence longer than max_chars becomes a chunk of its own.
+    """
+    chunks: list[str] = []
+    current = ""
+
+    def add(piece: str, separator: str) -> None:
+        nonlocal current
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}{separator}{piece}" if current else piece
+
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            add(paragraph, "\n\n")
+            continue
+        for index, sentence in enumerate(split_sentences(paragraph)):
+            add(sentence, " " if index else "\n\n")
+
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 class TTSService:
     """Text-to-Speech service supporting multiple providers and languages."""
@@ -14,10 +59,36 @@ class TTSService:
         """Initialize TTS service.
 
         Args:
-            provider: TTS provider ('edge', 'piper', 'coqui')
+            provider: TTS engine name in the registry ('edge', 'piper', 'cached')
         """
         self.provider = provider.lower()
 
+    @property
+    def engine(self) -> TTSEngine:
+        """The configured TTS engine."""
+        return tts_engines.get(self.provider)
+
+    async def _stream(
+        self, text: str, language: str, provider: Optional[str] = None
+    ) -> AsyncIterator[tuple[bytes, str]]:
+        """Stream (audio chunk, audio format) pairs from whichever engine spoke."""
+        engine = tts_engines.get(provider or self.provider)
+        yielded = False
+        stream = engine.stream(text, language)
+        try:
+            async for chunk in stream:
+                yielded = True
+                yield chunk, engine.audio_format
+        except TTSError as e:
+            if yielded or engine.name != "piper":
+                raise
+            logger.warning(f"Piper unavailable ({e}), falling back to Edge TTS")
+            fallback = tts_engines.get("edge")
+            async for chunk in fallback.stream(text, language):
+                yield chunk, fallback.audio_format
+        finally:
+            await stream.aclose()
+
     async def synthesize(
         self,
         text: str,
@@ -25,6 +96,9 @@ class TTSService:
     ) -> AsyncIterator[bytes]:
         """Convert text to streaming audio.
 
+        Piper (local, fast, offline) falls back to Edge TTS when it fails
+        before producing any audio.
+
         Args:
             text: Text to convert to speech
             language: Language code ('en' or 'sv')
@@ -32,87 +106,12 @@ class TTSService:
         Yields:
             Audio chunks as bytes
         """
-        if self.provider == "edge":
-            async for chunk in self._synthesize_edge(text, language):
-                yield chunk
-        elif self.provider == "piper":
-            async for chunk in self._synthesize_piper(text, language):
-                yield chunk
-        else:
-            raise TTSError(f"Unknown TTS provider: {self.provider}")
-
-    async def _synthesize_edge(
-        self, text: str, language: str
-    ) -> AsyncIterator[bytes]:
-        """Synthesize using Edge TTS (cloud, free, good quality)."""
+        stream = self._stream(text, language)
         try:
-            import edge_tts
-
-            # Select voice based on language
-            # Optimized for kindergarten-age children (3-10 years)
-            if language == "sv":
-                # Warm, gentle Swedish
-                voice = os.getenv("TTS_VOICE_SV", "sv-SE-SofieNeural")
-                # Slightly slower for clarity
-                rate = os.getenv("TTS_RATE", "-10%")
-            else:
-                voice = os.getenv(
-                    "TTS_VOICE_EN", "en-US-JennyNeural")  # Warm English
-                # Slightly slower for clarity
-                rate = os.getenv("TTS_RATE", "-10%")
-
-            communicate = edge_tts.Communicate(text, voice, rate=rate)
-
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    yield chunk["data"]
-
-        except Exception as e:
-            logger.error(f"Edge TTS failed: {e}")
-            raise TTSError(f"Failed to synthesize with Edge TTS: {e}")
-
-    async def _synthesize_piper(
-        self, text: str, language: str
-    ) -> AsyncIterator[bytes]:
-        """Synthesize using Piper TTS (local, fast, offline).
-
-        Piper is recommended for production - it's fast, runs locally,
-        and has excellent quality. Install: pip install piper-tts
-        """
-        try:
-            import subprocess
-
-            # Select voice model based on language
-            if language == "sv":
-                voice_model = "sv_SE-nst-medium"
-            else:
-                voice_model = "en_US-lessac-medium"
-
-            # Run piper command
-            process = subprocess.Popen(
-                ["piper", "--model", voice_model, "--output-raw"],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-
-            stdout, stderr = process.communicate(input=text.encode())
-
-            if process.returncode != 0:
-                raise TTSError(f"Piper failed: {stderr.decode()}")
-
-            # Yield audio in chunks
-            chunk_size = 4096
-            for i in range(0, len(stdout), chunk_size):
-                yield stdout[i: i + chunk_size]
-
-        except FileNotFoundError:
-            logger.warning("Piper not installed, falling back to Edge TTS")
-            async for chunk in self._synthesize_edge(text, language):
+            async for chunk, _ in stream:
                 yield chunk
-        except Exception as e:
-            logger.error(f"Piper TTS failed: {e}")
-            raise TTSError(f"Failed to synthesize with Piper: {e}")
+        finally:
+            await stream.aclose()
 
     async def synthesize_to_bytes(self, text: str, language: str = "en") -> bytes:
         """Convert text to complete audio bytes."""
@@ -121,11 +120,102 @@ class TTSService:
             chunks.append(chunk)
         return b"".join(chunks)
 
+    async def synthesize_audio(
+        self, text: str, language: str = "en", provider: Optional[str] = None
+    ) -> tuple[bytes, str]:
+        """Convert text to complete audio and the format it came back in.
+
+        Args:
+            text: Text to convert to speech
+            language: Language code ('en' or 'sv')
+            provider: Engine to use instead of the configured one
+
+        Returns:
+            (audio, "mp3" or "pcm")
+        """
+        chunks = []
+        audio_format = None
+        async for chunk, audio_format in self._stream(text, language, provider):
+            chunks.append(chunk)
+        return b"".join(chunks), audio_format
+
+    async def synthesize_chunks(
+        self,
+        text: str,
+        language: str = "en",
+        max_chars: int = LONG_TEXT_CHUNK_CHARS,
+        concurrency: int = DEFAULT_CHUNK_CONCURRENCY,
+        retries: int = DEFAULT_CHUNK_RETRIES,
+        provider: Optional[str] = None,
+        audio_format: Optional[str] = None,
+    ) -> list[tuple[str, bytes]]:
+        """Synthesize long text as independent chunks in parallel.
 
-class TTSError(Exception):
-    """TTS service error."""
+        Each chunk is retried on its own, so a dropped connection costs one
+        chunk rather than the whole text.
 
-    pass
+        Args:
+            text: Text to convert to speech
+            language: Language code ('en' or 'sv')
+            max_chars: Maximum characters per chunk
+            concurrency: Maximum chunks synthesized at once
+            retries: Extra attempts per chunk before giving up
+            provider: Engine to use instead of the configured one
+            audio_format: Format every chunk must be in ("mp3" or "pcm")
+
+        Returns:
+            (chunk text, audio) pairs in text order, all in one format; MP3
+            audio is trimmed to whole MP3 frames so the parts can be
+            concatenated
+
+        Raises:
+            TTSError: If a chunk still fails after its retries, or the
+                chunks aren't all in the same (or the required) format
+        """
+        limit = asyncio.Semaphore(concurrency)
+
+        async def synthesize_chunk(chunk: str) -> tuple[str, bytes, str]:
+            for attempt in range(retries + 1):
+                try:
+                    async with limit:
+                        audio, chunk_format = await self.synthesize_audio(
+                            chunk, language, provider
+                        )
+                    if chunk_format == "mp3":
+                        audio = audio_frames(audio)
+                    if not audio:
+                        raise TTSError("No audio received")
+                    return chunk, audio, chunk_format
+                except TTSError as e:
+                    if attempt == retries:
+                        raise
+                    delay = 0.5 * 2 ** attempt
+                    logger.warning(
+                        f"TTS chunk failed ({e}), retrying in {delay:.1f}s "
+                        f"({attempt + 1}/{retries})"
+                    )
+                    await asyncio.sleep(delay)
+
+        chunks = split_text_chunks(text, max_chars)
+        results = await asyncio.gather(*(synthesize_chunk(chunk) for chunk in chunks))
+
+        # A fallback between engines can change the format from one chunk to the next
+        formats = {chunk_format for _, _, chunk_format in results}
+        if len(formats) > 1 or (audio_format and formats - {audio_format}):
+            raise TTSError(
+                f"TTS chunks came back as {', '.join(sorted(formats))}"
+                + (f", expected {audio_format}" if audio_format else "")
+            )
+        return [(chunk, audio) for chunk, audio, _ in results]
+
+    async def synthesize_long(self, text: str, language: str = "en") -> bytes:
+        """Convert long text (e.g. a story) to one audio file.
+
+        The text is synthesized in parallel chunks (see synthesize_chunks)
+        and the chunks are joined at MP3 frame boundaries.
+        """
+        chunks = await self.synthesize_chunks(text, language)
+        return b"".join(audio for _, audio in chunks)
 
 
 # Fallback messages by language
@@ -135,4 +225,4 @@ TTS_FALLBACK_MESSAGES = {
 }
 
 # Global TTS service instance
-tts_service = TTSService()
+tts_service = TTSService(provider=os.getenv("TTS_PROVIDER", "edge"))
@@ -0,0 +1,342 @@
+"""TTS engine registry.
+
+Every speech engine (Edge TTS, local Piper, the phrase cache, and any we
+add later) sits behind the same TTSEngine interface with streaming and
+whole-utterance synthesis. The base class gives each engine a concurrency
+limit, so a burst of requests can't open hundreds of Edge TTS websockets,
+and a failure-rate circuit breaker, so a failing engine is skipped quickly
+instead of timing out on every request. Voice settings are read once,
+when the engine is created.
+"""
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+from sagatoyai.services.circuit_breaker import CircuitBreaker
+from sagatoyai.services.edge_sessions import EDGE_SESSIONS_AVAILABLE, edge_sessions
+from sagatoyai.services.piper_pool import PIPER_VOICES, PiperError, piper_tts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EDGE_CONCURRENCY = 8
+DEFAULT_PIPER_CONCURRENCY = 4
+
+# Phrases up to this long are kept by the cached engine
+CACHEABLE_TEXT_CHARS = 200
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class TTSError(Exception):
+    """TTS service error."""
+
+    pass
+
+
+class TTSEngine:
+    """Base class for speech engines.
+
+    Subclasses implement _stream(); callers use stream() or synthesize(),
+    which apply the concurrency limit and the circuit breaker.
+    """
+
+    name = "base"
+    audio_format = "mp3"  # "mp3" or "pcm" (16-bit mono)
+
+    def __init__(self, max_concurrency: int, breaker: Optional[CircuitBreaker] = None):
+        """Initialize engine.
+
+        Args:
+            max_concurrency: Maximum syntheses running at once
+            breaker: Circuit breaker (defaults to one named after the engine)
+        """
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker(f"tts:{self.name}")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+
+    def describe_voice(self, language: str) -> str:
+        """Describe the voice settings used for a language."""
+        return self.name
+
+    async def _stream(self, text: str, language: str) -> AsyncIterator[bytes]:
+        """Synthesize text; implemented by each engine."""
+        raise NotImplementedError
+        yield b""  # pragma: no cover
+
+    def stream(self, text: str, language: str = "sv") -> AsyncIterator[bytes]:
+        """Stream audio for text.
+
+        Raises:
+            TTSError: If the engine is failing (breaker open) or synthesis fails
+        """
+        return self._guard(self._stream(text, language))
+
+    async def _guard(self, inner: AsyncIterator) -> AsyncIterator:
+        """Run a synthesis under the concurrency limit and circuit breaker."""
+        if not self.breaker.allow_request():
+            await inner.aclose()
+            raise TTSError(f"TTS engine {self.name} is unavailable (circuit open)")
+
+        received = False
+        try:
+            async with self._semaphore:
+                self._active += 1
+                try:
+                    async for chunk in inner:
+                        received = True
+                        yield chunk
+                except Exception as e:
+                    self.breaker.record_failure()
+                    if isinstance(e, TTSError):
+                        raise
+                    logger.error(f"TTS engine {self.name} failed: {e}")
+                    raise TTSError(f"Failed to synthesize with {self.name}: {e}")
+                else:
+                    if not received:
+                        self.breaker.record_failure()
+                        raise TTSError(f"No audio received from {self.name}")
+                    self.breaker.record_success()
+                finally:
+                    self._active -= 1
+        except (GeneratorExit, asyncio.CancelledError):
+            # The caller stopped listening or was cancelled; the engine itself
+            # was fine, and a probe that heard nothing back is given back
+            if received:
+                self.breaker.record_success()
+            else:
+                self.breaker.release_probe()
+            raise
+        finally:
+            await inner.aclose()
+
+    async def synthesize(self, text: str, language: str = "sv") -> bytes:
+        """Synthesize a whole utterance."""
+        chunks = []
+        async for chunk in self.stream(text, language):
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def get_status(self) -> dict:
+        """Get engine status for health endpoints and logs."""
+        return {
+            "format": self.audio_format,
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "circuit": self.breaker.get_status(),
+        }
+
+
+class EdgeTTSEngine(TTSEngine):
+    """Microsoft Edge TTS (cloud, free, good quality), MP3 output."""
+
+    name = "edge"
+    audio_format = "mp3"
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """Initialize engine with voices from the environment."""
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("TTS_EDGE_MAX_CONCURRENCY", DEFAULT_EDGE_CONCURRENCY))
+        super().__init__(max_concurrency)
+        # Warm, gentle voices, slightly slower for clarity - tuned for
+        # kindergarten-age children (3-10 years)
+        self.voices = {
+            "sv": os.getenv("TTS_VOICE_SV", "sv-SE-SofieNeural"),
+            "en": os.getenv("TTS_VOICE_EN", "en-US-JennyNeural"),
+        }
+        self.rate = os.getenv("TTS_RATE", "-10%")
+        # Reuse warm websockets (services/edge_sessions.py) instead of
+        # connecting for every sentence, if this edge-tts version allows
+        self.persistent = EDGE_SESSIONS_AVAILABLE and os.getenv(
+            "TTS_EDGE_PERSISTENT", "true"
+        ).lower() in ("1", "true", "yes")
+
+    def get_voice(self, language: str) -> str:
+        """Get the voice for a language."""
+        return self.voices.get(language, self.voices["en"])
+
+    def describe_voice(self, language: str) -> str:
+        return f"{self.name}:{self.get_voice(language)}:{self.rate}"
+
+    async def _stream(self, text: str, language: str) -> AsyncIterator[bytes]:
+        async for chunk in self._events(text, language, "SentenceBoundary"):
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+    def stream_events(
+        self, text: str, language: str = "sv", boundary: str = "SentenceBoundary"
+    ) -> AsyncIterator[dict]:
+        """Stream audio together with the service's boundary events.
+
+        Args:
+            text: Text to speak
+            language: Language code, selects the voice
+            boundary: "SentenceBoundary" or "WordBoundary" events
+
+        Yields:
+            edge_tts chunks: {"type": "audio", "data"} and boundary events
+            {"type", "offset", "duration", "text"} (offsets in 100 ns ticks)
+        """
+        return self._guard(self._events(text, language, boundary))
+
+    async def _events(self, text: str, language: str, boundary: str) -> AsyncIterator[dict]:
+        voice = self.get_voice(language)
+        if self.persistent:
+            stream = edge_sessions.stream(text, voice, self.rate, boundary)
+        else:
+            import edge_tts
+
+            communicate = edge_tts.Communicate(text, voice, rate=self.rate, boundary=boundary)
+            stream = communicate.stream()
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    def get_status(self) -> dict:
+        status = super().get_status()
+        if self.persistent:
+            status["sessions"] = edge_sessions.get_status()
+        return status
+
+
+class PiperTTSEngine(TTSEngine):
+    """Local Piper TTS on persistent workers, 16-bit mono PCM output."""
+
+    name = "piper"
+    audio_format = "pcm"
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """Initialize engine."""
+        if max_concurrency is None:
+            max_concurrency = int(
+                os.getenv("TTS_PIPER_MAX_CONCURRENCY", DEFAULT_PIPER_CONCURRENCY)
+            )
+        super().__init__(max_concurrency)
+
+    def describe_voice(self, language: str) -> str:
+        voice = PIPER_VOICES.get(language, PIPER_VOICES["en"])
+        return f"{self.name}:{voice}:{piper_tts.sample_rate}"
+
+    async def _stream(self, text: str, language: str) -> AsyncIterator[bytes]:
+        stream = piper_tts.synthesize(text, language)
+        try:
+            async for chunk in stream:
+                yield chunk
+        except PiperError as e:
+            raise TTSError(f"Piper failed: {e}")
+        finally:
+            await stream.aclose()
+
+
+class CachedTTSEngine(TTSEngine):
+    """Serves repeated short phrases from memory, synthesizing misses with another engine."""
+
+    name = "cached"
+
+    def __init__(self, engine: TTSEngine, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """Initialize engine.
+
+        Args:
+            engine: Engine used for cache misses
+            max_bytes: Total audio kept in memory
+        """
+        self.engine = engine
+        self.audio_format = engine.audio_format
+        self.max_bytes = max_bytes
+        self._cache: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        # Limits and breaker belong to the wrapped engine
+        super().__init__(engine.max_concurrency, engine.breaker)
+
+    def describe_voice(self, language: str) -> str:
+        return self.engine.describe_voice(language)
+
+    async def stream(self, text: str, language: str = "sv") -> AsyncIterator[bytes]:
+        key = (language, text.strip())
+        audio = self._cache.get(key)
+        if audio is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            yield audio
+            return
+
+        self.misses += 1
+        chunks = []
+        async for chunk in self.engine.stream(text, language):
+            chunks.append(chunk)
+            yield chunk
+        if len(key[1]) <= CACHEABLE_TEXT_CHARS:
+            self._store(key, b"".join(chunks))
+
+    def _store(self, key: tuple[str, str], audio: bytes) -> None:
+        """Add audio to the cache, evicting least recently used phrases."""
+        if len(audio) > self.max_bytes:
+            return
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._cache[key] = audio
+        self._size += len(audio)
+        while self._size > self.max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._size -= len(evicted)
+
+    def get_status(self) -> dict:
+        return {
+            **self.engine.get_status(),
+            "cached_phrases": len(self._cache),
+            "cached_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class TTSEngineRegistry:
+    """Named TTS engines."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._engines: dict[str, TTSEngine] = {}
+
+    def register(self, engine: TTSEngine, name: Optional[str] = None) -> None:
+        """Register an engine under its name (or the given one)."""
+        self._engines[name or engine.name] = engine
+
+    def get(self, name: str) -> TTSEngine:
+        """Get an engine by name.
+
+        Raises:
+            TTSError: If no engine has that name
+        """
+        engine = self._engines.get(name.lower())
+        if engine is None:
+            raise TTSError(f"Unknown TTS provider: {name}")
+        return engine
+
+    def names(self) -> list[str]:
+        """Names of all registered engines."""
+        return list(self._engines)
+
+    def get_status(self) -> dict:
+        """Status of every engine."""
+        return {name: engine.get_status() for name, engine in self._engines.items()}
+
+
+def create_default_registry() -> TTSEngineRegistry:
+    """Create the registry with the built-in engines."""
+    registry = TTSEngineRegistry()
+    edge = EdgeTTSEngine()
+    registry.register(edge)
+    registry.register(PiperTTSEngine())
+    registry.register(CachedTTSEngine(edge))
+    return registry
+
+
+# Global TTS engine registry
+tts_engines = create_default_registry()
@@ -1,7 +1,9 @@
 """Weather service using Open-Meteo API."""
 
 import logging
+import re
 from datetime import datetime
+from typing import Optional
 
 import httpx
 
@@ -16,6 +18,37 @@ LOCATIONS = {
     "malmo": {"lat": 55.6050, "lon": 13.0038},
 }
 
+# Spoken names (Swedish, English, short forms) mapped to LOCATIONS keys
+LOCATION_ALIASES = {
+    "stockholm": "stockholm",
+    "sthlm": "stockholm",
+    "gothenburg": "gothenburg",
+    "göteborg": "gothenburg",
+    "goteborg": "gothenburg",
+    "malmo": "malmo",
+    "malmö": "malmo",
+}
+
+_LOCATION_PATTERN = re.compile(
+    r"\b(" + "|".join(sorted(LOCATION_ALIASES, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+
+def extract_location(text: str) -> Optional[str]:
+    """Find a known location mentioned in text.
+
+    Args:
+        text: Transcript, e.g. "vad är vädret i Göteborg?"
+
+    Returns:
+        LOCATIONS key, or None if no known location is mentioned
+    """
+    match = _LOCATION_PATTERN.search(text)
+    if match is None:
+        return None
+    return LOCATION_ALIASES[match.group(1).lower()]
+
 
 class WeatherService:
     """Weather service using Open-Meteo free API."""
@@ -0,0 +1,103 @@
+"""Word timings for spoken utterances.
+
+Edge TTS can report a WordBoundary event for every word it speaks. A
+WordTimingIndex keeps them for one utterance in four flat integer arrays
+(start and end in milliseconds, and the word's span in the text), so it
+stays small even for a whole story. When a child interrupts, the playback
+position tells exactly which word was playing: the server can resume from
+that word, or know what was heard, without synthesizing anything again.
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Optional
+
+# Boundary event offsets and durations are in 100 ns ticks
+_TICKS_PER_MS = 10_000
+
+
+class WordTimingIndex:
+    """When each word of one utterance is spoken."""
+
+    def __init__(self, text: str):
+        """Initialize an empty index.
+
+        Args:
+            text: The text being spoken
+        """
+        self.text = text
+        self.complete = False  # Set once the whole utterance was synthesized
+        self._starts = array("I")  # Milliseconds from the start of the audio
+        self._ends = array("I")
+        self._text_starts = array("I")  # Character span of each word in text
+        self._text_ends = array("I")
+        self._cursor = 0  # Where to look for the next word in text
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @property
+    def duration(self) -> float:
+        """Seconds until the last word ends."""
+        return self._ends[-1] / 1000 if self._ends else 0.0
+
+    def add(self, event: dict) -> None:
+        """Record a WordBoundary event; other events are ignored."""
+        if event["type"] != "WordBoundary":
+            return
+        start = event["offset"] // _TICKS_PER_MS
+        self._starts.append(start)
+        self._ends.append(start + event["duration"] // _TICKS_PER_MS)
+
+        # The service reports the word as spoken; find it in our text
+        word = event["text"]
+        position = self.text.find(word, self._cursor) if word else -1
+        if position == -1:
+            position, end = self._cursor, self._cursor
+        else:
+            end = position + len(word)
+            self._cursor = end
+        self._text_starts.append(position)
+        self._text_ends.append(end)
+
+    def word_at(self, seconds: float) -> Optional[int]:
+        """Index of the word playing (or last started) at a playback position.
+
+        Returns:
+            Word index, or None before the first word
+        """
+        index = bisect_right(self._starts, int(seconds * 1000)) - 1
+        return index if index >= 0 else None
+
+    def word(self, index: int) -> str:
+        """Text of a word."""
+        return self.text[self._text_starts[index]:self._text_ends[index]]
+
+    def spoken_text(self, seconds: float) -> str:
+        """Text heard up to and including the word playing at a position."""
+        index = self.word_at(seconds)
+        if index is None:
+            return ""
+        return self.text[:self._text_ends[index]]
+
+    def remaining_text(self, seconds: float) -> str:
+        """Text from the word playing at a position to the end, for resuming."""
+        index = self.word_at(seconds)
+        if index is None:
+            return self.text
+        return self.text[self._text_starts[index]:]
+
+    def resume_offset(self, seconds: float) -> float:
+        """Start time of the word playing at a position, for seeking in the audio."""
+        index = self.word_at(seconds)
+        return self._starts[index] / 1000 if index is not None else 0.0
+
+    def to_dict(self) -> dict:
+        """Compact form for sending to devices: parallel lists per field."""
+        return {
+            "text": self.text,
+            "starts_ms": self._starts.tolist(),
+            "ends_ms": self._ends.tolist(),
+            "text_starts": self._text_starts.tolist(),
+            "text_ends": self._text_ends.tolist(),
+        }
@@ -0,0 +1,103 @@
+"""Audio chunk ring buffer tests."""
+
+import pytest
+
+from sagatoyai.services.mp3 import next_unit_length
+from sagatoyai.services.streaming_tts import AudioChunkBuffer
+
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz, mono: 144-byte frames
+HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+
+
+def make_frame(fill: int) -> bytes:
+    return HEADER + bytes([fill]) * 140
+
+
+def test_add_returns_fixed_chunks_as_views():
+    """Test chunking, leftovers carried over, and flush."""
+    buffer = AudioChunkBuffer(chunk_size=4, capacity=8)
+
+    chunks = buffer.add(b"abcdef")
+    assert all(isinstance(chunk, memoryview) for chunk in chunks)
+    assert [bytes(c) for c in chunks] == [b"abcd"]
+
+    assert [bytes(c) for c in buffer.add(b"ghij")] == [b"efgh"]
+    assert bytes(buffer.flush()) == b"ij"
+    assert buffer.flush() is None
+
+
+def test_chunks_wrapping_the_ring_stay_contiguous():
+    """Test that a chunk crossing the end of the ring reads correctly."""
+    buffer = AudioChunkBuffer(chunk_size=4, capacity=10)
+    stream = bytes(range(200))
+    out = bytearray()
+
+    for start in range(0, len(stream), 3):
+        assert buffer.write(stream[start:start + 3]) == len(stream[start:start + 3])
+        chunk = buffer.read()
+        if chunk is not None:
+            out += chunk
+    while (chunk := buffer.read()) is not None:
+        out += chunk
+    out += buffer.flush() or b""
+
+    assert bytes(out) == stream
+
+
+def test_add_larger_than_capacity_keeps_all_data():
+    """Test that one large add still returns every byte in order."""
+    buffer = AudioChunkBuffer(chunk_size=4, capacity=8)
+    data = bytes(range(50))
+
+    chunks = buffer.add(data)
+
+    assert b"".join(bytes(c) for c in chunks) + bytes(buffer.flush()) == data
+    assert buffer.overruns == 0
+
+
+def test_counts_underruns_and_overruns():
+    """Test the counters reported for playback health."""
+    buffer = AudioChunkBuffer(chunk_size=4, capacity=8)
+
+    assert buffer.read() is None
+    assert buffer.write(b"0123456789") == 8
+    assert buffer.free == 0
+
+    status = buffer.get_status()
+    assert status["underruns"] == 1
+    assert status["overruns"] == 1
+    assert status["buffered"] == 8
+
+
+def test_frame_aligned_chunks_hold_whole_frames():
+    """Test that MP3 chunks end on frame boundaries."""
+    buffer = AudioChunkBuffer(chunk_size=400, capacity=1000, frame_length=next_unit_length)
+    frames = [make_frame(i) for i in range(7)]
+    stream = b"".join(frames)
+
+    chunks = []
+    for start in range(0, len(stream), 100):
+        chunks += [bytes(c) for c in buffer.add(stream[start:start + 100])]
+    chunks.append(bytes(buffer.flush()))
+
+    # 400 bytes fit two 144-byte frames
+    assert [len(c) for c in chunks] == [288, 288, 288, 144]
+    assert b"".join(chunks) == stream
+    assert all(c.startswith(HEADER) for c in chunks)
+
+
+def test_frame_aligned_passes_tags_through():
+    """Test that a tag bigger than a chunk goes out in pieces."""
+    tag = b"ID3\x04\x00\x00" + bytes([0, 0, 1, 62]) + b"\x00" * 190
+    buffer = AudioChunkBuffer(chunk_size=160, capacity=512, frame_length=next_unit_length)
+
+    chunks = [bytes(c) for c in buffer.add(tag + make_frame(1))]
+
+    assert [len(c) for c in chunks] == [160, 40]
+    assert bytes(buffer.flush()) == make_frame(1)
+
+
+def test_capacity_must_hold_a_chunk():
+    """Test that a ring smaller than a chunk is rejected."""
+    with pytest.raises(ValueError):
+        AudioChunkBuffer(chunk_size=4096, capacity=1024)
@@ -0,0 +1,110 @@
+"""Circuit breaker tests."""
+
+from sagatoyai.services.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "test", failure_rate_threshold=0.5, min_calls=4,
+        window_seconds=60.0, open_seconds=30.0, clock=clock,
+    )
+
+
+def test_opens_on_failure_rate_after_min_calls():
+    """Test that the breaker waits for min_calls, then opens on the rate."""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_status()["retry_in_seconds"] == 30.0
+
+
+def test_old_failures_age_out():
+    """Test that failures outside the window no longer count."""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 61
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.get_status()["recent_calls"] == 1
+
+
+def test_half_open_allows_single_probe():
+    """Test that one probe goes through and its success closes the breaker."""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_rate() == 0.0
+
+
+def test_released_probe_can_be_claimed_again():
+    """Test that a probe given back lets the next caller probe at once."""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_failed_probe_reopens():
+    """Test that a failed probe keeps the breaker open for another interval."""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now += 29
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+
+
+def test_stale_success_does_not_close_open_breaker():
+    """Test that a call started before opening can't close the breaker early."""
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.OPEN
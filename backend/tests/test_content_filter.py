@@ -0,0 +1,77 @@
+"""Content filter tests."""
+
+import re
+
+from sagatoyai.services.content_filter import (
+    build_trie_pattern,
+    contains_inappropriate_content,
+    filter_content,
+    find_inappropriate_content,
+)
+
+
+def test_matches_have_spans_and_categories():
+    """Test that every match is reported with its span and category."""
+    text = "The knight had a knife and some beer"
+    matches = find_inappropriate_content(text, "en")
+
+    assert [(m.term, m.category) for m in matches] == [
+        ("knife", "violence"),
+        ("beer", "substances"),
+    ]
+    assert text[matches[0].start:matches[0].end] == "knife"
+
+
+def test_swedish_terms():
+    """Test Swedish coverage and case-insensitive matching of å/ä/ö."""
+    assert contains_inappropriate_content("Han hade en KNIV i fickan", "sv")
+    assert contains_inappropriate_content("Vi dricker öl", "sv")
+    assert filter_content("Du är dum", "sv") == "Vi pratar om något roligt och glatt istället!"
+
+
+def test_whole_words_only():
+    """Test that blocked terms inside longer words are allowed."""
+    assert not contains_inappropriate_content("I have a new skill and a gunnysack", "en")
+    assert not contains_inappropriate_content("Det är vinter i Malmö", "sv")
+
+
+def test_language_specific_lists():
+    """Test that "sex" (six) is fine in Swedish, but only in Swedish."""
+    assert not contains_inappropriate_content("Vad är sex plus två?", "sv")
+    assert contains_inappropriate_content("Vad är sex plus två?")
+    assert contains_inappropriate_content("sex")
+    assert contains_inappropriate_content("No sex please", "en")
+    assert contains_inappropriate_content("Han hade en kniv")
+    assert filter_content("Let's play!") == "Let's play!"
+
+
+def test_every_language_checks_all_lists():
+    """Test that English terms are blocked in Swedish and the other way round."""
+    assert contains_inappropriate_content("i want to kill you", "sv")
+    assert contains_inappropriate_content("Han hade en kniv", "en")
+
+    match = find_inappropriate_content("Jag har en gun", "sv")[0]
+    assert (match.term, match.category, match.language) == ("gun", "violence", "en")
+    # Shared terms are reported from the conversation's own list
+    assert find_inappropriate_content("idiot", "sv")[0].language == "sv"
+
+
+def test_dotted_capital_i():
+    """Test that Turkish dotted İ matches like I without breaking the lookup."""
+    matches = find_inappropriate_content("İdiot, the KİLL", "en")
+
+    assert [(m.term, m.category) for m in matches] == [
+        ("idiot", "insult"),
+        ("kill", "violence"),
+    ]
+
+
+def test_trie_pattern_matches_same_terms_as_alternation():
+    """Test that prefix factoring keeps alternation semantics."""
+    terms = ["kill", "killer", "knife", "kniv", "die", "död", "ab"]
+    pattern = re.compile(rf"^(?:{build_trie_pattern(terms)})$")
+
+    for term in terms:
+        assert pattern.match(term)
+    for other in ["kil", "killers", "kn", "a", "dö"]:
+        assert not pattern.match(other)
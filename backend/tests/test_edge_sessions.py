@@ -0,0 +1,172 @@
+"""Persistent Edge TTS session tests, against a local fake speech service."""
+
+import importlib
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from sagatoyai.services.edge_sessions import EdgeSessionError, EdgeSessionPool
+
+AUDIO = b"\xff\xf3\x64\xc0" + b"\x01" * 140
+
+
+def _headers(lines: dict) -> str:
+    return "".join(f"{name}:{value}\r\n" for name, value in lines.items())
+
+
+class FakeSpeechService:
+    """Speaks every SSML request as two audio messages and a word boundary."""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self.close_after = None  # Drop the connection after this many requests
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        served = 0
+        async for message in ws:
+            header, _, body = message.data.partition("\r\n\r\n")
+            fields = dict(line.split(":", 1) for line in header.split("\r\n") if ":" in line)
+            if fields.get("Path") != "ssml":
+                continue
+            if self.close_after is not None and served == self.close_after:
+                await ws.close()
+                break
+            served += 1
+            request_id = fields["X-RequestId"]
+            self.requests.append(body)
+            await ws.send_str(_headers({"X-RequestId": request_id, "Path": "turn.start"}) + "\r\n{}")
+            for _ in range(2):
+                header = _headers({
+                    "X-RequestId": request_id, "Content-Type": "audio/mpeg", "Path": "audio",
+                }).encode()
+                await ws.send_bytes(len(header).to_bytes(2, "big") + header + AUDIO)
+            metadata = {"Metadata": [{"Type": "WordBoundary", "Data": {
+                "Offset": 1000, "Duration": 500, "text": {"Text": "Hej"},
+            }}]}
+            await ws.send_str(
+                _headers({"X-RequestId": request_id, "Path": "audio.metadata"})
+                + "\r\n" + json.dumps(metadata)
+            )
+            await ws.send_str(_headers({"X-RequestId": request_id, "Path": "turn.end"}) + "\r\n{}")
+        return ws
+
+
+@pytest.fixture
+async def service():
+    fake = FakeSpeechService()
+    app = web.Application()
+    app.router.add_get("/ws", fake.handle)
+    server = TestServer(app)
+    await server.start_server()
+    fake.url = str(server.make_url("/ws"))
+    yield fake
+    await server.close()
+
+
+async def _speak(pool, text, **kwargs):
+    return [chunk async for chunk in pool.stream(text, "sv-SE-SofieNeural", **kwargs)]
+
+
+async def test_sessions_are_reused_across_sentences(service):
+    """Test that consecutive sentences share one connection."""
+    pool = EdgeSessionPool(max_idle_sessions=2, warm_sessions=0, url=service.url)
+    try:
+        for sentence in ["Hej!", "Jag heter Saga.", "Vill du leka?"]:
+            chunks = await _speak(pool, sentence, boundary="WordBoundary")
+            assert [c["data"] for c in chunks if c["type"] == "audio"] == [AUDIO, AUDIO]
+            assert chunks[-1] == {
+                "type": "WordBoundary", "offset": 1000, "duration": 500, "text": "Hej",
+            }
+    finally:
+        await pool.close()
+
+    assert service.connections == 1
+    assert len(service.requests) == 3
+    assert "SofieNeural" in service.requests[0]
+    assert pool.get_status()["reuses"] == 2
+
+
+async def test_abandoned_request_is_drained_before_reuse(service):
+    """Test that stopping mid-stream doesn't leak audio into the next request."""
+    pool = EdgeSessionPool(warm_sessions=0, url=service.url)
+    try:
+        stream = pool.stream("Första meningen.", "sv-SE-SofieNeural")
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        chunks = await _speak(pool, "Andra meningen.")
+    finally:
+        await pool.close()
+
+    assert first["type"] == "audio"
+    assert [c["type"] for c in chunks] == ["audio", "audio", "WordBoundary"]
+    assert service.connections == 1
+
+
+async def test_dropped_idle_session_reconnects(service):
+    """Test that a connection the service closed is replaced transparently."""
+    service.close_after = 1
+    pool = EdgeSessionPool(warm_sessions=0, url=service.url)
+    try:
+        await _speak(pool, "Ett.")
+        chunks = await _speak(pool, "Två.")
+    finally:
+        await pool.close()
+
+    assert sum(1 for c in chunks if c["type"] == "audio") == 2
+    assert service.connections == 2
+
+
+async def test_refresh_keeps_warm_sessions(service):
+    """Test that maintenance connects sessions ahead of demand."""
+    pool = EdgeSessionPool(warm_sessions=1, url=service.url)
+    try:
+        await pool.refresh()
+        assert pool.get_status()["idle"]["SentenceBoundary"] == 1
+        await _speak(pool, "Hej.")
+    finally:
+        await pool.close()
+
+    assert service.connections == 1
+
+
+async def test_unreachable_service_raises():
+    """Test that a failed connect surfaces as EdgeSessionError."""
+    pool = EdgeSessionPool(warm_sessions=0, url="http://127.0.0.1:9/ws")
+    try:
+        with pytest.raises(EdgeSessionError):
+            await _speak(pool, "Hej.")
+    finally:
+        await pool.close()
+
+
+async def test_missing_internals_fall_back_to_communicate(monkeypatch):
+    """Test that without the edge_tts internals speech uses Communicate."""
+    import edge_tts
+
+    # The services package re-exports objects under the module names
+    edge_sessions = importlib.import_module("sagatoyai.services.edge_sessions")
+    tts_engines = importlib.import_module("sagatoyai.services.tts_engines")
+    monkeypatch.setattr(edge_sessions, "EDGE_SESSIONS_AVAILABLE", False)
+    monkeypatch.setattr(tts_engines, "EDGE_SESSIONS_AVAILABLE", False)
+
+    class FakeCommunicate:
+        def __init__(self, text, voice, rate, boundary):
+            self.text = text
+
+        async def stream(self):
+            yield {"type": "audio", "data": AUDIO}
+
+    monkeypatch.setattr(edge_tts, "Communicate", FakeCommunicate)
+    engine = tts_engines.EdgeTTSEngine()
+
+    assert not engine.persistent
+    assert await engine.synthesize("Hej.", "sv") == AUDIO
+    with pytest.raises(EdgeSessionError):
+        await _speak(EdgeSessionPool(), "Hej.")
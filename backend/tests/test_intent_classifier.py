@@ -0,0 +1,66 @@
+"""Intent classifier tests."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from sagatoyai.models import Intent
+from sagatoyai.services.intent_classifier import (
+    NUMBER_FEATURE,
+    extract_features,
+    intent_classifier,
+)
+
+EVAL_PATH = Path(__file__).parent.parent / "data" / "intent_eval.jsonl"
+
+
+def _eval_examples(language: str) -> list[tuple[str, Intent]]:
+    with open(EVAL_PATH, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["text"], Intent(row["intent"])) for row in rows if row["language"] == language]
+
+
+@pytest.mark.parametrize("language", ["en", "sv"])
+def test_eval_set_accuracy(language):
+    """Test accuracy on the labeled evaluation set."""
+    examples = _eval_examples(language)
+    correct = sum(1 for text, intent in examples if intent_classifier.detect(text) == intent)
+
+    assert correct / len(examples) >= 0.9
+
+
+@pytest.mark.parametrize(
+    "text,intent",
+    [
+        ("I have a toy train", Intent.GENERAL),
+        ("sometimes I dance", Intent.GENERAL),
+        ("tell me your name", Intent.GENERAL),
+        ("hej saga", Intent.GENERAL),
+        ("berätta en saga", Intent.STORY),
+        ("hur är vädret?", Intent.WEATHER),
+        ("sjung en sång", Intent.SONG),
+        ("vad är sex gånger sju", Intent.MATH),
+        ("hur mycket är 5 gånger 6", Intent.MATH),
+    ],
+)
+def test_substring_lookalikes_are_not_confused(text, intent):
+    """Test cases the old keyword scans got wrong or only knew in one language."""
+    assert intent_classifier.detect(text) == intent
+
+
+def test_prediction_has_confidence():
+    """Test confidence and per-intent scores."""
+    prediction = intent_classifier.classify("What's the weather like today?")
+
+    assert prediction.intent == Intent.WEATHER
+    assert 0.6 <= prediction.confidence <= 1.0
+    assert abs(sum(prediction.scores.values()) - 1.0) < 1e-6
+
+
+def test_numbers_share_one_feature():
+    """Test that any number reads the same, so unseen digits can't tip the intent."""
+    assert extract_features("hur mycket är 5 gånger 6") == extract_features(
+        "hur mycket är 47 gånger 1"
+    )
+    assert NUMBER_FEATURE in extract_features("vad är 3 plus 4")
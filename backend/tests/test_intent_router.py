@@ -0,0 +1,105 @@
+"""Intent router tests."""
+
+from sagatoyai.models import Intent, WeatherData
+from sagatoyai.services.intent_router import IntentRouter
+from sagatoyai.services.llm_fallback import LLMProvider, LLMResult, llm_fallback_service
+from sagatoyai.services.weather import WeatherError, weather_service
+
+
+def _fake_weather(locations):
+    async def get_weather(location="stockholm"):
+        locations.append(location)
+        return WeatherData(
+            location=location.title(),
+            temperature_celsius=2.4,
+            condition="snowy",
+            description="It's snowing! Time to build a snowman!",
+        )
+
+    return get_weather
+
+
+def _fake_llm(calls):
+    async def generate_response(user_input, language="sv", context=None):
+        calls.append(user_input)
+        return LLMResult(
+            text="LLM answer", intent=Intent.GENERAL, provider=LLMProvider.GROQ, latency_ms=1
+        )
+
+    return generate_response
+
+
+async def test_weather_answered_without_llm(monkeypatch):
+    """Test that weather questions use the weather service."""
+    locations, calls = [], []
+    monkeypatch.setattr(weather_service, "get_weather", _fake_weather(locations))
+    monkeypatch.setattr(llm_fallback_service, "generate_response", _fake_llm(calls))
+
+    result = await IntentRouter().generate_response("Hur är vädret i Göteborg?", language="sv")
+
+    assert result.provider == LLMProvider.LOCAL
+    assert result.intent == Intent.WEATHER
+    assert result.text.startswith("I Göteborg är det 2 grader.")
+    assert locations == ["gothenburg"]
+    assert calls == []
+
+
+async def test_weather_chatter_goes_to_llm(monkeypatch):
+    """Test that "why" questions about weather are left to the LLM."""
+    locations, calls = [], []
+    monkeypatch.setattr(weather_service, "get_weather", _fake_weather(locations))
+    monkeypatch.setattr(llm_fallback_service, "generate_response", _fake_llm(calls))
+
+    result = await IntentRouter().generate_response("Why does it rain?", language="en")
+
+    assert result.provider == LLMProvider.GROQ
+    assert locations == []
+
+
+async def test_weather_failure_falls_back_to_llm(monkeypatch):
+    """Test that a weather service outage still produces an answer."""
+    calls = []
+
+    async def broken_weather(location="stockholm"):
+        raise WeatherError("down")
+
+    monkeypatch.setattr(weather_service, "get_weather", broken_weather)
+    monkeypatch.setattr(llm_fallback_service, "generate_response", _fake_llm(calls))
+
+    result = await IntentRouter().generate_response("What's the weather?", language="en")
+
+    assert result.text == "LLM answer"
+    assert calls == ["What's the weather?"]
+
+
+async def test_library_story_told_without_llm(monkeypatch, tmp_path):
+    """Test that a story request is answered from the pre-generated library."""
+    from sagatoyai.services import story_library
+
+    calls = []
+    monkeypatch.setattr(story_library, "STORIES_DIR", tmp_path)
+    monkeypatch.setattr(llm_fallback_service, "generate_response", _fake_llm(calls))
+    story_path = tmp_path / "en" / "trex" / "trex_malmo.txt"
+    story_path.parent.mkdir(parents=True)
+    story_path.write_text("T-Rex walked across the Öresund Bridge...", encoding="utf-8")
+
+    result = await IntentRouter().generate_response("Tell me a story about Malmö", language="en")
+
+    assert result.provider == LLMProvider.LOCAL
+    assert result.intent == Intent.STORY
+    assert result.text.startswith("T-Rex walked")
+    assert calls == []
+
+
+async def test_story_without_library_text_uses_llm(monkeypatch, tmp_path):
+    """Test that stories not generated yet go to the LLM."""
+    from sagatoyai.services import story_library
+
+    calls = []
+    monkeypatch.setattr(story_library, "STORIES_DIR", tmp_path)
+    monkeypatch.setattr(llm_fallback_service, "generate_response", _fake_llm(calls))
+
+    result = await IntentRouter().generate_response("Tell me a story about Malmö", language="en")
+
+    assert result.provider == LLMProvider.GROQ
+    assert len(calls) == 1
@@ -0,0 +1,44 @@
+"""Language identification tests."""
+
+import pytest
+
+from sagatoyai.services.language import detect_language, language_identifier
+
+
+@pytest.mark.parametrize(
+    "text,language",
+    [
+        ("jag vill höra en saga", "sv"),
+        ("this is my toy", "en"),
+        ("Hej toy, är det kallt ute i Malmö?", "sv"),
+        ("Hey toy, what's the weather like in Stockholm?", "en"),
+        ("ja", "sv"),
+        ("nej tack", "sv"),
+        ("no thanks", "en"),
+        ("tell me a story about a dragon", "en"),
+    ],
+)
+def test_detects_language(text, language):
+    """Test short and long utterances in both languages."""
+    assert detect_language(text) == language
+
+
+def test_substrings_do_not_leak_across_words():
+    """Test texts the keyword counter got wrong ("hi" in "this", "ja" in "jag")."""
+    assert detect_language("kan jag få göra det här") == "sv"
+    assert detect_language("kan du hitta min nalle") == "sv"
+
+
+def test_guess_has_confidence():
+    """Test confidence output."""
+    guess = language_identifier.identify("Vad är det för väder idag?")
+
+    assert guess.language == "sv"
+    assert guess.confidence > 0.9
+    assert set(guess.scores) == {"en", "sv"}
+
+
+def test_no_letters_uses_default():
+    """Test fallback for empty or numeric input."""
+    assert language_identifier.identify("123 !!") is None
+    assert detect_language("", default="sv") == "sv"
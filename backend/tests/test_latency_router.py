@@ -0,0 +1,62 @@
+"""Latency router tests."""
+
+import random
+
+from sagatoyai.services.latency_router import FAILURE_PENALTY_MS, LatencyRouter, LatencyStats
+
+
+def test_stats_track_ewma_p95_and_errors():
+    """Test the moving averages and percentile."""
+    stats = LatencyStats(smoothing=0.5)
+    for latency in (100.0, 200.0, 300.0):
+        stats.record(latency, True)
+    stats.record(10_000.0, False)
+
+    assert stats.ewma_ms == 225.0
+    assert stats.p95_ms() == 300.0
+    assert stats.error_rate == 0.5
+    assert stats.expected_ms() == 225.0 + 0.5 * FAILURE_PENALTY_MS
+
+
+def test_orders_by_expected_time_per_language_and_intent():
+    """Test that each language and intent gets its own ordering."""
+    router = LatencyRouter(exploration_rate=0.0)
+    router.record("groq", "sv", "general", 2500.0, True)
+    router.record("gemini", "sv", "general", 800.0, True)
+    router.record("groq", "en", "general", 300.0, True)
+    router.record("gemini", "en", "general", 900.0, True)
+
+    assert router.order(["groq", "gemini"], "sv", "general") == ["gemini", "groq"]
+    assert router.order(["groq", "gemini"], "en", "general") == ["groq", "gemini"]
+    # No stats for this intent: the providers' overall averages decide
+    assert router.order(["groq", "gemini"], "sv", "math") == ["gemini", "groq"]
+    assert router.get_status("groq")["overall"]["ewma_ms"] == 2060.0
+
+
+def test_unmeasured_providers_keep_configured_order():
+    """Test the cold start and that a new provider is measured first."""
+    router = LatencyRouter(exploration_rate=1.0)
+    assert router.order(["groq", "gemini"], "sv", "general") == ["groq", "gemini"]
+
+    router.record("groq", "sv", "general", 400.0, True)
+    assert router.order(["groq", "gemini"], "sv", "general") == ["gemini", "groq"]
+
+
+def test_failing_provider_moves_back():
+    """Test that errors count against a provider's expected time."""
+    router = LatencyRouter(exploration_rate=0.0)
+    router.record("groq", "sv", "general", 300.0, True)
+    router.record("gemini", "sv", "general", 900.0, True)
+    router.record("groq", "sv", "general", 30_000.0, False)
+
+    assert router.order(["groq", "gemini"], "sv", "general") == ["gemini", "groq"]
+
+
+def test_exploration_sometimes_tries_another_provider():
+    """Test that a share of requests goes to a slower provider first."""
+    router = LatencyRouter(exploration_rate=0.2, rng=random.Random(7))
+    router.record("groq", "sv", "general", 300.0, True)
+    router.record("gemini", "sv", "general", 900.0, True)
+
+    firsts = [router.order(["groq", "gemini"], "sv", "general")[0] for _ in range(1000)]
+    assert 100 < firsts.count("gemini") < 300
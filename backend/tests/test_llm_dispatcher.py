@@ -0,0 +1,80 @@
+"""LLM dispatcher tests."""
+
+import asyncio
+
+from sagatoyai.services.llm_dispatcher import LLMDispatcher, RequestClass
+
+
+async def hold(dispatcher, request_class, started, release):
+    async with dispatcher.slot(request_class):
+        started.append(request_class)
+        await release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_interactive_turn_jumps_queued_stories():
+    """Test that a waiting interactive turn is served before queued stories."""
+    dispatcher = LLMDispatcher(max_concurrency=1, class_limits={})
+    started, release = [], asyncio.Event()
+    tasks = [asyncio.create_task(hold(dispatcher, RequestClass.STORY, started, release))]
+    await settle()
+    tasks += [
+        asyncio.create_task(hold(dispatcher, RequestClass.STORY, started, release)),
+        asyncio.create_task(hold(dispatcher, RequestClass.BACKGROUND, started, release)),
+        asyncio.create_task(hold(dispatcher, RequestClass.INTERACTIVE, started, release)),
+    ]
+    await settle()
+    assert dispatcher.get_status()["classes"]["story"]["waiting"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == [
+        RequestClass.STORY, RequestClass.INTERACTIVE, RequestClass.STORY, RequestClass.BACKGROUND,
+    ]
+
+
+async def test_story_cap_keeps_room_for_conversation():
+    """Test that stories can't take every slot."""
+    dispatcher = LLMDispatcher(max_concurrency=3, class_limits={RequestClass.STORY: 2})
+    started, release = [], asyncio.Event()
+    tasks = [
+        asyncio.create_task(hold(dispatcher, RequestClass.STORY, started, release))
+        for _ in range(4)
+    ]
+    await settle()
+    assert started == [RequestClass.STORY] * 2
+
+    # The stories waiting on their cap don't block an interactive turn
+    tasks.append(asyncio.create_task(hold(dispatcher, RequestClass.INTERACTIVE, started, release)))
+    await settle()
+    assert started[-1] == RequestClass.INTERACTIVE
+
+    status = dispatcher.get_status()["classes"]
+    assert status["story"] == {
+        "running": 2, "waiting": 2, "limit": 2, "queue_time": status["story"]["queue_time"],
+    }
+    release.set()
+    await asyncio.gather(*tasks)
+    assert dispatcher.get_status()["classes"]["story"]["queue_time"]["calls"] == 4
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    """Test that a cancelled waiter never holds a slot."""
+    dispatcher = LLMDispatcher(max_concurrency=1, class_limits={})
+    started, release = [], asyncio.Event()
+    first = asyncio.create_task(hold(dispatcher, RequestClass.STORY, started, release))
+    await settle()
+    cancelled = asyncio.create_task(hold(dispatcher, RequestClass.INTERACTIVE, started, release))
+    waiting = asyncio.create_task(hold(dispatcher, RequestClass.STORY, started, release))
+    await settle()
+
+    cancelled.cancel()
+    release.set()
+    await asyncio.gather(first, waiting)
+
+    assert started == [RequestClass.STORY, RequestClass.STORY]
+    assert dispatcher.get_status()["classes"]["interactive"]["running"] == 0
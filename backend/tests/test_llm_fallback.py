@@ -0,0 +1,244 @@
+"""LLM fallback service tests."""
+
+import pytest
+
+from sagatoyai.models import Intent
+from sagatoyai.services.gemini import GeminiError, gemini_service
+from sagatoyai.services.groq_service import GroqError, groq_service
+from sagatoyai.services.latency_router import LatencyRouter
+from sagatoyai.services.llm_fallback import LLMFallbackService, LLMProvider, StoryGenerationError
+from sagatoyai.services.rate_limiter import RateLimitError
+
+# A context makes every turn uncacheable, so each one reaches a provider
+CONTEXT = [{"role": "user", "content": "Hej!"}]
+
+
+@pytest.fixture(autouse=True)
+def no_quota(monkeypatch):
+    """Lift the request quotas; the rate limit tests set their own."""
+    monkeypatch.setenv("GROQ_REQUESTS_PER_MINUTE", "0")
+    monkeypatch.setenv("GEMINI_REQUESTS_PER_MINUTE", "0")
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FixedOrder(LatencyRouter):
+    """Router that keeps the configured provider order."""
+
+    def order(self, providers, language, intent):
+        return list(providers)
+
+
+def fake_providers(monkeypatch, service, failing):
+    """Make providers in the failing set raise; record every call."""
+    calls = []
+
+    async def call_provider(provider, user_input, language, context=None):
+        calls.append(provider)
+        if provider in failing:
+            raise RuntimeError(f"{provider.value} is down")
+        return f"Answer from {provider.value}", Intent.GENERAL
+
+    monkeypatch.setattr(service, "_call_provider", call_provider)
+    return calls
+
+
+async def test_failing_primary_is_skipped_then_probed(monkeypatch):
+    """Test that an outage opens the breaker and heals after a probe."""
+    clock = FakeClock()
+    service = LLMFallbackService(clock=clock, router=FixedOrder())
+    failing = {LLMProvider.GROQ}
+    calls = fake_providers(monkeypatch, service, failing)
+
+    for _ in range(4):
+        result = await service.generate_response("Vad är en val?", "sv", CONTEXT)
+        assert result.provider == LLMProvider.GEMINI
+    assert calls.count(LLMProvider.GROQ) == 4
+    assert service.get_provider_status()["groq"]["circuit"]["state"] == "open"
+    assert service.get_provider_status()["groq"]["failures"] == 4
+
+    # While open, Groq isn't called at all
+    calls.clear()
+    result = await service.generate_response("Vad är en val?", "sv", CONTEXT)
+    assert calls == [LLMProvider.GEMINI]
+    assert result.fallback_used
+
+    # After the open interval one probe goes through and closes the breaker
+    failing.clear()
+    clock.now += 31
+    calls.clear()
+    result = await service.generate_response("Vad är en val?", "sv", CONTEXT)
+    assert calls == [LLMProvider.GROQ]
+    assert result.provider == LLMProvider.GROQ
+    assert service.get_provider_status()["groq"]["healthy"]
+    assert service.get_provider_status()["groq"]["circuit"] == {
+        "state": "closed", "failure_rate": 0.0, "recent_calls": 1,
+    }
+
+
+async def test_failed_probe_keeps_provider_skipped(monkeypatch):
+    """Test that a failed half-open probe reopens the breaker."""
+    clock = FakeClock()
+    service = LLMFallbackService(clock=clock, router=FixedOrder())
+    calls = fake_providers(monkeypatch, service, {LLMProvider.GROQ})
+
+    for _ in range(4):
+        await service.generate_response("Hej", "sv", CONTEXT)
+    clock.now += 31
+    await service.generate_response("Hej", "sv", CONTEXT)
+    calls.clear()
+
+    await service.generate_response("Hej", "sv", CONTEXT)
+    assert calls == [LLMProvider.GEMINI]
+    assert not service.get_provider_status()["groq"]["healthy"]
+
+
+async def test_all_providers_open_returns_friendly_message(monkeypatch):
+    """Test that dead upstreams aren't hammered when every breaker is open."""
+    service = LLMFallbackService(clock=FakeClock(), router=FixedOrder())
+    calls = fake_providers(monkeypatch, service, {LLMProvider.GROQ, LLMProvider.GEMINI})
+
+    for _ in range(4):
+        await service.generate_response("Hej", "en", CONTEXT)
+    calls.clear()
+
+    result = await service.generate_response("Hej", "en", CONTEXT)
+    assert calls == []
+    assert result.fallback_used
+    assert result.text.startswith("Oops")
+
+
+async def test_slow_provider_loses_its_place(monkeypatch):
+    """Test that conversations move to whichever provider is currently faster."""
+    service = LLMFallbackService(router=LatencyRouter(exploration_rate=0.0))
+    calls = fake_providers(monkeypatch, service, set())
+    service.router.record("groq", "sv", "general", 3000.0, True)
+    service.router.record("gemini", "sv", "general", 900.0, True)
+
+    result = await service.generate_response("Berätta om månen", "sv", CONTEXT)
+    assert calls == [LLMProvider.GEMINI]
+    assert result.provider == LLMProvider.GEMINI
+    assert not result.fallback_used
+    assert service.get_provider_status()["groq"]["latency"]["overall"]["ewma_ms"] == 3000.0
+
+
+async def test_429_pauses_provider_without_opening_breaker(monkeypatch):
+    """Test that a rate limit pauses the provider for its Retry-After."""
+    clock = FakeClock()
+    service = LLMFallbackService(clock=clock, router=FixedOrder())
+    calls = []
+
+    async def call_provider(provider, user_input, language, context=None):
+        calls.append(provider)
+        raise GroqError("Rate limited", retry_after=20.0)
+
+    monkeypatch.setattr(service, "_call_provider", call_provider)
+
+    result = await service.generate_response("Hej", "sv", CONTEXT)
+    assert calls == [LLMProvider.GROQ, LLMProvider.GEMINI]
+    assert result.retry_after == 20.0
+    status = service.get_provider_status()["groq"]
+    assert status["circuit"]["state"] == "closed"
+    assert status["rate_limit"]["rate_limited"] == 1
+
+    # Both providers are paused, so the next turn doesn't call either
+    calls.clear()
+    result = await service.generate_response("Hej", "sv", CONTEXT)
+    assert calls == []
+    assert result.retry_after == 20.0
+
+    clock.now += 21
+    await service.generate_response("Hej", "sv", CONTEXT)
+    assert calls == [LLMProvider.GROQ, LLMProvider.GEMINI]
+
+
+async def test_rate_limit_gives_back_the_half_open_probe(monkeypatch):
+    """Test that a probe skipped or refused for rate limits isn't left claimed."""
+    clock = FakeClock()
+    service = LLMFallbackService(clock=clock, router=FixedOrder())
+    failing = {LLMProvider.GROQ}
+    calls = fake_providers(monkeypatch, service, failing)
+    for _ in range(4):
+        await service.generate_response("Hej", "sv", CONTEXT)
+    failing.clear()
+    clock.now += 31
+
+    # The probe is claimed, then our own limiter turns it away
+    service._limiters[LLMProvider.GROQ].pause(5.0)
+    calls.clear()
+    await service.generate_response("Hej", "sv", CONTEXT)
+    assert calls == [LLMProvider.GEMINI]
+
+    # The probe is sent but answered 429
+    clock.now += 6
+    call_provider = service._call_provider
+
+    async def rate_limited_groq(provider, *args, **kwargs):
+        if provider == LLMProvider.GROQ:
+            calls.append(provider)
+            raise GroqError("Rate limited", retry_after=5.0)
+        return await call_provider(provider, *args, **kwargs)
+
+    monkeypatch.setattr(service, "_call_provider", rate_limited_groq)
+    calls.clear()
+    await service.generate_response("Hej", "sv", CONTEXT)
+    assert calls == [LLMProvider.GROQ, LLMProvider.GEMINI]
+
+    # Well within the probe timeout, the next turn can probe again
+    monkeypatch.setattr(service, "_call_provider", call_provider)
+    clock.now += 6
+    calls.clear()
+    result = await service.generate_response("Hej", "sv", CONTEXT)
+    assert calls == [LLMProvider.GROQ]
+    assert result.provider == LLMProvider.GROQ
+    assert service.get_provider_status()["groq"]["circuit"]["state"] == "closed"
+
+
+async def test_quota_moves_requests_to_next_provider(monkeypatch):
+    """Test that an exhausted token bucket sends turns to the next provider."""
+    monkeypatch.setenv("GROQ_REQUESTS_PER_MINUTE", "6")
+    service = LLMFallbackService(clock=FakeClock(), router=FixedOrder())
+    calls = fake_providers(monkeypatch, service, set())
+
+    for _ in range(3):
+        await service.generate_response("Hej", "sv", CONTEXT)
+
+    # Burst of one, then 10 s per request: the queue deadline is too short
+    assert calls == [LLMProvider.GROQ, LLMProvider.GEMINI, LLMProvider.GEMINI]
+
+
+async def test_rate_limited_story_raises(monkeypatch):
+    """Test that a rate-limited story isn't replaced by the fallback story."""
+    service = LLMFallbackService(clock=FakeClock())
+
+    async def rate_limited(*args, **kwargs):
+        raise GeminiError("Rate limited", retry_after=7.0)
+
+    monkeypatch.setattr(gemini_service, "generate_story", rate_limited)
+    monkeypatch.setattr(groq_service, "generate_response", rate_limited)
+
+    with pytest.raises(RateLimitError) as info:
+        await service.generate_story("En saga om en kanin", "sv")
+    assert info.value.retry_after == 7.0
+
+
+async def test_failed_story_raises(monkeypatch):
+    """Test that a story nobody could write isn't replaced by a stand-in."""
+    service = LLMFallbackService(clock=FakeClock())
+
+    async def broken(*args, **kwargs):
+        raise GeminiError("Service unavailable")
+
+    monkeypatch.setattr(gemini_service, "generate_story", broken)
+    monkeypatch.setattr(groq_service, "generate_response", broken)
+
+    with pytest.raises(StoryGenerationError):
+        await service.generate_story("En saga om en kanin", "sv")
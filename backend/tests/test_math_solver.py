@@ -0,0 +1,60 @@
+"""Math solver tests."""
+
+from fractions import Fraction
+
+import pytest
+
+from sagatoyai.services.intent_router import IntentRouter
+from sagatoyai.services.llm_fallback import LLMProvider
+from sagatoyai.services.math_solver import parse_expression, solve_math
+
+
+@pytest.mark.parametrize(
+    "text,language,expected",
+    [
+        ("What is three plus four?", "en", [3, "+", 4]),
+        ("vad är tre plus fyra?", "sv", [3, "+", 4]),
+        ("what's twenty-one minus 5", "en", [21, "-", 5]),
+        ("vad blir tjugoett gånger två", "sv", [21, "*", 2]),
+        ("three hundred and five divided by five", "en", [305, "/", 5]),
+        ("hur mycket är etthundratjugo minus tjugo", "sv", [120, "-", 20]),
+        ("Hey toy, what is 5-3?", "en", [5, "-", 3]),
+        ("What is 1,000 plus 5?", "en", [1000, "+", 5]),
+        ("vad är 1,5 plus 2", "sv", [Fraction(3, 2), "+", 2]),
+    ],
+)
+def test_parse_spoken_expressions(text, language, expected):
+    """Test parsing of English and Swedish number words and operators."""
+    assert parse_expression(text, language) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["what is a cat plus a dog", "three four plus two", "sometimes plus", "plus five", "seven"],
+)
+def test_unparseable_questions_return_none(text):
+    """Test that anything ambiguous is left to the LLM."""
+    assert solve_math(text, "en") is None
+
+
+def test_answers_use_precedence_and_language():
+    """Test evaluation and templated answers."""
+    assert "14" in solve_math("2 + 3 * 4", "en")
+    assert "3.5" in solve_math("seven divided by two", "en")
+    assert "3,5" in solve_math("sju delat med två", "sv")
+    assert "noll" in solve_math("tio delat med noll", "sv")
+
+
+def test_comma_depends_on_language():
+    """Test that "1,000" is a thousand in English and a decimal comma in Swedish."""
+    assert "1005" in solve_math("What is 1,000 plus 5?", "en")
+    assert "2,5" in solve_math("vad är 1,5 plus 1", "sv")
+    assert parse_expression("what is 3,5 plus 1", "en") is None
+
+
+async def test_router_answers_math_locally():
+    """Test that MATH turns skip the LLM."""
+    result = await IntentRouter().generate_response("vad är tre plus fyra?", language="sv")
+
+    assert result.provider == LLMProvider.LOCAL
+    assert "7" in result.text
@@ -0,0 +1,80 @@
+"""MP3 frame parsing tests."""
+
+import pytest
+
+from sagatoyai.services.mp3 import (
+    audio_frames,
+    concat_mp3,
+    iter_frames,
+    mp3_duration,
+    next_unit_length,
+    parse_frame_header,
+)
+
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz, mono (Edge TTS output format)
+HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+FRAME_LENGTH = 144
+
+
+def make_frame(fill: int) -> bytes:
+    return HEADER + bytes([fill]) * (FRAME_LENGTH - 4)
+
+
+def make_id3(payload: bytes = b"\x00" * 20) -> bytes:
+    return b"ID3\x04\x00\x00" + bytes([0, 0, 0, len(payload)]) + payload
+
+
+def test_parse_frame_header():
+    """Test header fields for the Edge TTS format."""
+    header = parse_frame_header(make_frame(1))
+    assert header.sample_rate == 24000
+    assert header.bitrate_kbps == 48
+    assert header.length == FRAME_LENGTH
+    assert header.duration == pytest.approx(0.024)
+    assert header.mono
+
+
+def test_rejects_non_frames():
+    """Test that non-Layer III data is not a header."""
+    assert parse_frame_header(b"\x00\x00\x00\x00") is None
+    assert parse_frame_header(b"\xff\xf3") is None
+    assert parse_frame_header(bytes([0xFF, 0xF3, 0xF4, 0xC0])) is None  # bad bitrate
+
+
+def test_iter_frames_skips_tags_and_partial_frames():
+    """Test that only complete audio frames are found."""
+    frames = [make_frame(i) for i in range(1, 4)]
+    data = make_id3() + b"".join(frames) + make_frame(9)[:50]
+
+    found = list(iter_frames(data))
+
+    assert len(found) == 3
+    assert audio_frames(data) == b"".join(frames)
+
+
+def test_iter_frames_skips_xing_header():
+    """Test that a Xing/Info frame is dropped."""
+    info = bytearray(make_frame(0))
+    info[4 + 9:4 + 13] = b"Info"
+    data = bytes(info) + make_frame(1)
+    assert audio_frames(data) == make_frame(1)
+
+
+def test_concat_mp3_joins_at_frame_boundaries():
+    """Test joining files that each carry tags and a cut-off frame."""
+    first = make_id3() + make_frame(1) + make_frame(2) + make_frame(3)[:20]
+    second = make_id3() + make_frame(4)
+
+    joined = concat_mp3([first, second])
+
+    assert joined == make_frame(1) + make_frame(2) + make_frame(4)
+    assert mp3_duration(joined) == pytest.approx(0.072)
+
+
+def test_next_unit_length():
+    """Test frame, tag and garbage lengths for cutting a live stream."""
+    assert next_unit_length(make_frame(1)[:10]) == FRAME_LENGTH
+    assert next_unit_length(make_id3() + make_frame(1)) == 30
+    assert next_unit_length(b"ID3\x04") is None
+    assert next_unit_length(b"junk" + make_frame(1)) == 4
+    assert next_unit_length(b"\xff") is None
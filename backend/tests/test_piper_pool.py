@@ -0,0 +1,126 @@
+"""Piper worker pool tests, using a fake worker that speaks the same protocol."""
+
+import sys
+import textwrap
+
+import pytest
+
+from array import array
+
+from sagatoyai.services.piper_pool import PiperError, PiperWorkerPool
+from sagatoyai.services.piper_worker import PCMResampler
+
+FAKE_WORKER = textwrap.dedent('''
+    import json, os, struct, sys
+
+    out = sys.stdout.buffer
+
+    def frame(kind, payload=b""):
+        out.write(struct.pack(">cI", kind, len(payload)) + payload)
+        out.flush()
+
+    frame(b"R", json.dumps({"sample_rate": 22050, "pid": os.getpid()}).encode())
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("ping"):
+            frame(b"P")
+            continue
+        text = request["text"]
+        if text == "crash":
+            os._exit(1)
+        if text == "fail":
+            frame(b"X", b"bad input")
+            continue
+        for word in text.split():
+            frame(b"A", word.encode())
+        if request.get("sample_rate"):
+            frame(b"A", str(request["sample_rate"]).encode())
+        frame(b"E")
+''')
+
+
+@pytest.fixture
+async def pool(tmp_path):
+    """Pool of one fake worker."""
+    script = tmp_path / "fake_piper_worker.py"
+    script.write_text(FAKE_WORKER)
+    pool = PiperWorkerPool("test-voice", size=1, command=[sys.executable, str(script)])
+    yield pool
+    await pool.close()
+
+
+async def collect(pool, text, sample_rate=None):
+    return [chunk async for chunk in pool.synthesize(text, sample_rate)]
+
+
+async def test_worker_is_reused_across_requests(pool):
+    """Test that requests stream audio from the same preloaded worker."""
+    await pool.start()
+    worker = pool._workers[0]
+    pid = worker._process.pid
+
+    assert await collect(pool, "hej på dig") == [b"hej", "på".encode(), b"dig"]
+    assert await collect(pool, "igen") == [b"igen"]
+    assert worker._process.pid == pid
+    assert pool.sample_rate == 22050
+
+
+async def test_worker_error_keeps_worker(pool):
+    """Test that a failed request is reported without killing the worker."""
+    with pytest.raises(PiperError, match="bad input"):
+        await collect(pool, "fail")
+    assert await collect(pool, "ok") == [b"ok"]
+
+
+async def test_crashed_worker_is_restarted(pool):
+    """Test that the next request gets a fresh worker after a crash."""
+    await pool.start()
+    pid = pool._workers[0]._process.pid
+
+    with pytest.raises(PiperError):
+        await collect(pool, "crash")
+
+    assert await collect(pool, "back again") == [b"back", b"again"]
+    assert pool._workers[0]._process.pid != pid
+
+
+async def test_stopping_early_leaves_worker_clean(pool):
+    """Test that unread audio from an abandoned request is skipped."""
+    stream = pool.synthesize("One two. Three four! Five.")
+    assert await stream.__anext__() == b"One"
+    await stream.aclose()
+
+    assert await collect(pool, "six") == [b"six"]
+
+
+async def test_text_is_sent_a_sentence_at_a_time(pool):
+    """Test that each sentence is its own request with the output rate."""
+    chunks = await collect(pool, "Hej. Hur mår du?", sample_rate=16000)
+    assert chunks == [b"Hej.", b"16000", "Hur".encode(), "mår".encode(), b"du?", b"16000"]
+
+
+async def test_missing_worker_fails_to_start(tmp_path):
+    """Test that a worker that can't load its model raises PiperError."""
+    pool = PiperWorkerPool("test-voice", size=1, command=[sys.executable, "-c", "pass"])
+    with pytest.raises(PiperError):
+        await collect(pool, "hello")
+
+
+def test_resampler_is_seamless_across_chunks():
+    """Test that chunked resampling matches resampling the whole buffer."""
+    samples = array("h", [(i * 37) % 2000 - 1000 for i in range(2205)])
+    pcm = samples.tobytes()
+
+    whole = PCMResampler(22050, 16000).process(pcm)
+    resampler = PCMResampler(22050, 16000)
+    chunked = b"".join(resampler.process(pcm[i:i + 101]) for i in range(0, len(pcm), 101))
+
+    assert chunked == whole
+    assert len(whole) // 2 == 1600
+
+
+def test_resampler_interpolates():
+    """Test linear interpolation when upsampling."""
+    out = array("h")
+    out.frombytes(PCMResampler(8000, 16000).process(array("h", [0, 100, 200]).tobytes()))
+    assert list(out) == [0, 50, 100, 150]
@@ -0,0 +1,64 @@
+"""Prompt builder tests."""
+
+from sagatoyai.services.prompt_builder import (
+    MESSAGE_OVERHEAD_TOKENS,
+    PromptBuilder,
+    estimate_tokens,
+)
+
+
+def _context(count: int) -> list[dict]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message number {i}"}
+        for i in range(count)
+    ]
+
+
+def test_history_filled_newest_first_within_budget():
+    """Test that the newest messages are kept and order is preserved."""
+    cost = estimate_tokens("message number 0", "groq", "en") + MESSAGE_OVERHEAD_TOKENS
+    builder = PromptBuilder(history_token_budget=cost * 3)
+
+    built = builder.build("hello", language="en", context=_context(10))
+
+    assert [msg["content"] for msg in built.history] == [
+        "message number 7",
+        "message number 8",
+        "message number 9",
+    ]
+
+
+def test_zero_budget_sends_no_history():
+    """Test that a zero budget drops history entirely."""
+    builder = PromptBuilder(history_token_budget=0)
+
+    built = builder.build("hej", language="sv", context=_context(4))
+
+    assert built.history == []
+    assert built.as_text() == "hej"
+
+
+def test_renderings_share_history():
+    """Test text and message renderings of the same prompt."""
+    builder = PromptBuilder(history_token_budget=1000)
+
+    built = builder.build("What is a cat?", language="en", context=_context(2))
+
+    assert built.as_text().startswith("Previous conversation:\nuser: message number 0")
+    assert built.as_text().endswith("Child: What is a cat?")
+    messages = built.as_messages()
+    assert messages[0]["role"] == "system"
+    assert messages[-1] == {"role": "user", "content": "What is a cat?"}
+    assert len(messages) == 4
+
+
+def test_system_prompt_cached_per_language():
+    """Test that the system prefix is rendered once per language."""
+    builder = PromptBuilder()
+
+    first = builder.get_system_prompt("sv")
+    second = builder.get_system_prompt("sv")
+
+    assert first is second
+    assert "svenska" in first
+    assert "English" in builder.get_system_prompt("en")
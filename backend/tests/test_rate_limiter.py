@@ -0,0 +1,146 @@
+"""Rate limiter tests."""
+
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sagatoyai.services.llm_dispatcher import RequestClass
+from sagatoyai.services.rate_limiter import (
+    ProviderRateLimiter,
+    RateLimitError,
+    TokenBucket,
+    parse_duration,
+    parse_retry_after,
+    parse_retry_delay,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_duration():
+    """Test Groq-style reset durations."""
+    assert parse_duration("42") == 42.0
+    assert parse_duration("7.66s") == 7.66
+    assert parse_duration("2m59.5s") == 179.5
+    assert parse_duration("120ms") == pytest.approx(0.12)
+    assert parse_duration("soon") is None
+
+
+def test_parse_retry_after_headers():
+    """Test the header forms providers use."""
+    assert parse_retry_after({"Retry-After": "30"}) == 30.0
+    assert parse_retry_after({"retry-after-ms": "1500", "retry-after": "2"}) == 1.5
+    assert parse_retry_after({
+        "x-ratelimit-reset-requests": "2s",
+        "x-ratelimit-reset-tokens": "1m0s",
+    }) == 60.0
+    assert parse_retry_after({"content-type": "application/json"}) is None
+
+    when = datetime.now(timezone.utc) + timedelta(seconds=90)
+    seconds = parse_retry_after({"Retry-After": format_datetime(when, usegmt=True)})
+    assert 85 < seconds <= 90
+
+
+def test_parse_retry_delay():
+    """Test Gemini's retry delay in quota errors."""
+    message = "429 Quota exceeded [retry_delay {\n  seconds: 42\n}\n]"
+    assert parse_retry_delay(message) == 42.0
+    assert parse_retry_delay("500 Internal error") is None
+
+
+def test_token_bucket_refills():
+    """Test burst and refill rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_second=0.5, capacity=2, clock=clock)
+
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time() == 2.0
+    clock.now += 1
+    assert bucket.wait_time() == 1.0
+    clock.now += 10
+    assert bucket.tokens == 2
+
+
+async def test_waits_for_a_token_within_the_deadline():
+    """Test that a request waits for the next token when it can."""
+    limiter = ProviderRateLimiter("test", requests_per_minute=600, burst=1)
+
+    await limiter.acquire(timeout=1.0)
+    started = asyncio.get_running_loop().time()
+    await limiter.acquire(timeout=1.0)
+
+    assert asyncio.get_running_loop().time() - started >= 0.05
+
+
+async def test_rejects_when_the_wait_passes_the_deadline():
+    """Test fast rejection with the time until the next token."""
+    clock = FakeClock()
+    limiter = ProviderRateLimiter("test", requests_per_minute=6, burst=1, clock=clock)
+
+    await limiter.acquire(timeout=1.0)
+    with pytest.raises(RateLimitError) as info:
+        await limiter.acquire(timeout=1.0)
+
+    assert info.value.retry_after == 10.0
+    assert limiter.get_status()["rejected"] == 1
+
+
+async def test_pause_follows_retry_after():
+    """Test that a 429 pause blocks requests until it has passed."""
+    clock = FakeClock()
+    limiter = ProviderRateLimiter("test", requests_per_minute=None, clock=clock)
+
+    limiter.pause(30.0)
+    with pytest.raises(RateLimitError) as info:
+        await limiter.acquire(timeout=5.0)
+    assert info.value.retry_after == 30.0
+
+    clock.now += 30
+    await limiter.acquire(timeout=5.0)
+
+
+async def test_full_queue_is_rejected():
+    """Test the queue length limit."""
+    limiter = ProviderRateLimiter("test", requests_per_minute=60, burst=1, max_queue=1)
+
+    await limiter.acquire(timeout=1.0)
+    waiting = asyncio.create_task(limiter.acquire(timeout=2.0))
+    await asyncio.sleep(0)
+
+    with pytest.raises(RateLimitError):
+        await limiter.acquire(timeout=2.0)
+    waiting.cancel()
+
+
+async def test_turn_gets_the_next_token_before_queued_stories():
+    """Test that a live turn isn't stuck behind stories waiting for quota."""
+    limiter = ProviderRateLimiter("test", requests_per_minute=600, burst=1)
+    await limiter.acquire(timeout=1.0)
+    served = []
+
+    async def call(name, timeout, request_class):
+        await limiter.acquire(timeout, request_class.priority)
+        served.append(name)
+
+    stories = [
+        asyncio.create_task(call(f"story{i}", 30.0, RequestClass.STORY)) for i in range(2)
+    ]
+    await asyncio.sleep(0)
+    assert limiter.get_status()["waiting"] == 2
+
+    # Two tokens behind the stories would take 0.2 s; the turn needs the next one
+    await call("turn", 0.15, RequestClass.INTERACTIVE)
+    await asyncio.gather(*stories)
+
+    assert served == ["turn", "story0", "story1"]
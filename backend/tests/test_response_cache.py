@@ -0,0 +1,76 @@
+"""Response cache tests."""
+
+from sagatoyai.models import Intent
+from sagatoyai.services.llm_fallback import LLMFallbackService, LLMProvider
+from sagatoyai.services.response_cache import ResponseCache, normalize_question, response_cache
+
+
+def test_normalize_question_strips_filler_and_punctuation():
+    """Test that phrasing variants share a key."""
+    assert normalize_question("Hey toy, what's your name?") == "what's your name"
+    assert normalize_question("  WHAT'S your   name ") == "what's your name"
+    assert normalize_question("Hej! Vad heter du?") == "vad heter du"
+
+
+def test_hits_are_counted_per_entry():
+    """Test hit counters and language separation."""
+    cache = ResponseCache()
+    cache.put("vad heter du?", "sv", Intent.GENERAL, "Jag heter Saga!", "groq")
+
+    assert cache.get("Vad heter du", "sv", Intent.GENERAL).hits == 1
+    assert cache.get("vad heter du", "sv", Intent.GENERAL).hits == 2
+    assert cache.get("vad heter du", "en", Intent.GENERAL) is None
+    assert cache.get_stats()["hits"] == 2
+
+
+def test_expired_entries_are_dropped():
+    """Test TTL expiry."""
+    cache = ResponseCache(ttl_seconds=0)
+    cache.put("tell me a joke", "en", Intent.GENERAL, "Knock knock!", "groq")
+
+    assert cache.get("tell me a joke", "en", Intent.GENERAL) is None
+    assert cache.get_stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test max size eviction."""
+    cache = ResponseCache(max_size=2)
+    cache.put("one", "en", Intent.GENERAL, "1", "groq")
+    cache.put("two", "en", Intent.GENERAL, "2", "groq")
+    cache.get("one", "en", Intent.GENERAL)
+    cache.put("three", "en", Intent.GENERAL, "3", "groq")
+
+    assert cache.get("two", "en", Intent.GENERAL) is None
+    assert cache.get("one", "en", Intent.GENERAL) is not None
+
+
+def test_only_context_free_general_turns_are_cacheable():
+    """Test cacheability rules."""
+    cache = ResponseCache()
+
+    assert cache.is_cacheable(Intent.GENERAL)
+    assert not cache.is_cacheable(Intent.GENERAL, [{"role": "user", "content": "hi"}])
+    assert not cache.is_cacheable(Intent.STORY)
+
+
+async def test_fallback_service_answers_repeat_question_from_cache(monkeypatch):
+    """Test that a repeat question does not reach the LLM."""
+    service = LLMFallbackService()
+    calls = []
+
+    async def fake_call_provider(provider, user_input, language, context=None):
+        calls.append(provider)
+        return "Jag heter Saga!", Intent.GENERAL
+
+    monkeypatch.setattr(service, "_call_provider", fake_call_provider)
+    response_cache.clear()
+
+    first = await service.generate_response("Vad heter du?", language="sv")
+    second = await service.generate_response("vad heter du", language="sv")
+
+    assert calls == [LLMProvider.GROQ]
+    assert not first.cached
+    assert second.cached
+    assert second.text == "Jag heter Saga!"
+    assert second.provider == LLMProvider.GROQ
+    response_cache.clear()
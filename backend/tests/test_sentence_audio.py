@@ -0,0 +1,102 @@
+"""Sentence-batched TTS tests."""
+
+from sagatoyai.services import streaming_tts
+from sagatoyai.services.streaming_tts import SentenceAudioSplitter, StreamingTTSService
+
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz, mono: 144-byte, 24 ms frames
+HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+TICKS = 10_000_000
+
+
+def frames(fill: int, count: int) -> bytes:
+    return (HEADER + bytes([fill]) * 140) * count
+
+
+def boundary(text: str, start: float, duration: float) -> dict:
+    return {
+        "type": "SentenceBoundary",
+        "offset": int(start * TICKS),
+        "duration": int(duration * TICKS),
+        "text": text,
+    }
+
+
+def test_splits_audio_in_the_pause_between_sentences():
+    """Test cuts at frame boundaries in the middle of each pause."""
+    splitter = SentenceAudioSplitter("Hej! Jag heter Saga.")
+    splitter.add_boundary(boundary("Hej!", 0.0, 0.24))
+    # 10 frames of speech, 4 frames of pause, then the next sentence
+    assert splitter.add_audio(frames(1, 14)) == []
+
+    splitter.add_boundary(boundary("Jag heter Saga.", 0.336, 0.48))
+    released = splitter.add_audio(frames(2, 20))
+
+    # The pause is 0.24-0.336 s; its middle (0.288 s) is the start of frame 12
+    assert released == [("Hej!", frames(1, 12))]
+    assert splitter.flush() == [("Jag heter Saga.", frames(1, 2) + frames(2, 20))]
+
+
+def test_waits_for_audio_past_the_cut():
+    """Test that a sentence isn't released before its pause has arrived."""
+    splitter = SentenceAudioSplitter("A. B.")
+    splitter.add_boundary(boundary("A.", 0.0, 0.24))
+    splitter.add_boundary(boundary("B.", 0.48, 0.24))
+
+    assert splitter.add_audio(frames(1, 10)) == []
+    released = splitter.add_audio(frames(1, 10))
+    assert [(text, len(audio)) for text, audio in released] == [("A.", 15 * 144)]
+
+
+def test_audio_is_parsed_once(monkeypatch):
+    """Test that each byte is parsed once, however the audio is split."""
+    scanned = []
+
+    def counting_iter_frames(data):
+        scanned.append(len(data))
+        return iter_frames(data)
+
+    iter_frames = streaming_tts.iter_frames
+    monkeypatch.setattr(streaming_tts, "iter_frames", counting_iter_frames)
+
+    splitter = SentenceAudioSplitter("A. B.")
+    splitter.add_boundary(boundary("A.", 0.0, 3.5))
+    splitter.add_boundary(boundary("B.", 4.0, 0.5))
+    audio = frames(1, 200)
+    released = []
+    for start in range(0, len(audio), 1000):  # Pieces end mid-frame
+        released += splitter.add_audio(audio[start:start + 1000])
+    released += splitter.flush()
+
+    # The cut at 3.75 s is the start of frame 157
+    assert released == [("A.", frames(1, 157)), ("B.", frames(1, 43))]
+    # Only the partial frame at the end of each piece is looked at again
+    assert sum(scanned) < len(audio) + len(scanned) * 144
+
+
+def test_no_events_gives_one_sentence():
+    """Test that the whole text is one sentence without boundary events."""
+    splitter = SentenceAudioSplitter("Hej.")
+    splitter.add_audio(frames(1, 3))
+    assert splitter.flush() == [("Hej.", frames(1, 3))]
+
+
+async def test_batched_sentences_use_one_request(monkeypatch):
+    """Test that batching makes one engine request for all sentences."""
+    service = StreamingTTSService()
+    requests = []
+
+    async def fake_events(text, language="sv", boundary="SentenceBoundary"):
+        requests.append(text)
+        yield boundary_event("Hej!", 0.0, 0.12)
+        yield {"type": "audio", "data": frames(1, 6)}
+        yield boundary_event("Hur mår du?", 0.144, 0.12)
+        yield {"type": "audio", "data": frames(2, 5)}
+
+    boundary_event = boundary
+    monkeypatch.setattr(service.engine, "stream_events", fake_events)
+
+    sentences = [s async for s in service.synthesize_sentences_batched("Hej! Hur mår du?", "sv")]
+
+    assert requests == ["Hej! Hur mår du?"]
+    assert [text for text, _ in sentences] == ["Hej!", "Hur mår du?"]
+    assert b"".join(audio for _, audio in sentences) == frames(1, 6) + frames(2, 5)
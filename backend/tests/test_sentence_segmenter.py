@@ -0,0 +1,88 @@
+"""Incremental sentence segmenter tests."""
+
+from sagatoyai.services.sentence_segmenter import SentenceSegmenter, split_sentences
+
+
+def _feed_chars(segmenter, text):
+    sentences = []
+    for char in text:
+        sentences.extend(segmenter.feed(char))
+    return sentences + segmenter.flush()
+
+
+def test_keeps_punctuation():
+    """Test that sentences keep their end punctuation and closing quotes."""
+    text = 'Hej! Vill du leka? "Ja," sa Saga. "Kom!" Och så sprang de.'
+    assert split_sentences(text, "sv") == [
+        "Hej!", "Vill du leka?", '"Ja," sa Saga.', '"Kom!"', "Och så sprang de.",
+    ]
+
+
+def test_abbreviations_do_not_split():
+    """Test Swedish and English abbreviations and initials."""
+    assert split_sentences("Djur, t.ex. katter, sover mycket. Bl.a. lejon.", "sv") == [
+        "Djur, t.ex. katter, sover mycket.", "Bl.a. lejon.",
+    ]
+    assert split_sentences("Mr. Fox met Dr. Owl and J. K. Rowling. Then I.", "en") == [
+        "Mr. Fox met Dr. Owl and J. K. Rowling.", "Then I.",
+    ]
+
+
+def test_numbers_and_ellipses():
+    """Test decimals and ellipses that pause rather than end a sentence."""
+    text = "Den är 3.5 meter och 1,5 ton... ganska tung. Sen... Vargen kom."
+    assert split_sentences(text, "sv") == [
+        "Den är 3.5 meter och 1,5 ton... ganska tung.", "Sen...", "Vargen kom.",
+    ]
+
+
+def test_streaming_matches_whole_text():
+    """Test that char-by-char feeding gives the same sentences as whole text."""
+    text = "Once upon a time, e.g. in 1999... A fox said: hi! The end.\nNew line"
+    assert _feed_chars(SentenceSegmenter("en"), text) == split_sentences(text, "en")
+
+
+def test_waits_for_next_character():
+    """Test that a period at a chunk edge isn't a boundary yet."""
+    segmenter = SentenceSegmenter("en")
+    assert segmenter.feed("It is 3.") == []
+    assert segmenter.feed("5 m long. W") == ["It is 3.5 m long."]
+    assert segmenter.pending == " W"
+    assert segmenter.flush() == ["W"]
+
+
+def test_early_clause_only_for_long_first_sentence():
+    """Test that the first long sentence is released at a comma."""
+    segmenter = SentenceSegmenter("sv", early_clause_chars=20)
+    sentences = _feed_chars(
+        segmenter, "Det var en gång en liten kanin, som bodde i skogen. Hon, glad, hoppade."
+    )
+    assert sentences == [
+        "Det var en gång en liten kanin,", "som bodde i skogen.", "Hon, glad, hoppade.",
+    ]
+
+
+async def test_llm_streaming_speaks_each_sentence(monkeypatch):
+    """Test that streamed LLM text is spoken sentence by sentence."""
+    from sagatoyai.services.streaming_tts import StreamingTTSService
+
+    spoken = []
+
+    async def fake_synthesize_streaming(self, text, language="sv"):
+        spoken.append(text)
+        yield text.encode()
+
+    async def tokens():
+        for token in ["Hej", "! Det är ", "t.ex. 2.", "5 grader", " idag."]:
+            yield token
+
+    monkeypatch.setattr(StreamingTTSService, "synthesize_streaming", fake_synthesize_streaming)
+    service = StreamingTTSService()
+    audio = [
+        chunk async for chunk in service.synthesize_with_llm_streaming(
+            tokens(), "sv", content_filter=False
+        )
+    ]
+
+    assert spoken == ["Hej!", "Det är t.ex. 2.5 grader idag."]
+    assert audio == [b"Hej!", "Det är t.ex. 2.5 grader idag.".encode()]
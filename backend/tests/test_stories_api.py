@@ -0,0 +1,203 @@
+"""Story audio endpoint tests."""
+
+import pytest
+
+from sagatoyai.api import routes
+from sagatoyai.services import story_library
+from sagatoyai.models import StoryAudioIndex, StorySegment
+from sagatoyai.services.auth import create_access_token
+from sagatoyai.services.llm_fallback import StoryGenerationError
+from sagatoyai.services.rate_limiter import RateLimitError
+from sagatoyai.services.story_audio import save_story_audio
+from sagatoyai.services.tts import tts_service
+
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz mono: 144 bytes, 24 ms per frame
+HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+FRAME = HEADER + b"\x01" * 140
+# Frames with distinct fill bytes, so byte ranges are easy to tell apart
+AUDIO = b"".join(HEADER + bytes([fill]) * 140 for fill in range(72))
+
+
+@pytest.fixture
+def stories_dir(tmp_path, monkeypatch):
+    """Point the story library at a temporary directory."""
+    monkeypatch.setattr(story_library, "STORIES_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def auth_headers() -> dict:
+    """Bearer token for a test device."""
+    return {"Authorization": f"Bearer {create_access_token('test-device')}"}
+
+
+def write_story(stories_dir, language="sv", series="trex", story="trex_stockholm"):
+    path = stories_dir / language / series / f"{story}.mp3"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(AUDIO)
+    return path
+
+
+def test_serves_pregenerated_audio(client, stories_dir, auth_headers):
+    """Existing audio is returned as-is with caching headers."""
+    write_story(stories_dir)
+
+    response = client.get("/api/v1/stories/trex/trex_stockholm/audio", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.content == AUDIO
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"]
+
+
+def test_range_request_returns_partial_content(client, stories_dir, auth_headers):
+    """A Range header gets 206 with just the requested bytes."""
+    write_story(stories_dir)
+
+    response = client.get(
+        "/api/v1/stories/trex/trex_stockholm/audio",
+        headers={**auth_headers, "Range": "bytes=100-199"},
+    )
+
+    assert response.status_code == 206
+    assert response.content == AUDIO[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(AUDIO)}"
+
+
+def test_matching_etag_returns_not_modified(client, stories_dir, auth_headers):
+    """A repeat request with the same ETag gets an empty 304."""
+    write_story(stories_dir)
+    url = "/api/v1/stories/trex/trex_stockholm/audio"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_unknown_story_returns_404(client, stories_dir, auth_headers):
+    """IDs outside the catalog are rejected without touching the disk."""
+    response = client.get("/api/v1/stories/trex/..%2F..%2Fsecret/audio", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_missing_audio_is_generated_and_saved(client, stories_dir, auth_headers, monkeypatch):
+    """A miss falls back to live generation once and stores the result."""
+    calls = []
+
+    async def fake_generate_story(prompt, language):
+        calls.append(language)
+        return "Once upon a time..."
+
+    async def fake_synthesize_chunks(text, language, max_chars, provider, audio_format):
+        assert audio_format == "mp3"
+        return [(text, FRAME * 10)]
+
+    monkeypatch.setattr(routes.llm_fallback_service, "generate_story", fake_generate_story)
+    monkeypatch.setattr(tts_service, "synthesize_chunks", fake_synthesize_chunks)
+    url = "/api/v1/stories/kanin/kanin_forest/audio?language=en"
+
+    first = client.get(url, headers=auth_headers)
+    second = client.get(url, headers=auth_headers)
+
+    assert first.content == FRAME * 10
+    assert second.content == FRAME * 10
+    assert calls == ["en"]
+    assert (stories_dir / "en" / "kanin" / "kanin_forest.mp3").read_bytes() == FRAME * 10
+    assert (stories_dir / "en" / "kanin" / "kanin_forest.txt").read_text() == "Once upon a time..."
+    assert (stories_dir / "en" / "kanin" / "kanin_forest.index.json").exists()
+
+
+def test_rate_limited_generation_tells_device_when_to_retry(
+    client, stories_dir, auth_headers, monkeypatch
+):
+    """A rate-limited live generation answers 429 with retry_after."""
+
+    async def fake_generate_story(prompt, language):
+        raise RateLimitError("Story providers are rate limited", 12.3)
+
+    monkeypatch.setattr(routes.llm_fallback_service, "generate_story", fake_generate_story)
+
+    response = client.get("/api/v1/stories/kanin/kanin_forest/audio", headers=auth_headers)
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "13"
+    assert response.json()["retry_after"] == 13
+    assert response.json()["error_code"] == "RATE_LIMITED"
+    assert not (stories_dir / "sv" / "kanin" / "kanin_forest.mp3").exists()
+
+
+def test_failed_generation_saves_nothing(client, stories_dir, auth_headers, monkeypatch):
+    """When every provider fails the device gets 503 and no story is stored."""
+
+    async def fake_generate_story(prompt, language):
+        raise StoryGenerationError("All story providers failed")
+
+    monkeypatch.setattr(routes.llm_fallback_service, "generate_story", fake_generate_story)
+
+    response = client.get("/api/v1/stories/kanin/kanin_forest/audio", headers=auth_headers)
+
+    assert response.status_code == 503
+    assert response.json()["error_code"] == "STORY_UNAVAILABLE"
+    assert not (stories_dir / "sv" / "kanin").exists()
+
+
+def test_requires_authentication(client, stories_dir):
+    """Story audio needs a device token."""
+    response = client.get("/api/v1/stories/trex/trex_stockholm/audio")
+    assert response.status_code in (401, 403)
+
+
+def write_indexed_story(stories_dir):
+    """Save a two-segment story through the library."""
+    index = StoryAudioIndex(
+        series_id="trex",
+        story_id="trex_malmo",
+        language="sv",
+        duration=3.0,
+        audio_size=len(AUDIO),
+        segments=[
+            StorySegment(index=0, text_start=0, text_end=10, byte_offset=0,
+                         byte_length=4000, start_time=0.0, duration=1.5),
+            StorySegment(index=1, text_start=11, text_end=20, byte_offset=4000,
+                         byte_length=len(AUDIO) - 4000, start_time=1.5, duration=1.5),
+        ],
+    )
+    save_story_audio(AUDIO, index)
+
+
+def test_story_segments(client, stories_dir, auth_headers):
+    """The seek index is served as JSON."""
+    write_indexed_story(stories_dir)
+
+    response = client.get("/api/v1/stories/trex/trex_malmo/segments", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [s["byte_offset"] for s in response.json()["segments"]] == [0, 4000]
+
+
+def test_resume_story_at_segment(client, stories_dir, auth_headers):
+    """Resuming gives a Range that plays from the segment's first byte."""
+    write_indexed_story(stories_dir)
+
+    info = client.get(
+        "/api/v1/stories/trex/trex_malmo/resume?segment=1", headers=auth_headers
+    ).json()
+    audio = client.get(info["audio_url"], headers={**auth_headers, "Range": info["range"]})
+
+    assert info["segment"]["start_time"] == 1.5
+    assert info["range"] == "bytes=4000-"
+    assert audio.status_code == 206
+    assert audio.content == AUDIO[4000:]
+
+
+def test_resume_unknown_segment(client, stories_dir, auth_headers):
+    """Segments past the end and stories without an index are 404."""
+    write_indexed_story(stories_dir)
+    url = "/api/v1/stories/trex/{}/resume?segment={}"
+
+    assert client.get(url.format("trex_malmo", 2), headers=auth_headers).status_code == 404
+    assert client.get(url.format("trex_stockholm", 0), headers=auth_headers).status_code == 404
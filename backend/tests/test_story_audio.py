@@ -0,0 +1,57 @@
+"""Segmented story audio tests."""
+
+import pytest
+
+from sagatoyai.services import story_library
+from sagatoyai.services.story_audio import (
+    build_story_index,
+    load_story_index,
+    save_story_audio,
+)
+
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz mono: 144 bytes, 24 ms per frame
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC0]) + b"\x01" * 140
+
+TEXT = "Once upon a time.\n\nT-Rex  went to Malmö. He saw the bridge!\n\nThe end."
+
+
+def test_build_story_index_maps_text_bytes_and_time():
+    """Test segment spans, offsets and timing."""
+    chunks = [
+        ("Once upon a time.", FRAME * 10),
+        ("T-Rex went to Malmö. He saw the bridge!", FRAME * 25),
+        ("The end.", FRAME * 5),
+    ]
+
+    index = build_story_index("trex", "trex_malmo", "sv", TEXT, chunks)
+
+    spans = [TEXT[s.text_start:s.text_end] for s in index.segments]
+    assert spans == ["Once upon a time.", "T-Rex  went to Malmö. He saw the bridge!", "The end."]
+    assert [s.byte_offset for s in index.segments] == [0, 1440, 5040]
+    assert [s.start_time for s in index.segments] == [0.0, 0.24, 0.84]
+    assert index.duration == pytest.approx(0.96)
+    assert index.audio_size == 40 * len(FRAME)
+
+
+def test_segment_at():
+    """Test finding the segment playing at a time."""
+    chunks = [("Once upon a time.", FRAME * 10), ("The end.", FRAME * 10)]
+    index = build_story_index("trex", "trex_malmo", "sv", "Once upon a time. The end.", chunks)
+
+    assert index.segment_at(0.0).index == 0
+    assert index.segment_at(0.3).index == 1
+    assert index.segment_at(99).index == 1
+    assert index.segment_at(-1) is None
+
+
+def test_save_and_load_index(tmp_path, monkeypatch):
+    """Test that the index is stored next to the audio."""
+    monkeypatch.setattr(story_library, "STORIES_DIR", tmp_path)
+    index = build_story_index("trex", "trex_malmo", "en", "The end.", [("The end.", FRAME)])
+
+    audio_path = save_story_audio(FRAME, index, "The end.")
+
+    assert audio_path == tmp_path / "en" / "trex" / "trex_malmo.mp3"
+    assert audio_path.with_suffix(".txt").read_text() == "The end."
+    assert load_story_index("trex", "trex_malmo", "en") == index
+    assert load_story_index("trex", "trex_malmo", "sv") is None
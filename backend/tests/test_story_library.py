@@ -0,0 +1,79 @@
+"""Story catalog tests."""
+
+from sagatoyai.services.story_library import (
+    StoryCatalog,
+    get_story,
+    get_story_prompt,
+    stem_keyword,
+    story_catalog,
+)
+
+
+def test_search_by_location_ignores_diacritics():
+    """Test that "Malmö" and "Malmo" find the same story."""
+    for query in ("Tell me a story about Malmö", "story about malmo"):
+        matches = story_catalog.search(query)
+        assert matches[0].story_id == "trex_malmo"
+        assert matches[0].series_id == "trex"
+
+
+def test_search_swedish_keywords():
+    """Test Swedish requests via catalog keywords."""
+    assert story_catalog.search("Berätta en saga om kaninen vid sjön")[0].story_id == "kanin_lake"
+    assert story_catalog.search("En saga om Köpenhamn")[0].story_id == "trex_copenhagen"
+
+
+def test_search_matches_inflected_forms():
+    """Test that inflected words find stories indexed under the base form."""
+    assert story_catalog.search("en saga om delfinerna")[0].series_id == "delfin"
+    assert story_catalog.search("kaninerna i skogarna")[0].story_id == "kanin_forest"
+    assert story_catalog.search("a story about dinosaurs")[0].series_id == "trex"
+    for forms in (["drake", "draken", "drakar", "drakarna"], ["river", "rivers"]):
+        assert len({stem_keyword(form) for form in forms}) == 1
+    assert stem_keyword("hare") == "hare"  # Too short to strip
+
+
+def test_search_combines_fields():
+    """Test that character and location words add up."""
+    matches = story_catalog.search("the dinosaur in Copenhagen")
+    assert matches[0].story_id == "trex_copenhagen"
+    assert matches[0].score > matches[1].score
+    assert all(m.series_id == "trex" for m in matches)
+
+
+def test_search_without_keywords_finds_nothing():
+    """Test that stopwords alone match no story."""
+    assert story_catalog.search("tell me a story") == []
+
+
+def test_get_story_checks_series():
+    """Test that a story ID only resolves within its own series."""
+    assert get_story("trex", "trex_malmo")["location"] == "Malmö"
+    assert get_story("kanin", "trex_malmo") is None
+    assert get_story("nope", "trex_malmo") is None
+
+
+def test_prompts_are_built_once():
+    """Test that prompts are cached per story and language."""
+    sv = get_story_prompt("delfin", "delfin_ocean", "sv")
+    assert "Titel: Delfin cleans the Ocean" in sv
+    assert get_story_prompt("delfin", "delfin_ocean", "sv") is sv
+    assert get_story_prompt("delfin", "delfin_ocean", "en").startswith("Write a fun")
+    assert get_story_prompt("kanin", "delfin_ocean", "sv") is None
+
+
+def test_loads_catalog_from_data():
+    """Test a catalog built from a dict."""
+    catalog = StoryCatalog()
+    catalog.load_data({
+        "series": {
+            "uggla": {
+                "name": "Uggla",
+                "character": "Uggla the wise owl",
+                "theme": "Night",
+                "stories": [{"id": "uggla_moon", "title": "Uggla and the Moon", "location": "Kiruna"}],
+            }
+        }
+    })
+    assert catalog.search("owl in Kiruna")[0].story_id == "uggla_moon"
+    assert catalog.find_story("uggla_moon")[0] == "uggla"
@@ -0,0 +1,76 @@
+"""Streaming content filter tests."""
+
+from sagatoyai.services.content_filter import (
+    FILTER_REPLACEMENTS,
+    StreamingContentFilter,
+    filter_text_stream,
+)
+
+
+def _feed_all(stream_filter, chunks):
+    released = []
+    for chunk in chunks:
+        released.extend(stream_filter.feed(chunk))
+    released.extend(stream_filter.flush())
+    return released
+
+
+def test_releases_only_complete_sentences():
+    """Test that nothing is released before a sentence is finished."""
+    stream_filter = StreamingContentFilter("en")
+
+    assert stream_filter.feed("Hello there, little") == []
+    assert stream_filter.feed(" friend! How") == ["Hello there, little friend!"]
+    assert stream_filter.flush() == ["How"]
+
+
+def test_decimals_and_chunk_edges_do_not_split():
+    """Test that "3.5" and a "." at a chunk edge are not sentence ends."""
+    released = _feed_all(StreamingContentFilter("en"), ["It is 3.", "5 meters long. Wow"])
+
+    assert released == ["It is 3.5 meters long.", "Wow"]
+
+
+def test_word_split_across_chunks_is_caught():
+    """Test that a blocked word split over two chunks is still found."""
+    released = _feed_all(
+        StreamingContentFilter("en"),
+        ["The pirate had a kn", "ife in his boot. ", "Then he sailed home."],
+    )
+
+    assert released == [FILTER_REPLACEMENTS["en"], "Then he sailed home."]
+
+
+def test_unsafe_sentence_replaced_before_it_ends():
+    """Test in-flight replacement, emitted once per response."""
+    stream_filter = StreamingContentFilter("sv")
+
+    assert stream_filter.feed("Han hade en kniv ") == [FILTER_REPLACEMENTS["sv"]]
+    assert stream_filter.feed("i fickan. Och blod. Sen ") == []
+    assert stream_filter.feed("åt de glass.") == []
+    assert stream_filter.flush() == ["Sen åt de glass."]
+    assert stream_filter.replaced_sentences == 2
+
+
+async def test_filter_text_stream():
+    """Test the async wrapper over a token stream."""
+
+    async def tokens():
+        for token in ["Hej", "! Jag ", "heter ", "Saga."]:
+            yield token
+
+    sentences = [sentence async for sentence in filter_text_stream(tokens(), "sv")]
+
+    assert sentences == ["Hej!", "Jag heter Saga."]
+
+
+async def test_english_term_filtered_in_swedish_stream():
+    """Test that an English term is replaced when the default language is Swedish."""
+
+    async def tokens():
+        for token in ["Hej! I want ", "to ki", "ll you. ", "Sen åt vi ", "sex bullar."]:
+            yield token
+
+    sentences = [sentence async for sentence in filter_text_stream(tokens(), "sv")]
+
+    assert sentences == ["Hej!", FILTER_REPLACEMENTS["sv"], "Sen åt vi sex bullar."]
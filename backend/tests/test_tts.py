@@ -0,0 +1,120 @@
+"""TTS service tests."""
+
+import pytest
+
+from sagatoyai.services import tts as tts_module
+from sagatoyai.services.tts import TTSError, TTSService, split_text_chunks
+from sagatoyai.services.tts_engines import TTSEngine, TTSEngineRegistry
+
+FRAME = bytes([0xFF, 0xF3, 0x64, 0xC0]) + b"\x01" * 140
+
+
+def test_split_packs_paragraphs():
+    """Test that short paragraphs share a chunk."""
+    text = "First paragraph.\n\nSecond paragraph.\n\n\nThird one is here."
+    assert split_text_chunks(text, max_chars=40) == [
+        "First paragraph.\n\nSecond paragraph.",
+        "Third one is here.",
+    ]
+
+
+def test_split_long_paragraph_at_sentences():
+    """Test that a paragraph over the limit is split between sentences."""
+    text = "One two three. Four five six! Seven eight nine? Ten."
+    chunks = split_text_chunks(text, max_chars=30)
+    assert chunks == ["One two three. Four five six!", "Seven eight nine? Ten."]
+    assert " ".join(chunks) == text
+
+
+async def test_synthesize_long_retries_failed_chunk(monkeypatch):
+    """Test that one flaky chunk is retried without redoing the others."""
+    attempts: dict[str, int] = {}
+
+    async def fake_synthesize_audio(self, text, language="en", provider=None):
+        attempts[text] = attempts.get(text, 0) + 1
+        if text.startswith("Second") and attempts[text] == 1:
+            raise TTSError("connection closed")
+        return b"ID3\x04\x00\x00\x00\x00\x00\x00" + FRAME * len(text) + FRAME[:10], "mp3"
+
+    async def no_sleep(delay):
+        return None
+
+    monkeypatch.setattr(TTSService, "synthesize_audio", fake_synthesize_audio)
+    monkeypatch.setattr(tts_module.asyncio, "sleep", no_sleep)
+
+    service = TTSService()
+    chunks = await service.synthesize_chunks("First part.\n\nSecond part.", "en", max_chars=20)
+    audio = await service.synthesize_long("Hi.", "en")
+
+    assert [text for text, _ in chunks] == ["First part.", "Second part."]
+    assert attempts == {"First part.": 1, "Second part.": 2, "Hi.": 1}
+    assert chunks[1][1] == FRAME * len("Second part.")
+    assert audio == FRAME * 3
+
+
+async def test_synthesize_chunks_gives_up_after_retries(monkeypatch):
+    """Test that a chunk failing every attempt fails the whole text."""
+    async def failing(self, text, language="en", provider=None):
+        raise TTSError("down")
+
+    async def no_sleep(delay):
+        return None
+
+    monkeypatch.setattr(TTSService, "synthesize_audio", failing)
+    monkeypatch.setattr(tts_module.asyncio, "sleep", no_sleep)
+
+    with pytest.raises(TTSError):
+        await TTSService().synthesize_chunks("Hello there.", "en", retries=2)
+
+
+class FakeEngine(TTSEngine):
+    """Engine yielding fixed audio, or failing for texts it is told to."""
+
+    def __init__(self, name, audio_format, audio, fail_on=()):
+        self.name = name
+        super().__init__(max_concurrency=4)
+        self.audio_format = audio_format
+        self.audio = audio
+        self.fail_on = fail_on
+
+    async def _stream(self, text, language):
+        if text in self.fail_on:
+            raise TTSError("worker crashed")
+        yield self.audio
+
+
+@pytest.fixture
+def piper_with_edge_fallback(monkeypatch):
+    """Piper that fails on "Second part.", with Edge behind it."""
+    registry = TTSEngineRegistry()
+    registry.register(FakeEngine("piper", "pcm", b"\x00\x01" * 100, fail_on={"Second part."}))
+    registry.register(FakeEngine("edge", "mp3", FRAME * 3))
+    monkeypatch.setattr(tts_module, "tts_engines", registry)
+
+
+async def test_fallback_reports_the_format_spoken(piper_with_edge_fallback):
+    """Test that audio from the Edge fallback is reported as MP3."""
+    service = TTSService(provider="piper")
+
+    assert await service.synthesize_audio("First part.", "en") == (b"\x00\x01" * 100, "pcm")
+    assert await service.synthesize_audio("Second part.", "en") == (FRAME * 3, "mp3")
+
+
+async def test_synthesize_chunks_rejects_mixed_formats(piper_with_edge_fallback):
+    """Test that PCM and MP3 chunks are never joined into one text."""
+    service = TTSService(provider="piper")
+
+    with pytest.raises(TTSError, match="mp3, pcm"):
+        await service.synthesize_chunks("First part.\n\nSecond part.", "en", max_chars=20)
+
+
+async def test_synthesize_chunks_with_required_format(piper_with_edge_fallback):
+    """Test that a required format picks the engine and is checked."""
+    service = TTSService(provider="piper")
+
+    chunks = await service.synthesize_chunks(
+        "First part.", "en", provider="edge", audio_format="mp3"
+    )
+    assert chunks == [("First part.", FRAME * 3)]
+    with pytest.raises(TTSError, match="expected mp3"):
+        await service.synthesize_chunks("First part.", "en", retries=0, audio_format="mp3")
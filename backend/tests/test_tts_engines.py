@@ -0,0 +1,124 @@
+"""TTS engine registry tests."""
+
+import asyncio
+
+import pytest
+
+from sagatoyai.services.circuit_breaker import CircuitBreaker, CircuitState
+from sagatoyai.services.tts import TTSService
+from sagatoyai.services.tts_engines import (
+    CachedTTSEngine,
+    TTSEngine,
+    TTSEngineRegistry,
+    TTSError,
+    tts_engines,
+)
+
+
+class FakeEngine(TTSEngine):
+    """Engine that returns the text as audio, or fails on demand."""
+
+    name = "fake"
+
+    def __init__(self, max_concurrency: int = 2, fail: bool = False):
+        super().__init__(max_concurrency, CircuitBreaker("fake", min_calls=2))
+        self.fail = fail
+        self.calls = 0
+        self.peak = 0
+
+    async def _stream(self, text, language):
+        self.calls += 1
+        self.peak = max(self.peak, self._active)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("socket closed")
+        yield text.encode()
+        yield b"|"
+
+
+async def test_engine_limits_concurrency():
+    """Test that no more syntheses run at once than the engine allows."""
+    engine = FakeEngine(max_concurrency=2)
+    results = await asyncio.gather(*(engine.synthesize(f"t{i}") for i in range(6)))
+
+    assert results == [f"t{i}|".encode() for i in range(6)]
+    assert engine.peak == 2
+    assert engine.get_status()["active"] == 0
+
+
+async def test_failing_engine_trips_breaker():
+    """Test that failures open the breaker and later calls fail fast."""
+    engine = FakeEngine(fail=True)
+    for _ in range(2):
+        with pytest.raises(TTSError, match="socket closed"):
+            await engine.synthesize("hello")
+
+    assert engine.breaker.state == CircuitState.OPEN
+    with pytest.raises(TTSError, match="circuit open"):
+        await engine.synthesize("hello")
+    assert engine.calls == 2
+
+
+async def test_cached_engine_reuses_short_phrases():
+    """Test that a repeated phrase is synthesized once."""
+    inner = FakeEngine()
+    engine = CachedTTSEngine(inner)
+
+    first = await engine.synthesize("Hej!", "sv")
+    second = await engine.synthesize("Hej! ", "sv")
+    await engine.synthesize("Hej!", "en")
+
+    assert first == second == b"Hej!|"
+    assert inner.calls == 2
+    assert engine.get_status()["hits"] == 1
+
+
+def test_cached_engine_replaces_entry_size():
+    """Test that storing a phrase again doesn't count its old audio."""
+    engine = CachedTTSEngine(FakeEngine())
+
+    engine._store(("sv", "Hej!"), b"12345")
+    engine._store(("sv", "Hej!"), b"123")
+
+    assert engine.get_status()["cached_bytes"] == 3
+
+
+async def test_cancelled_probe_is_given_back():
+    """Test that a half-open probe cancelled before any audio frees the probe."""
+    now = [0.0]
+    engine = FakeEngine()
+    engine.breaker = CircuitBreaker("fake", min_calls=2, clock=lambda: now[0])
+    engine.breaker.record_failure()
+    engine.breaker.record_failure()
+    now[0] += 30
+
+    task = asyncio.create_task(engine.synthesize("Hej!"))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert engine.breaker.state == CircuitState.HALF_OPEN
+    assert engine.breaker.allow_request()
+
+def test_registry_rejects_unknown_engine():
+    """Test that an unknown provider name raises TTSError."""
+    registry = TTSEngineRegistry()
+    registry.register(FakeEngine())
+    assert registry.names() == ["fake"]
+    with pytest.raises(TTSError):
+        registry.get("coqui")
+
+
+async def test_piper_falls_back_to_edge(monkeypatch):
+    """Test that Piper failing before any audio falls back to Edge TTS."""
+    failing = FakeEngine(fail=True)
+    failing.name = "piper"
+    edge = FakeEngine()
+    monkeypatch.setitem(tts_engines._engines, "piper", failing)
+    monkeypatch.setitem(tts_engines._engines, "edge", edge)
+
+    audio = await TTSService(provider="piper").synthesize_to_bytes("Hej.", "sv")
+
+    assert audio == b"Hej.|"
+    assert edge.calls == 1
@@ -0,0 +1,88 @@
+"""Word timing index tests."""
+
+import pytest
+
+from sagatoyai.services.streaming_tts import StreamingTTSService
+from sagatoyai.services.word_timings import WordTimingIndex
+
+TICKS_PER_MS = 10_000
+
+
+def word(text: str, start_ms: int, duration_ms: int) -> dict:
+    return {
+        "type": "WordBoundary",
+        "offset": start_ms * TICKS_PER_MS,
+        "duration": duration_ms * TICKS_PER_MS,
+        "text": text,
+    }
+
+
+@pytest.fixture
+def timings():
+    index = WordTimingIndex("Det var en gång, en kanin.")
+    index.add(word("Det", 100, 200))
+    index.add(word("var", 350, 200))
+    index.add(word("en", 600, 150))
+    index.add(word("gång", 800, 300))
+    index.add(word("en", 1500, 150))
+    index.add(word("kanin", 1700, 400))
+    return index
+
+
+def test_word_at_position(timings):
+    """Test finding the word playing at a playback position."""
+    assert timings.word_at(0.05) is None
+    assert timings.word_at(0.1) == 0
+    assert timings.word_at(0.9) == 3
+    # In the pause after "gång," the last started word is still "gång"
+    assert timings.word(timings.word_at(1.3)) == "gång"
+    assert timings.word(timings.word_at(1.55)) == "en"
+
+
+def test_repeated_words_map_to_their_own_span(timings):
+    """Test that each "en" points at its own place in the text."""
+    assert timings.remaining_text(1.55) == "en kanin."
+    assert timings.spoken_text(0.65) == "Det var en"
+
+
+def test_resume_from_interrupted_word(timings):
+    """Test resume points for an interruption mid-word."""
+    assert timings.resume_offset(1.8) == 1.7
+    assert timings.remaining_text(1.8) == "kanin."
+    assert timings.remaining_text(0.0) == timings.text
+    assert timings.duration == 2.1
+
+
+def test_to_dict(timings):
+    """Test the compact form."""
+    data = timings.to_dict()
+    assert data["starts_ms"][:2] == [100, 350]
+    assert data["text_starts"][-1] == timings.text.index("kanin")
+
+
+async def test_streaming_collects_timings(monkeypatch):
+    """Test that synthesize_streaming fills the index and learns the speaking rate."""
+    service = StreamingTTSService()
+    text = "Hej på dig"
+
+    async def fake_events(text, language="sv", boundary="SentenceBoundary"):
+        assert boundary == "WordBoundary"
+        yield word("Hej", 0, 300)
+        yield {"type": "audio", "data": b"a"}
+        yield word("på", 400, 200)
+        yield word("dig", 700, 500)
+        yield {"type": "audio", "data": b"b"}
+
+    monkeypatch.setattr(service.engine, "stream_events", fake_events)
+
+    before = await service.get_audio_duration_estimate("ett två tre fyra", "sv")
+    timings = WordTimingIndex(text)
+    audio = b"".join([chunk async for chunk in service.synthesize_streaming(text, "sv", timings)])
+
+    assert audio == b"ab"
+    assert timings.complete and len(timings) == 3
+    assert await service.get_audio_duration_estimate(text, "sv", timings) == 1.2
+    # 0.4 s per word measured, against the default of 60/135
+    after = await service.get_audio_duration_estimate("ett två tre fyra", "sv")
+    assert after == pytest.approx(1.6)
+    assert before == pytest.approx(4 * 60 / 135)